@@ -1,3 +1,19 @@
+from .aio import AsyncStream
+from .backtest import BacktestEngine, BacktestResult, Strategy
+from .bulk_fetch import FetchResult, date_range, fetch_many
+from .indicators import DEFAULT_INDICATORS, IndicatorEngine
+from .isin_parser import IsinRow, iter_isin_rows
+from .kbar import KBar, KBarAggregator, parse_interval, resample_trade_data
+from .market_depth import DepthBook, DepthSnapshot, MarketDepth
+from .rate_limit import TokenBucket
+from .stock_index import StockIndex, StockInfo, get_stock_index
+from .sweep import format_sweep_table, parameter_grid, run_sweep
+from .tick_grid import (price_ladder, price_to_tick_index, shift_ticks,
+                        snap_price, tick_index_to_price, tick_size)
+from .tick_store import TickStore
+from .tick_writer import TickWriter
+from .trade_cache import TradeCache
+from .trade_data import TradeData
 from .utils import *
 
 __version__ = "0.1.0"
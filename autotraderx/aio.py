@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, Callable
+
+__all__ = ["AsyncStream"]
+
+
+_CLOSED = object()
+
+
+class AsyncStream:
+    """
+    將其他執行緒的 callback 轉為 asyncio 的非同步迭代器。
+
+    push（或 append）可在任何執行緒呼叫，資料以 loop.call_soon_threadsafe
+    交給事件迴圈；maxsize 大於 0 時佇列滿了會丟棄最舊的一筆，行情落後時
+    只保留最新的資料，而不會讓 SDK 的 callback 執行緒被阻塞。
+    須在事件迴圈內建立。
+
+    Args:
+        maxsize (int): 佇列上限，0 為不限。
+        on_close (Callable[[], None]): close 時呼叫，例如取消註冊 callback。
+    """
+
+    def __init__(self, maxsize: int = 0, on_close: Callable[[], None] = None):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+        self._on_close = on_close
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, item: Any):
+        if not self.closed:
+            try:
+                self._loop.call_soon_threadsafe(self._put, item)
+            except RuntimeError:
+                # 事件迴圈已關閉
+                self.closed = True
+
+    # 可作為 CustomMarketTrader 的回報收集器
+    append = push
+
+    def _put(self, item: Any):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def close(self):
+        """ 停止接收，已排隊的資料讀完後迭代結束；可在任何執行緒呼叫 """
+        if self.closed:
+            return
+        self.closed = True
+        if self._on_close is not None:
+            self._on_close()
+        try:
+            self._loop.call_soon_threadsafe(self._put, _CLOSED)
+        except RuntimeError:
+            pass
+
+    def __aiter__(self) -> "AsyncStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        item = await self._queue.get()
+        if item is _CLOSED:
+            # 讓其他同時等待的讀取端也能結束
+            self._queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        return item
+
+    async def get(self, timeout: float = None) -> Any:
+        """ 取得下一筆，逾時拋出 asyncio.TimeoutError，已關閉時拋出 StopAsyncIteration """
+        return await asyncio.wait_for(self.__anext__(), timeout)
+
+    async def __aenter__(self) -> "AsyncStream":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
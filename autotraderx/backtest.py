@@ -0,0 +1,332 @@
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from .trade_data import TradeData
+from .utils import calc_handling_fee, calc_transaction_tax, us_to_match_time
+
+__all__ = ["Strategy", "BacktestEngine", "BacktestResult"]
+
+
+class BacktestTick:
+    """ 與 ProductTick 成交欄位同名的輕量物件，回測時每筆成交重複使用同一個實例 """
+
+    __slots__ = ("Symbol", "time_us", "MatchPrice", "MatchQty", "TotalMatchQty", "date")
+
+    @property
+    def MatchTime(self) -> str:
+        return us_to_match_time(self.time_us)
+
+
+class Strategy:
+    """
+    回測策略介面，callback 名稱與 QuotationSystem 相同，
+    同一份策略邏輯可同時用於即時行情與回測。
+    """
+
+    engine: "BacktestEngine" = None
+
+    def on_start(self, engine: "BacktestEngine"):
+        self.engine = engine
+
+    def event_on_update_basic(self, data: Any):
+        pass
+
+    def event_on_match(self, data: BacktestTick):
+        pass
+
+    def on_finish(self):
+        pass
+
+
+class _Order:
+
+    __slots__ = ("order_id", "symbol", "side", "shares", "price", "time_us", "date")
+
+    def __init__(self, order_id, symbol, side, shares, price, time_us, date):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side          # 1: 買, -1: 賣
+        self.shares = shares
+        self.price = price        # None 為市價
+        self.time_us = time_us
+        self.date = date
+
+
+class BacktestResult:
+
+    def __init__(
+        self,
+        trades: List[Dict[str, Any]],
+        positions: Dict[str, int],
+        last_prices: Dict[str, float],
+        avg_costs: Dict[str, float],
+        realized: float,
+        fees: int,
+        taxes: int,
+        n_ticks: int,
+        elapsed: float,
+    ):
+        self.trades = trades
+        self.positions = positions
+        self.realized = realized
+        self.fees = fees
+        self.taxes = taxes
+        self.n_ticks = n_ticks
+        self.elapsed = elapsed
+        self.unrealized = sum(
+            (last_prices[s] - avg_costs[s]) * shares
+            for s, shares in positions.items() if shares
+        )
+
+    @property
+    def net_pnl(self) -> float:
+        return self.realized + self.unrealized - self.fees - self.taxes
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trades": len(self.trades),
+            "realized": round(self.realized, 3),
+            "unrealized": round(self.unrealized, 3),
+            "fees": self.fees,
+            "taxes": self.taxes,
+            "net_pnl": round(self.net_pnl, 3),
+            "ticks": self.n_ticks,
+            "elapsed": round(self.elapsed, 3),
+            "ticks_per_sec": round(self.n_ticks / self.elapsed) if self.elapsed > 0 else 0,
+        }
+
+    def trades_to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame(self.trades)
+
+
+class BacktestEngine:
+    """
+    事件驅動的逐筆回測引擎。
+
+    將多檔股票、多個交易日的 TradeData 依時間排序後逐筆送給策略，
+    委託在之後的成交價格穿越委託價時成交，手續費與證交稅沿用
+    calc_minimum_profit 的計算方式。
+
+    Args:
+        strategy (Strategy): 回測策略。
+        handling_fee_percentage (float): 手續費率。
+        discount_percentage (float): 手續費折扣。
+        transaction_tax_percentage (float): 證交稅率。
+        is_day_trading (bool): 是否以現股當沖計算證交稅。
+        skip_try_match (bool): 是否略過試搓資料。
+    """
+
+    def __init__(
+        self,
+        strategy: Strategy,
+        handling_fee_percentage: float = 0.001425,
+        discount_percentage: float = 0.6,
+        transaction_tax_percentage: float = 0.003,
+        is_day_trading: bool = False,
+        skip_try_match: bool = True,
+    ):
+        self.strategy = strategy
+        self.handling_fee_percentage = handling_fee_percentage
+        self.discount_percentage = discount_percentage
+        self.transaction_tax_percentage = transaction_tax_percentage
+        self.is_day_trading = is_day_trading
+        self.skip_try_match = skip_try_match
+
+        self._data: Dict[str, List[TradeData]] = defaultdict(list)
+        self._reset()
+
+    def _reset(self):
+        self.positions: Dict[str, int] = defaultdict(int)
+        self.avg_costs: Dict[str, float] = defaultdict(float)
+        self.last_prices: Dict[str, float] = {}
+        self.trades: List[Dict[str, Any]] = []
+        self.realized = 0.0
+        self.fees = 0
+        self.taxes = 0
+        self._open_orders: Dict[str, Dict[int, _Order]] = defaultdict(dict)
+        self._next_order_id = 1
+        self._now = (None, 0)
+
+    def add_data(self, data: TradeData):
+        if data.date is None:
+            raise ValueError("TradeData.date is required for backtesting.")
+        self._data[data.date].append(data)
+
+    def add_many(self, data: Iterable[TradeData]):
+        for d in data:
+            self.add_data(d)
+
+    # 委託介面，與 Trader 相同：buy/sell 以張為單位
+
+    def buy(self, symbol: str, qty: int, price: float = None) -> int:
+        return self.set_order(symbol, 1, qty * 1000, price)
+
+    def sell(self, symbol: str, qty: int, price: float = None) -> int:
+        return self.set_order(symbol, -1, qty * 1000, price)
+
+    def set_order(self, symbol: str, side: int, shares: int, price: float = None) -> int:
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        date, time_us = self._now
+        self._open_orders[symbol][order_id] = _Order(order_id, symbol, side, shares, price, time_us, date)
+        return order_id
+
+    def cancel(self, order_id: int) -> bool:
+        for orders in self._open_orders.values():
+            if orders.pop(order_id, None) is not None:
+                return True
+        return False
+
+    def open_orders(self, symbol: str = None) -> List[_Order]:
+        if symbol is not None:
+            return list(self._open_orders[symbol].values())
+        return [o for orders in self._open_orders.values() for o in orders.values()]
+
+    def _fill(self, order: _Order, price: float, date: str, time_us: int):
+        shares = order.shares
+        side = order.side
+        symbol = order.symbol
+
+        fee = calc_handling_fee(
+            price, shares,
+            handling_fee_percentage=self.handling_fee_percentage,
+            discount_percentage=self.discount_percentage,
+        )
+        tax = 0
+        if side < 0:
+            tax = calc_transaction_tax(
+                price, shares,
+                transaction_tax_percentage=self.transaction_tax_percentage,
+                is_day_trading=self.is_day_trading,
+            )
+
+        position = self.positions[symbol]
+        avg_cost = self.avg_costs[symbol]
+        realized = 0.0
+        new_position = position + side * shares
+
+        if position == 0 or (position > 0) == (side > 0):
+            # 加碼
+            self.avg_costs[symbol] = (avg_cost * abs(position) + price * shares) / abs(new_position)
+        else:
+            # 減碼或反向
+            closed = min(abs(position), shares)
+            realized = (price - avg_cost) * closed * (1 if position > 0 else -1)
+            if abs(new_position) and (new_position > 0) != (position > 0):
+                self.avg_costs[symbol] = price
+            elif new_position == 0:
+                self.avg_costs[symbol] = 0.0
+
+        self.positions[symbol] = new_position
+        self.realized += realized
+        self.fees += fee
+        self.taxes += tax
+        self.trades.append({
+            "日期": date,
+            "成交時間": us_to_match_time(time_us),
+            "委託書號": order.order_id,
+            "股票代號": symbol,
+            "買賣別": "Buy" if side > 0 else "Sell",
+            "成交價": price,
+            "成交股數": shares,
+            "手續費": fee,
+            "證交稅": tax,
+            "已實現損益": realized - fee - tax,
+        })
+
+    def _merge_day(self, data: List[TradeData]):
+        symbols = [d.symbol for d in data]
+        arrays = [d.array[~d.array["try_match"]] if self.skip_try_match else d.array for d in data]
+        times = np.concatenate([a["time"] for a in arrays])
+        prices = np.concatenate([a["price"] for a in arrays])
+        qtys = np.concatenate([a["qty"] for a in arrays])
+        total_qtys = np.concatenate([np.cumsum(a["qty"]) for a in arrays])
+        sym_idx = np.concatenate([np.full(len(a), i, dtype=np.int32) for i, a in enumerate(arrays)])
+
+        order = np.argsort(times, kind="stable")
+
+        return (
+            symbols,
+            arrays,
+            times[order].tolist(),
+            prices[order].tolist(),
+            qtys[order].tolist(),
+            total_qtys[order].tolist(),
+            sym_idx[order].tolist(),
+        )
+
+    def run(self) -> BacktestResult:
+        self._reset()
+        strategy = self.strategy
+        strategy.on_start(self)
+        on_match = strategy.event_on_match
+        open_orders = self._open_orders
+
+        tick = BacktestTick()
+        n_ticks = 0
+        t0 = time.perf_counter()
+
+        for date in sorted(self._data):
+            symbols, arrays, times, prices, qtys, total_qtys, sym_idx = self._merge_day(self._data[date])
+            tick.date = date
+
+            for symbol, array in zip(symbols, arrays):
+                if not len(array):
+                    continue
+                pre_close_price = self.last_prices.get(symbol, float(array["price"][0]))
+                strategy.event_on_update_basic(SimpleNamespace(
+                    Symbol=symbol,
+                    PreClosePrice=pre_close_price,
+                    TodayRefPrice=pre_close_price,
+                ))
+
+            for t, p, q, tq, i in zip(times, prices, qtys, total_qtys, sym_idx):
+                symbol = symbols[i]
+                self._now = (date, t)
+
+                orders = open_orders.get(symbol)
+                if orders:
+                    for order in list(orders.values()):
+                        if order.price is None:
+                            fill_price = p
+                        elif order.side > 0 and p <= order.price:
+                            fill_price = order.price
+                        elif order.side < 0 and p >= order.price:
+                            fill_price = order.price
+                        else:
+                            continue
+                        del orders[order.order_id]
+                        self._fill(order, fill_price, date, t)
+
+                self.last_prices[symbol] = p
+                tick.Symbol = symbol
+                tick.time_us = t
+                tick.MatchPrice = p
+                tick.MatchQty = q
+                tick.TotalMatchQty = tq
+                on_match(tick)
+
+            n_ticks += len(times)
+
+            # ROD 委託收盤後失效
+            open_orders.clear()
+
+        strategy.on_finish()
+        elapsed = time.perf_counter() - t0
+
+        return BacktestResult(
+            trades=self.trades,
+            positions=dict(self.positions),
+            last_prices=self.last_prices,
+            avg_costs=dict(self.avg_costs),
+            realized=self.realized,
+            fees=self.fees,
+            taxes=self.taxes,
+            n_ticks=n_ticks,
+            elapsed=elapsed,
+        )
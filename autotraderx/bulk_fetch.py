@@ -0,0 +1,106 @@
+import datetime
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, NamedTuple, Tuple, Type
+
+from tqdm import tqdm as Tqdm
+
+from .rate_limit import TokenBucket
+
+__all__ = ["FetchResult", "fetch_many", "date_range", "TRANSIENT_ERRORS"]
+
+_END = object()
+
+# 可重試的暫時性錯誤；其他例外（例如查詢當日資料、股票代號錯誤）重試也不會成功
+TRANSIENT_ERRORS = (TimeoutError, ConnectionError, socket.timeout)
+
+
+class FetchResult(NamedTuple):
+    key: Hashable
+    data: Any
+    error: Exception
+    attempts: int
+    elapsed: float
+
+
+def date_range(start: str, end: str, weekdays_only: bool = True) -> List[str]:
+    """ 產生 start 到 end（含）的 YYYYMMDD 日期；不含國定假日 """
+    t = datetime.datetime.strptime(start, "%Y%m%d").date()
+    end_date = datetime.datetime.strptime(end, "%Y%m%d").date()
+    dates = []
+    while t <= end_date:
+        if not weekdays_only or t.weekday() < 5:
+            dates.append(t.strftime("%Y%m%d"))
+        t += datetime.timedelta(days=1)
+    return dates
+
+
+def fetch_many(
+    fetch_fn: Callable[..., Any],
+    keys: Iterable[Hashable],
+    max_workers: int = 4,
+    rate_limiter: TokenBucket = None,
+    retries: int = 3,
+    backoff: float = 0.5,
+    progress: bool = True,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+) -> Iterator[FetchResult]:
+    """
+    以有界的執行緒池並行呼叫 fetch_fn(*key)，依完成順序回傳結果。
+
+    每次呼叫前先向 rate_limiter 取得 token；fetch_fn 拋出 retry_on 的例外時
+    以指數退避重試，超過 retries 次後以 error 欄位回報；其他例外不重試，
+    直接以 error 欄位回報。任何失敗都不會中斷其他 key；提前結束迭代時，
+    尚未開始的查詢會被取消。
+
+    Args:
+        fetch_fn (Callable): 查詢函式，key 為 tuple 時展開為參數。
+        keys (Iterable[Hashable]): 要查詢的 key，例如 (prod_id, date)。
+        max_workers (int): 同時進行的查詢數。
+        rate_limiter (TokenBucket): 券商的每秒查詢上限，None 表示不限制。
+        retries (int): 失敗後的重試次數。
+        backoff (float): 第一次重試前的等待秒數，之後每次加倍。
+        progress (bool): 是否顯示進度條。
+        retry_on (Tuple[Type[BaseException], ...]): 需要重試的例外類別。
+    """
+    keys = list(keys)
+
+    def _call(key):
+        args = key if isinstance(key, tuple) else (key,)
+        t0 = time.perf_counter()
+        for attempt in range(1, retries + 2):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                data = fetch_fn(*args)
+                return FetchResult(key, data, None, attempt, time.perf_counter() - t0)
+            except Exception as e:
+                if attempt > retries or not isinstance(e, retry_on):
+                    return FetchResult(key, None, e, attempt, time.perf_counter() - t0)
+                time.sleep(backoff * 2 ** (attempt - 1))
+
+    bar = Tqdm(total=len(keys), disable=not progress, leave=False)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 只保留 max_workers 的兩倍在佇列中，避免一次建立上萬個 future
+        it = iter(keys)
+        pending = set()
+        for key in it:
+            pending.add(executor.submit(_call, key))
+            if len(pending) >= max_workers * 2:
+                break
+
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    bar.update(1)
+                    yield future.result()
+                    key = next(it, _END)
+                    if key is not _END:
+                        pending.add(executor.submit(_call, key))
+        finally:
+            # 呼叫端提前結束迭代時，尚未開始的查詢不再送出
+            for future in pending:
+                future.cancel()
+            bar.close()
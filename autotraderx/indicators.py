@@ -0,0 +1,534 @@
+import math
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from .kbar import KBar
+
+__all__ = [
+    "SMA", "EMA", "WMA", "RSI", "MACD", "KD", "SAR", "CDP", "BBands",
+    "RSIValue", "MACDValue", "KDValue", "SARValue", "CDPValue", "BBandsValue",
+    "IndicatorEngine", "DEFAULT_INDICATORS",
+]
+
+
+_NAN = float("nan")
+
+
+class RSIValue(NamedTuple):
+    rsi: Any
+    change: Any     # 與前一根 K 棒收盤價的差（UpDn）
+    up_avg: Any
+    dn_avg: Any
+
+
+class MACDValue(NamedTuple):
+    dif: Any
+    macd: Any       # DIF 的 EMA（訊號線）
+    osc: Any        # DIF - MACD
+
+
+class KDValue(NamedTuple):
+    k: Any
+    d: Any
+
+
+class SARValue(NamedTuple):
+    sar: Any
+    ep: Any         # 極值，上升趨勢為最高價，下降趨勢為最低價
+    af: Any
+    rising: Any
+
+
+class CDPValue(NamedTuple):
+    cdp: Any
+    ah: Any
+    nh: Any
+    nl: Any
+    al: Any
+
+
+class BBandsValue(NamedTuple):
+    ma: Any
+    ub: Any
+    lb: Any
+
+
+def _ema_filter(x: np.ndarray, alpha: float, y0: float = None) -> np.ndarray:
+    """
+    y[t] = y[t-1] + alpha * (x[t] - y[t-1])，y0 為 None 時以 x[0] 為起始值。
+
+    以分段的封閉解向量化：段內 y[j] = r^(j+1) * y_prev + alpha * r^j * sum(x[k] * r^-k)，
+    r = 1 - alpha；段長取 r^-L 不超過 1e100，避免溢位。
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.empty_like(x)
+    if not len(x):
+        return y
+
+    start = 0
+    if y0 is None:
+        y[0] = y0 = x[0]
+        start = 1
+
+    r = 1.0 - alpha
+    if r <= 0.0:
+        y[start:] = x[start:]
+        return y
+    block = max(1, min(len(x), int(100 * math.log(10) / -math.log(r)))) if r < 1.0 else len(x)
+
+    k = np.arange(block, dtype=np.float64)
+    pow_r = r ** (k + 1)        # r^(j+1)
+    inv_r = r ** -k             # r^-k
+    fwd_r = r ** k              # r^j
+
+    y_prev = y0
+    for i in range(start, len(x), block):
+        seg = x[i:i + block]
+        m = len(seg)
+        acc = np.cumsum(seg * inv_r[:m]) * fwd_r[:m]
+        y[i:i + m] = pow_r[:m] * y_prev + alpha * acc
+        y_prev = y[i + m - 1]
+    return y
+
+
+def _rolling(x: np.ndarray, n: int, fn: Callable, partial: bool) -> np.ndarray:
+    """ 長度 n 的滑動視窗；partial 為 True 時前 n-1 筆以既有資料計算，否則為 NaN """
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        out[n - 1:] = fn(np.lib.stride_tricks.sliding_window_view(x, n), axis=1)
+    if partial:
+        head = x[:min(n - 1, len(x))]
+        if fn is np.max:
+            out[:len(head)] = np.maximum.accumulate(head)
+        elif fn is np.min:
+            out[:len(head)] = np.minimum.accumulate(head)
+    return out
+
+
+class Indicator:
+    """
+    技術指標的共同介面。
+
+    update 以一根 K 棒更新狀態並回傳最新值，每根 K 棒 O(1)；
+    batch 以向量化方式計算整段歷史，結果與逐根呼叫 update 相同。
+    """
+
+    def update(self, close: float, high: float = None, low: float = None) -> Any:
+        raise NotImplementedError
+
+    def batch(self, close: np.ndarray, high: np.ndarray = None, low: np.ndarray = None) -> Any:
+        raise NotImplementedError
+
+    def update_bar(self, bar: KBar) -> Any:
+        return self.update(bar.close, bar.high, bar.low)
+
+
+class SMA(Indicator):
+
+    def __init__(self, n: int = 20):
+        self.n = n
+        self._window = deque()
+        self._sum = 0.0
+
+    def update(self, close, high=None, low=None) -> float:
+        self._window.append(close)
+        self._sum += close
+        if len(self._window) > self.n:
+            self._sum -= self._window.popleft()
+        return self._sum / self.n if len(self._window) == self.n else _NAN
+
+    def batch(self, close, high=None, low=None) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        out = np.full(len(close), np.nan)
+        if len(close) >= self.n:
+            c = np.cumsum(np.r_[0.0, close])
+            out[self.n - 1:] = (c[self.n:] - c[:-self.n]) / self.n
+        return out
+
+
+class EMA(Indicator):
+    """ alpha = 2 / (n + 1)，以第一根收盤價為起始值 """
+
+    def __init__(self, n: int = 20):
+        self.n = n
+        self.alpha = 2.0 / (n + 1)
+        self._value = None
+
+    def update(self, close, high=None, low=None) -> float:
+        if self._value is None:
+            self._value = close
+        else:
+            self._value += self.alpha * (close - self._value)
+        return self._value
+
+    def batch(self, close, high=None, low=None) -> np.ndarray:
+        return _ema_filter(close, self.alpha)
+
+
+class WMA(Indicator):
+    """ 線性加權，最新一根的權重為 n """
+
+    def __init__(self, n: int = 20):
+        self.n = n
+        self._denom = n * (n + 1) / 2
+        self._window = deque()
+        self._sum = 0.0
+        self._weighted = 0.0
+
+    def update(self, close, high=None, low=None) -> float:
+        n = self.n
+        window = self._window
+        if len(window) < n:
+            window.append(close)
+            self._sum += close
+            if len(window) < n:
+                return _NAN
+            self._weighted = sum((i + 1) * v for i, v in enumerate(window))
+        else:
+            # 視窗左移一格：所有權重減一，新值權重為 n
+            self._weighted += n * close - self._sum
+            self._sum += close - window.popleft()
+            window.append(close)
+        return self._weighted / self._denom
+
+    def batch(self, close, high=None, low=None) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        out = np.full(len(close), np.nan)
+        if len(close) >= self.n:
+            weights = np.arange(self.n, 0, -1, dtype=np.float64)
+            out[self.n - 1:] = np.convolve(close, weights, mode="valid") / self._denom
+        return out
+
+
+class RSI(Indicator):
+    """ Wilder 平滑（alpha = 1 / n），以第一個漲跌幅為起始值 """
+
+    def __init__(self, n: int = 14):
+        self.n = n
+        self.alpha = 1.0 / n
+        self._prev = None
+        self._up = None
+        self._dn = None
+
+    @staticmethod
+    def _rsi(up: float, dn: float) -> float:
+        total = up + dn
+        return 100.0 * up / total if total > 0 else 50.0
+
+    def update(self, close, high=None, low=None) -> RSIValue:
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return RSIValue(_NAN, _NAN, _NAN, _NAN)
+
+        change = close - prev
+        up, dn = max(change, 0.0), max(-change, 0.0)
+        if self._up is None:
+            self._up, self._dn = up, dn
+        else:
+            self._up += self.alpha * (up - self._up)
+            self._dn += self.alpha * (dn - self._dn)
+        return RSIValue(self._rsi(self._up, self._dn), change, self._up, self._dn)
+
+    def batch(self, close, high=None, low=None) -> RSIValue:
+        close = np.asarray(close, dtype=np.float64)
+        change = np.full(len(close), np.nan)
+        up_avg = np.full(len(close), np.nan)
+        dn_avg = np.full(len(close), np.nan)
+        rsi = np.full(len(close), np.nan)
+        if len(close) > 1:
+            change[1:] = np.diff(close)
+            up_avg[1:] = _ema_filter(np.maximum(change[1:], 0.0), self.alpha)
+            dn_avg[1:] = _ema_filter(np.maximum(-change[1:], 0.0), self.alpha)
+            total = up_avg[1:] + dn_avg[1:]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rsi[1:] = np.where(total > 0, 100.0 * up_avg[1:] / total, 50.0)
+        return RSIValue(rsi, change, up_avg, dn_avg)
+
+
+class MACD(Indicator):
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close, high=None, low=None) -> MACDValue:
+        dif = self.fast.update(close) - self.slow.update(close)
+        macd = self.signal.update(dif)
+        return MACDValue(dif, macd, dif - macd)
+
+    def batch(self, close, high=None, low=None) -> MACDValue:
+        dif = self.fast.batch(close) - self.slow.batch(close)
+        macd = self.signal.batch(dif)
+        return MACDValue(dif, macd, dif - macd)
+
+
+class KD(Indicator):
+    """
+    隨機指標，RSV 取最近 n 根（不足 n 根時取既有的 K 棒），
+    K、D 以 1/k_smooth、1/d_smooth 平滑，起始值皆為 50。
+    """
+
+    def __init__(self, n: int = 9, k_smooth: int = 3, d_smooth: int = 3):
+        self.n = n
+        self.k_alpha = 1.0 / k_smooth
+        self.d_alpha = 1.0 / d_smooth
+        self._highs = deque()   # (index, high)，單調遞減
+        self._lows = deque()    # (index, low)，單調遞增
+        self._index = 0
+        self._k = 50.0
+        self._d = 50.0
+
+    def update(self, close, high=None, low=None) -> KDValue:
+        high = close if high is None else high
+        low = close if low is None else low
+        i = self._index
+        self._index += 1
+
+        highs, lows = self._highs, self._lows
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((i, high))
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((i, low))
+        if highs[0][0] <= i - self.n:
+            highs.popleft()
+        if lows[0][0] <= i - self.n:
+            lows.popleft()
+
+        hh, ll = highs[0][1], lows[0][1]
+        rsv = (close - ll) / (hh - ll) * 100.0 if hh > ll else 50.0
+        self._k += self.k_alpha * (rsv - self._k)
+        self._d += self.d_alpha * (self._k - self._d)
+        return KDValue(self._k, self._d)
+
+    def batch(self, close, high=None, low=None) -> KDValue:
+        close = np.asarray(close, dtype=np.float64)
+        high = close if high is None else np.asarray(high, dtype=np.float64)
+        low = close if low is None else np.asarray(low, dtype=np.float64)
+        hh = _rolling(high, self.n, np.max, partial=True)
+        ll = _rolling(low, self.n, np.min, partial=True)
+        rng = hh - ll
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsv = np.where(rng > 0, (close - ll) / rng * 100.0, 50.0)
+        k = _ema_filter(rsv, self.k_alpha, 50.0)
+        d = _ema_filter(k, self.d_alpha, 50.0)
+        return KDValue(k, d)
+
+
+class SAR(Indicator):
+    """
+    拋物線指標（Wilder）。第二根 K 棒依收盤價決定起始趨勢，
+    每根 K 棒依賴前一根的結果，batch 與 update 共用同一段逐根計算。
+    """
+
+    def __init__(self, af_start: float = 0.02, af_step: float = 0.02, af_max: float = 0.2):
+        self.af_start = af_start
+        self.af_step = af_step
+        self.af_max = af_max
+        self._bars: List[Tuple[float, float, float]] = []   # 最近兩根的 (high, low, close)
+        self._sar = None
+        self._ep = None
+        self._af = None
+        self._rising = None
+
+    def update(self, close, high=None, low=None) -> SARValue:
+        high = close if high is None else high
+        low = close if low is None else low
+        bars = self._bars
+
+        if not bars:
+            bars.append((high, low, close))
+            return SARValue(_NAN, _NAN, _NAN, None)
+
+        if self._sar is None:
+            h0, l0, c0 = bars[0]
+            self._rising = close >= c0
+            if self._rising:
+                self._sar, self._ep = min(l0, low), max(h0, high)
+            else:
+                self._sar, self._ep = max(h0, high), min(l0, low)
+            self._af = self.af_start
+        else:
+            sar = self._sar + self._af * (self._ep - self._sar)
+            if self._rising:
+                sar = min(sar, *(b[1] for b in bars))
+                if low < sar:
+                    self._rising, sar, self._ep, self._af = False, self._ep, low, self.af_start
+                elif high > self._ep:
+                    self._ep = high
+                    self._af = min(self._af + self.af_step, self.af_max)
+            else:
+                sar = max(sar, *(b[0] for b in bars))
+                if high > sar:
+                    self._rising, sar, self._ep, self._af = True, self._ep, high, self.af_start
+                elif low < self._ep:
+                    self._ep = low
+                    self._af = min(self._af + self.af_step, self.af_max)
+            self._sar = sar
+
+        bars.append((high, low, close))
+        if len(bars) > 2:
+            bars.pop(0)
+        return SARValue(self._sar, self._ep, self._af, self._rising)
+
+    def batch(self, close, high=None, low=None) -> SARValue:
+        close = np.asarray(close, dtype=np.float64)
+        high = close if high is None else np.asarray(high, dtype=np.float64)
+        low = close if low is None else np.asarray(low, dtype=np.float64)
+        kernel = SAR(self.af_start, self.af_step, self.af_max)
+        values = [kernel.update(c, h, l) for c, h, l in zip(close.tolist(), high.tolist(), low.tolist())]
+        if not values:
+            return SARValue(*(np.empty(0) for _ in range(3)), np.empty(0, dtype=object))
+        sar, ep, af, rising = zip(*values)
+        return SARValue(np.array(sar), np.array(ep), np.array(af), np.array(rising, dtype=object))
+
+
+class CDP(Indicator):
+    """ 以本根 K 棒的高低收計算下一期的逆勢操作價位 """
+
+    def update(self, close, high=None, low=None) -> CDPValue:
+        high = close if high is None else high
+        low = close if low is None else low
+        cdp = (high + low + 2 * close) / 4
+        rng = high - low
+        return CDPValue(cdp, cdp + rng, 2 * cdp - low, 2 * cdp - high, cdp - rng)
+
+    def batch(self, close, high=None, low=None) -> CDPValue:
+        close = np.asarray(close, dtype=np.float64)
+        high = close if high is None else np.asarray(high, dtype=np.float64)
+        low = close if low is None else np.asarray(low, dtype=np.float64)
+        return self.update(close, high, low)
+
+
+class BBands(Indicator):
+    """ 布林通道，標準差為母體標準差，滑動視窗的變異數以增量方式更新 """
+
+    def __init__(self, n: int = 20, k: float = 2.0):
+        self.n = n
+        self.k = k
+        self._window = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, close, high=None, low=None) -> BBandsValue:
+        window = self._window
+        if len(window) < self.n:
+            window.append(close)
+            delta = close - self._mean
+            self._mean += delta / len(window)
+            self._m2 += delta * (close - self._mean)
+            if len(window) < self.n:
+                return BBandsValue(_NAN, _NAN, _NAN)
+        else:
+            old = window.popleft()
+            window.append(close)
+            old_mean = self._mean
+            self._mean += (close - old) / self.n
+            self._m2 += (close - old) * (close - self._mean + old - old_mean)
+
+        std = math.sqrt(max(self._m2, 0.0) / self.n)
+        return BBandsValue(self._mean, self._mean + self.k * std, self._mean - self.k * std)
+
+    def batch(self, close, high=None, low=None) -> BBandsValue:
+        close = np.asarray(close, dtype=np.float64)
+        ma = _rolling(close, self.n, np.mean, partial=False)
+        std = _rolling(close, self.n, np.std, partial=False)
+        return BBandsValue(ma, ma + self.k * std, ma - self.k * std)
+
+
+# 與 tech_analysis_api_v2 的 eTA_Type 相同的九種指標
+DEFAULT_INDICATORS: Dict[str, Callable[[], Indicator]] = {
+    "SMA": SMA,
+    "EMA": EMA,
+    "WMA": WMA,
+    "RSI": RSI,
+    "MACD": MACD,
+    "KD": KD,
+    "SAR": SAR,
+    "CDP": CDP,
+    "BBands": BBands,
+}
+
+
+class IndicatorEngine:
+    """
+    多檔股票的本地技術指標，取代 TechAnalysis.SubTA 的遠端計算。
+
+    以 on_bar 接 KBarAggregator 的 K 棒收盤事件，每根 K 棒只更新該股票
+    訂閱的指標；backfill 以歷史 K 棒暖機，batch 以向量化方式計算整段歷史。
+
+    Args:
+        indicators (Dict[str, Callable[[], Indicator]]): 指標名稱與建立函式，
+            預設為 DEFAULT_INDICATORS。
+        on_update (Callable[[str, str, KBar, Any], None]): 指標更新時的 callback，
+            參數為股票代號、指標名稱、K 棒與指標值。
+    """
+
+    def __init__(
+        self,
+        indicators: Dict[str, Callable[[], Indicator]] = None,
+        on_update: Callable[[str, str, KBar, Any], None] = None,
+    ):
+        self.indicators = dict(indicators or DEFAULT_INDICATORS)
+        self.on_update = on_update
+        self._subscriptions: Dict[str, Dict[str, Indicator]] = {}
+        self._values: Dict[str, Dict[str, Any]] = {}
+
+    def subscribe(self, symbol: str, names: Union[str, List[str]] = None):
+        names = list(self.indicators) if names is None else [names] if isinstance(names, str) else names
+        subs = self._subscriptions.setdefault(symbol, {})
+        self._values.setdefault(symbol, {})
+        for name in names:
+            if name not in subs:
+                subs[name] = self.indicators[name]()
+
+    def unsubscribe(self, symbol: str, names: Union[str, List[str]] = None):
+        if names is None:
+            self._subscriptions.pop(symbol, None)
+            self._values.pop(symbol, None)
+            return
+        for name in [names] if isinstance(names, str) else names:
+            self._subscriptions.get(symbol, {}).pop(name, None)
+            self._values.get(symbol, {}).pop(name, None)
+
+    def on_bar(self, bar: KBar):
+        subs = self._subscriptions.get(bar.symbol)
+        if not subs:
+            return
+        values = self._values[bar.symbol]
+        on_update = self.on_update
+        close, high, low = bar.close, bar.high, bar.low
+        for name, indicator in subs.items():
+            value = values[name] = indicator.update(close, high, low)
+            if on_update is not None:
+                on_update(bar.symbol, name, bar, value)
+
+    def backfill(self, symbol: str, bars: np.ndarray):
+        """ 以歷史 K 棒（KBAR_DTYPE）更新指標狀態，不觸發 on_update """
+        subs = self._subscriptions.get(symbol)
+        if not subs or not len(bars):
+            return
+        values = self._values[symbol]
+        rows = list(zip(bars["close"].tolist(), bars["high"].tolist(), bars["low"].tolist()))
+        for name, indicator in subs.items():
+            update = indicator.update
+            for close, high, low in rows:
+                values[name] = update(close, high, low)
+
+    def batch(self, bars: np.ndarray, names: List[str] = None) -> Dict[str, Any]:
+        """ 以向量化方式計算整段 K 棒（KBAR_DTYPE）的指標，不影響訂閱的狀態 """
+        names = list(self.indicators) if names is None else names
+        return {
+            name: self.indicators[name]().batch(bars["close"], bars["high"], bars["low"])
+            for name in names
+        }
+
+    def value(self, symbol: str, name: str) -> Any:
+        return self._values.get(symbol, {}).get(name)
+
+    def values(self, symbol: str) -> Dict[str, Any]:
+        return dict(self._values.get(symbol, {}))
@@ -0,0 +1,108 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Iterable, Iterator, List, NamedTuple, Union
+
+__all__ = ["IsinRow", "IsinRowParser", "iter_isin_rows"]
+
+
+class IsinRow(NamedTuple):
+    code: str
+    name: str
+    isin: str
+    list_date: str
+    market: str
+    industry: str
+
+
+class IsinRowParser(HTMLParser):
+    """
+    以事件方式解析 ISIN 頁面 class="h4" 的表格，不建立 DOM。
+
+    每收到完整的一列即放入 rows，呼叫端在每次 feed 之後取走；
+    分類標題等欄位數不是 7 的列與表頭會被略過。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[IsinRow] = []
+        self._in_table = False
+        self._row_index = -1
+        self._cells: List[str] = None
+        self._cell: List[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._in_table = ("class", "h4") in attrs
+            self._row_index = -1
+        elif not self._in_table:
+            return
+        elif tag == "tr":
+            self._end_row()
+            self._cells = []
+            self._row_index += 1
+        elif tag == "td" and self._cells is not None:
+            self._end_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if not self._in_table:
+            return
+        if tag == "td":
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table":
+            self._end_row()
+            self._in_table = False
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _end_cell(self):
+        if self._cell is not None:
+            self._cells.append("".join(self._cell))
+            self._cell = None
+
+    def _end_row(self):
+        if self._cells is None:
+            return
+        self._end_cell()
+        cells, self._cells = self._cells, None
+
+        # 第一列為表頭
+        if self._row_index == 0 or len(cells) != 7:
+            return
+
+        code, _, name = cells[0].partition("\u3000")
+        code = code.strip()
+        if code:
+            self.rows.append(IsinRow(code, name.strip(), cells[1], cells[2], cells[3], cells[4]))
+
+
+def iter_isin_rows(
+    source: Union[bytes, str, Iterable[bytes]],
+    encoding: str = "cp950",
+) -> Iterator[IsinRow]:
+    """
+    邊解碼邊解析 ISIN 頁面，依序回傳每一列。
+
+    Args:
+        source (Union[bytes, str, Iterable[bytes]]): 整頁內容，或分段的位元組，
+            例如 response.iter_content() 或逐塊讀取的檔案。
+        encoding (str): 頁面編碼，cp950 可涵蓋 big5 沒有的字。
+    """
+    if isinstance(source, (bytes, str)):
+        source = [source]
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = IsinRowParser()
+    for chunk in source:
+        parser.feed(chunk if isinstance(chunk, str) else decoder.decode(chunk))
+        if parser.rows:
+            yield from parser.rows
+            parser.rows.clear()
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.rows
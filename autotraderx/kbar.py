@@ -0,0 +1,225 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Union
+
+import numpy as np
+
+from .trade_data import TradeData
+from .utils import match_time_to_us, us_to_match_time
+
+__all__ = ["KBar", "KBarAggregator", "KBAR_DTYPE", "parse_interval", "resample_trade_data"]
+
+
+KBAR_DTYPE = np.dtype([
+    ("start", "<i8"),     # K 棒起始時間（當日微秒數）
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<i8"),
+    ("ticks", "<i8"),     # 成交筆數
+])
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_interval(interval: Union[int, str]) -> int:
+    """ K 棒週期轉為秒數，可為秒數或 "30s"、"5m"、"1h" """
+    if isinstance(interval, str):
+        unit = interval[-1].lower()
+        if unit in _UNITS:
+            seconds = int(float(interval[:-1]) * _UNITS[unit])
+        else:
+            seconds = int(interval)
+    else:
+        seconds = int(interval)
+    if seconds <= 0:
+        raise ValueError(f"Invalid interval: {interval}")
+    return seconds
+
+
+class KBar:
+
+    __slots__ = ("symbol", "date", "start", "end", "open", "high", "low", "close", "volume", "ticks")
+
+    def __init__(self, symbol: str, date: str, start: int, end: int, price: float, qty: int):
+        self.symbol = symbol
+        self.date = date
+        self.start = start      # 當日微秒數，含
+        self.end = end          # 當日微秒數，不含
+        self.open = price
+        self.high = price
+        self.low = price
+        self.close = price
+        self.volume = qty
+        self.ticks = 1
+
+    @property
+    def start_time(self) -> str:
+        return us_to_match_time(self.start)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "股票代號": self.symbol,
+            "日期": self.date,
+            "時間": self.start_time,
+            "開盤價": self.open,
+            "最高價": self.high,
+            "最低價": self.low,
+            "收盤價": self.close,
+            "成交量": self.volume,
+            "成交筆數": self.ticks,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"KBar({self.symbol} {self.date or ''} {self.start_time}, O={self.open}, H={self.high}, "
+            f"L={self.low}, C={self.close}, V={self.volume})"
+        )
+
+
+class KBarAggregator:
+    """
+    由逐筆成交即時合成多檔股票的 K 棒。
+
+    每筆成交只更新該股票目前的 K 棒；成交時間跨入下一個週期時，
+    先前的 K 棒收盤並呼叫 on_bar。週期以 session_start 對齊，
+    沒有成交的週期不產生 K 棒。
+
+    可直接接 QuotationSystem/ReplayEngine 的 ProductTick、BacktestEngine
+    的 BacktestTick，或以 feed 送入 TradeData。
+
+    Args:
+        interval (Union[int, str]): K 棒週期，秒數或 "1m"、"5m" 等。
+        on_bar (Callable[[KBar], None]): K 棒收盤時的 callback。
+        session_start (str): 週期的對齊時間，格式為 HH:MM。
+        history_size (int): 每檔股票保留的已收盤 K 棒數量。
+        skip_try_match (bool): 是否略過試搓成交。
+    """
+
+    def __init__(
+        self,
+        interval: Union[int, str] = "1m",
+        on_bar: Callable[[KBar], None] = None,
+        session_start: str = "09:00",
+        history_size: int = 1000,
+        skip_try_match: bool = True,
+    ):
+        self.interval = parse_interval(interval) * 1000000
+        self.origin = match_time_to_us(f"{session_start}:00")
+        self.on_bar = on_bar
+        self.history_size = history_size
+        self.skip_try_match = skip_try_match
+
+        self._current: Dict[str, KBar] = {}
+        self._history: Dict[str, Deque[KBar]] = {}
+
+    def update(self, symbol: str, time_us: int, price: float, qty: int, date: str = None) -> KBar:
+        """ 加入一筆成交，若因此有 K 棒收盤則回傳該 K 棒 """
+        bar = self._current.get(symbol)
+        if bar is not None and time_us < bar.end and date == bar.date:
+            if price > bar.high:
+                bar.high = price
+            elif price < bar.low:
+                bar.low = price
+            bar.close = price
+            bar.volume += qty
+            bar.ticks += 1
+            return None
+
+        start = time_us - (time_us - self.origin) % self.interval
+        self._current[symbol] = KBar(symbol, date, start, start + self.interval, price, qty)
+        if bar is not None:
+            self._close(bar)
+        return bar
+
+    def on_match(self, data: Any, date: str = None) -> KBar:
+        """ 接收 ProductTick 或 BacktestTick """
+        if self.skip_try_match and getattr(data, "IsTxTrail", False):
+            return None
+        time_us = getattr(data, "time_us", None)
+        if time_us is None:
+            time_us = match_time_to_us(data.MatchTime)
+        return self.update(
+            data.Symbol,
+            time_us,
+            float(data.MatchPrice),
+            int(data.MatchQty),
+            getattr(data, "date", date),
+        )
+
+    def feed(self, data: TradeData) -> List[KBar]:
+        """ 依序送入一份 TradeData，回傳過程中收盤的 K 棒 """
+        array = data.array[~data.array["try_match"]] if self.skip_try_match else data.array
+        closed = []
+        update = self.update
+        symbol, date = data.symbol, data.date
+        for t, p, q in zip(array["time"].tolist(), array["price"].tolist(), array["qty"].tolist()):
+            bar = update(symbol, t, p, q, date)
+            if bar is not None:
+                closed.append(bar)
+        return closed
+
+    def advance(self, time_us: int, date: str = None) -> List[KBar]:
+        """ 以時鐘驅動收盤：結束時間不晚於 time_us 的 K 棒全部收盤 """
+        closed = [
+            bar for bar in list(self._current.values())
+            if bar.end <= time_us or (date is not None and bar.date != date)
+        ]
+        for bar in closed:
+            del self._current[bar.symbol]
+            self._close(bar)
+        return closed
+
+    def flush(self) -> List[KBar]:
+        """ 收盤時將所有未完成的 K 棒收盤 """
+        closed = list(self._current.values())
+        self._current.clear()
+        for bar in closed:
+            self._close(bar)
+        return closed
+
+    def _close(self, bar: KBar):
+        history = self._history.get(bar.symbol)
+        if history is None:
+            history = self._history[bar.symbol] = deque(maxlen=self.history_size)
+        history.append(bar)
+        if self.on_bar is not None:
+            self.on_bar(bar)
+
+    def current(self, symbol: str) -> KBar:
+        """ 尚未收盤的 K 棒 """
+        return self._current.get(symbol)
+
+    def bars(self, symbol: str) -> List[KBar]:
+        """ 已收盤的 K 棒，由舊到新 """
+        return list(self._history.get(symbol, ()))
+
+
+def resample_trade_data(
+    data: TradeData,
+    interval: Union[int, str] = "1m",
+    session_start: str = "09:00",
+    skip_try_match: bool = True,
+) -> np.ndarray:
+    """ 以向量化方式將整份 TradeData 轉為 K 棒（KBAR_DTYPE），結果與 KBarAggregator 相同 """
+    array = data.array[~data.array["try_match"]] if skip_try_match else data.array
+    if not len(array):
+        return np.empty(0, dtype=KBAR_DTYPE)
+
+    interval = parse_interval(interval) * 1000000
+    origin = match_time_to_us(f"{session_start}:00")
+    times = array["time"]
+    prices = array["price"]
+    starts = times - (times - origin) % interval
+
+    # 成交依時間排序，週期改變處即為新 K 棒的起點
+    idx = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    bars = np.empty(len(idx), dtype=KBAR_DTYPE)
+    bars["start"] = starts[idx]
+    bars["open"] = prices[idx]
+    bars["high"] = np.maximum.reduceat(prices, idx)
+    bars["low"] = np.minimum.reduceat(prices, idx)
+    bars["close"] = prices[np.r_[idx[1:] - 1, len(prices) - 1]]
+    bars["volume"] = np.add.reduceat(array["qty"], idx)
+    bars["ticks"] = np.diff(np.r_[idx, len(prices)])
+    return bars
@@ -0,0 +1,168 @@
+import math
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ["DepthSnapshot", "DepthBook", "MarketDepth"]
+
+
+_NAN = float("nan")
+
+
+def _to_floats(values: Sequence[Any], n: int) -> List[float]:
+    """ 轉為 n 個 float，空字串或無法轉換的值為 0，不足 n 檔時補 0 """
+    values = values[:n]
+    try:
+        result = [float(v or 0) for v in values]
+    except (TypeError, ValueError):
+        result = []
+        for v in values:
+            try:
+                result.append(float(v or 0))
+            except (TypeError, ValueError):
+                result.append(0.0)
+    if len(result) < n:
+        result.extend([0.0] * (n - len(result)))
+    return result
+
+
+class DepthSnapshot(NamedTuple):
+    symbol: str
+    time: str                          # OrderBookTime
+    seq: int                           # 第幾次更新
+    bid_prices: Tuple[float, ...]
+    bid_qtys: Tuple[float, ...]
+    ask_prices: Tuple[float, ...]
+    ask_qtys: Tuple[float, ...]
+    mid: float
+    spread: float
+    imbalance: float                   # (買量 - 賣量) / (買量 + 賣量)，五檔合計
+    microprice: float                  # 以最佳一檔委託量加權的價格
+
+    @property
+    def best_bid(self) -> float:
+        return self.bid_prices[0]
+
+    @property
+    def best_ask(self) -> float:
+        return self.ask_prices[0]
+
+
+class DepthBook:
+    """
+    單一股票的五檔行情。
+
+    各檔價量存在一個 array('d')，每次更新後建立新的 DepthSnapshot
+    並以單一指定替換 self.snapshot；讀取端直接取用 snapshot，
+    拿到的一定是某次更新後完整的狀態，不需要加鎖。
+    最佳一檔未變動時沿用上次的 mid、spread 與 microprice。
+    """
+
+    __slots__ = ("symbol", "levels", "_data", "_seq", "snapshot")
+
+    def __init__(self, symbol: str, levels: int = 5):
+        self.symbol = symbol
+        self.levels = levels
+        # 依序為買價、買量、賣價、賣量，各 levels 檔
+        self._data = array("d", bytes(8 * 4 * levels))
+        self._seq = 0
+        empty = (0.0,) * levels
+        self.snapshot = DepthSnapshot(symbol, "", 0, empty, empty, empty, empty, _NAN, _NAN, _NAN, _NAN)
+
+    def update(
+        self,
+        bid_prices: Sequence[Any],
+        bid_qtys: Sequence[Any],
+        ask_prices: Sequence[Any],
+        ask_qtys: Sequence[Any],
+        time: str = "",
+    ) -> DepthSnapshot:
+        n = self.levels
+        data = self._data
+        bp = _to_floats(bid_prices, n)
+        bq = _to_floats(bid_qtys, n)
+        ap = _to_floats(ask_prices, n)
+        aq = _to_floats(ask_qtys, n)
+
+        prev = self.snapshot
+        top_changed = (
+            data[0] != bp[0] or data[n] != bq[0]
+            or data[2 * n] != ap[0] or data[3 * n] != aq[0]
+        )
+        data[0:n] = array("d", bp)
+        data[n:2 * n] = array("d", bq)
+        data[2 * n:3 * n] = array("d", ap)
+        data[3 * n:4 * n] = array("d", aq)
+
+        if top_changed:
+            mid, spread, microprice = self._top_of_book(bp[0], bq[0], ap[0], aq[0])
+        else:
+            mid, spread, microprice = prev.mid, prev.spread, prev.microprice
+
+        bid_total = math.fsum(bq)
+        ask_total = math.fsum(aq)
+        total = bid_total + ask_total
+        imbalance = (bid_total - ask_total) / total if total > 0 else _NAN
+
+        self._seq += 1
+        snapshot = DepthSnapshot(
+            self.symbol, time, self._seq, tuple(bp), tuple(bq), tuple(ap), tuple(aq),
+            mid, spread, imbalance, microprice,
+        )
+        self.snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _top_of_book(bid: float, bid_qty: float, ask: float, ask_qty: float) -> Tuple[float, float, float]:
+        # 漲跌停或單邊無委託時，沒有合理的中價
+        if bid <= 0 or ask <= 0:
+            return _NAN, _NAN, _NAN
+        mid = (bid + ask) / 2
+        qty = bid_qty + ask_qty
+        microprice = (bid * ask_qty + ask * bid_qty) / qty if qty > 0 else mid
+        return mid, ask - bid, microprice
+
+    def to_numpy(self) -> np.ndarray:
+        """ (4, levels) 的陣列：買價、買量、賣價、賣量 """
+        return np.frombuffer(self._data, dtype=np.float64).reshape(4, self.levels).copy()
+
+
+class MarketDepth:
+    """
+    多檔股票的五檔行情，以股票代號取得各自的 DepthBook。
+
+    on_order_book 可直接作為 MarketDataMart.OnOrderBook 的 callback，
+    ProductTick 與 ReplayTick 皆可。
+    """
+
+    def __init__(self, levels: int = 5):
+        self.levels = levels
+        self._books: Dict[str, DepthBook] = {}
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._books
+
+    def __iter__(self) -> Iterator[DepthBook]:
+        return iter(list(self._books.values()))
+
+    def book(self, symbol: str) -> DepthBook:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books.setdefault(symbol, DepthBook(symbol, self.levels))
+        return book
+
+    def on_order_book(self, data: Any) -> DepthSnapshot:
+        return self.book(data.Symbol).update(
+            data.BuyPrice, data.BuyQty, data.SellPrice, data.SellQty, data.OrderBookTime
+        )
+
+    def snapshot(self, symbol: str) -> DepthSnapshot:
+        book = self._books.get(symbol)
+        return None if book is None else book.snapshot
+
+    def snapshots(self) -> Dict[str, DepthSnapshot]:
+        return {symbol: book.snapshot for symbol, book in list(self._books.items())}
@@ -1,3 +1,5 @@
+from .aio import AsyncBackTesting, AsyncQuotation, AsyncTrader
 from .backtesting import BackTesting
 from .quotation import QuotationSystem
+from .replay import ReplayEngine, ReplayMarketDataMart
 from .trader import Trader
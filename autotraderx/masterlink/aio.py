@@ -0,0 +1,228 @@
+import asyncio
+import functools
+import threading
+from typing import Any, AsyncIterator, Dict, Iterable, List, Union
+
+from ..aio import AsyncStream
+from ..bulk_fetch import FetchResult
+from ..market_depth import DepthSnapshot
+from ..trade_data import TradeData
+from .backtesting import BackTesting
+from .basics import SymbolBasic
+from .order_state import OrderState
+from .quotation import QuotationSystem
+from .trader import CancelReport, OrderAck, Trader
+
+__all__ = ["AsyncQuotation", "AsyncTrader", "AsyncBackTesting"]
+
+
+async def _run_blocking(fn, *args, **kwargs):
+    """ 在預設的 thread pool 執行阻塞的 SDK 呼叫 """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+def _symbol_filter(symbols: Iterable[str]):
+    return None if symbols is None else frozenset([symbols] if isinstance(symbols, str) else symbols)
+
+
+class AsyncQuotation:
+    """
+    QuotationSystem 的 asyncio 介面。
+
+    行情 callback 在 SDK 執行緒中只把資料交給事件迴圈，ticks 與 order_books
+    以非同步迭代器取得；同一時間可以有多個迭代器，各自可只接收部分股票。
+
+        async with AsyncQuotation(QuotationSystem(user, password, subscribe_list=["2330"])) as quote:
+            async for tick in quote.ticks("2330"):
+                ...
+    """
+
+    def __init__(self, quotation: QuotationSystem):
+        self.quotation = quotation
+
+    async def start(self):
+        await _run_blocking(self.quotation.start)
+
+    async def close(self):
+        await _run_blocking(self.quotation.close)
+
+    async def subscribe(self, prod_code: str):
+        await _run_blocking(self.quotation.subscribe, prod_code)
+
+    async def __aenter__(self) -> "AsyncQuotation":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _stream(self, event: str, symbols: Iterable[str], attr: str, maxsize: int) -> AsyncStream:
+        symbols = _symbol_filter(symbols)
+
+        def listener(data):
+            if symbols is None or getattr(data, attr) in symbols:
+                stream.push(data)
+
+        stream = AsyncStream(maxsize, on_close=lambda: self.quotation.remove_listener(event, listener))
+        self.quotation.add_listener(event, listener)
+        return stream
+
+    def ticks(self, symbols: Union[str, Iterable[str]] = None, maxsize: int = 0) -> AsyncStream:
+        """ 成交行情（ProductTick）的非同步迭代器，close 後結束 """
+        return self._stream("match", symbols, "Symbol", maxsize)
+
+    def order_books(self, symbols: Union[str, Iterable[str]] = None, maxsize: int = 1000) -> AsyncStream:
+        """ 五檔行情（DepthSnapshot）的非同步迭代器；讀取落後時丟棄最舊的快照 """
+        return self._stream("order_book", symbols, "symbol", maxsize)
+
+    def snapshot(self, symbol: str) -> DepthSnapshot:
+        return self.quotation.depth.snapshot(symbol)
+
+
+class AsyncTrader:
+    """
+    Trader 的 asyncio 介面。
+
+    委託以 set_orders 送出後直接 await 其 Future，不佔用執行緒等待回報；
+    需要等待券商回覆的查詢在 thread pool 中執行。reports 回傳委託與成交回報
+    （ReportOrder）的非同步迭代器。
+    """
+
+    def __init__(self, trader: Trader):
+        self.trader = trader
+
+    async def login(self):
+        await _run_blocking(self.trader.login)
+
+    async def stop(self):
+        await _run_blocking(self.trader.stop)
+
+    async def __aenter__(self) -> "AsyncTrader":
+        await self.login()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def set_order(self, **kwargs) -> OrderAck:
+        """ 送出一筆委託並等待第一筆回報，參數與 Trader.set_order 相同 """
+        return (await self.set_orders([kwargs], return_exceptions=False))[0]
+
+    async def set_orders(
+        self,
+        orders: List[Dict[str, Any]],
+        return_exceptions: bool = True,
+    ) -> List[Union[OrderAck, Exception]]:
+        # 限價單可能需要先查詢漲跌停，送出的部分在 thread pool 執行
+        futures = await _run_blocking(self.trader.set_orders, orders)
+        return await asyncio.gather(
+            *[asyncio.wrap_future(f) for f in futures], return_exceptions=return_exceptions
+        )
+
+    async def _wait_amend(self, future, timeout: float = None):
+        # 排隊中的改單可能與其他改單共用 Future，逾時不取消它
+        timeout = self.trader.query_timeout if timeout is None else timeout
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+    async def change_price(self, order_number: str, mod_price: float, timeout: float = None):
+        """ 改價，回傳送出結果 RCode，逾時拋出 asyncio.TimeoutError """
+        return await self._wait_amend(self.trader.change_price_future(order_number, mod_price), timeout)
+
+    async def change_qty(self, order_number: str, mod_qty: int, timeout: float = None):
+        return await self._wait_amend(self.trader.change_qty_future(order_number, mod_qty), timeout)
+
+    async def cancel_order(self, order_number: str, timeout: float = None) -> OrderState:
+        """ 刪單並等待委託結束，逾時拋出 asyncio.TimeoutError """
+        timeout = self.trader.query_timeout if timeout is None else timeout
+        future = self.trader.cancel_order_future(order_number)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.trader.trader.discard_close(order_number, future)
+            raise
+
+    async def cancel_orders(self, symbol: str = None, timeout: float = None) -> CancelReport:
+        return await _run_blocking(self.trader.cancel_orders, symbol, timeout)
+
+    async def cancel_all(self, timeout: float = None) -> CancelReport:
+        return await _run_blocking(self.trader.cancel_all, timeout)
+
+    async def get_basic(self, symbol: str, timeout: float = None) -> SymbolBasic:
+        return await _run_blocking(self.trader.get_basic, symbol, timeout)
+
+    async def get_inventory(self, timeout: float = None) -> Dict[str, Dict[str, str]]:
+        return await self.trader.get_inventory_async(timeout)
+
+    async def get_trade_report(self) -> List[Dict[str, Union[str, int]]]:
+        return await self.trader.get_trade_report_async()
+
+    async def get_order_report(self) -> List[Dict[str, Union[str, int]]]:
+        return await self.trader.get_order_report_async()
+
+    def get_open_orders(self, symbol: str = None) -> List[OrderState]:
+        return self.trader.get_open_orders(symbol)
+
+    def reports(self, symbols: Union[str, Iterable[str]] = None, maxsize: int = 0) -> AsyncStream:
+        """ 之後收到的委託與成交回報（ReportOrder）的非同步迭代器，close 後結束 """
+        symbols = _symbol_filter(symbols)
+        market_trader = self.trader.trader
+
+        class _Collector:
+            def append(self, data):
+                if symbols is None or data.order.symbol in symbols:
+                    stream.push(data)
+
+        collector = _Collector()
+        stream = AsyncStream(maxsize, on_close=lambda: market_trader.remove_report_collector(collector))
+        market_trader.add_report_collector(collector)
+        return stream
+
+
+class AsyncBackTesting:
+    """
+    BackTesting 的 asyncio 介面，查詢在 thread pool 中執行。
+
+    以 create 建立時，登入等待連線的過程也不會阻塞事件迴圈。
+    """
+
+    def __init__(self, backtesting: BackTesting):
+        self.backtesting = backtesting
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> "AsyncBackTesting":
+        """ 參數與 BackTesting 相同 """
+        return cls(await _run_blocking(BackTesting, *args, **kwargs))
+
+    async def get_data(self, prod_id: str, date: str, columnar: bool = False):
+        return await _run_blocking(self.backtesting.get_data, prod_id, date, columnar)
+
+    async def fetch(self, prod_id: str, date: str) -> TradeData:
+        return await _run_blocking(self.backtesting.fetch, prod_id, date)
+
+    async def get_data_bulk(self, prod_ids: List[str], dates: List[str], **kwargs) -> AsyncIterator[FetchResult]:
+        """ 依完成順序產生 FetchResult，參數與 BackTesting.get_data_bulk 相同 """
+        kwargs.setdefault("progress", False)
+        stream = AsyncStream()
+        # 讀取端提前結束（break、例外、取消）時通知背景執行緒停止查詢
+        stop = threading.Event()
+
+        def produce():
+            results = self.backtesting.get_data_bulk(prod_ids, dates, **kwargs)
+            try:
+                for result in results:
+                    if stop.is_set():
+                        break
+                    stream.push(result)
+            finally:
+                results.close()
+                stream.close()
+
+        task = asyncio.get_running_loop().run_in_executor(None, produce)
+        try:
+            async for result in stream:
+                yield result
+        finally:
+            stop.set()
+            stream.close()
+            await task
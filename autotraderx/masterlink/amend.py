@@ -0,0 +1,258 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+from ..utils import match_time_to_us
+from .order_state import OrderState
+
+__all__ = ["AmendManager"]
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _time_of_day_us(t: float) -> int:
+    lt = time.localtime(t)
+    return ((lt.tm_hour * 60 + lt.tm_min) * 60 + lt.tm_sec) * 1000000 + int(t % 1 * 1000000)
+
+
+def _report_time_us(order: Any) -> int:
+    """ 回報的委託時間（trxTime）轉為當日微秒數，沒有或無法解析時回傳 None """
+    try:
+        return match_time_to_us(order.trxTime)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _AmendState:
+
+    __slots__ = ("in_flight", "sent_at", "sent_us", "seq", "timer", "pending")
+
+    def __init__(self):
+        self.in_flight: Tuple[str, Any] = None                 # (kind, value)
+        self.sent_at = 0.0
+        self.sent_us = 0                                       # 送出時的當日微秒數，與回報時間比較
+        self.seq = 0                                           # 第幾筆送出的改單，用於辨識逾時的是哪一筆
+        self.timer: threading.Timer = None
+        self.pending: Dict[str, Tuple[Any, Future]] = {}       # kind -> (value, future)
+
+
+class AmendManager:
+    """
+    以委託書號管理改價與改量，每筆委託同時只有一筆改單在途。
+
+    改單送出後，收到 OnChangeReply，或收到送出後的非成交回報且委託價格
+    （改量時為剩餘股數）已是目標值、或改單被拒絕時才視為已確認；確認前再次
+    改單只會更新排隊中的目標值，確認後只送出最後一次。SDK 不一定會呼叫
+    OnChangeReply，因此也以 OnReport 的委託回報為準；QryRepAll 重送的舊回報
+    依委託時間（trxTime）排除。超過 ack_timeout 仍未確認的改單視為遺失，
+    由計時器送出排隊中的下一筆。委託結束（全部成交、刪單、拒絕）時，
+    排隊中的改單一併取消。
+
+    Args:
+        send (Callable[[str, str, Any], Future]): 送出改單的函式，參數為
+            (委託書號, "price" 或 "qty", 目標值)，回傳結果為 RCode 的 Future。
+        ok_code (Any): 送出成功的 RCode；其他結果不會有回報，直接送出下一筆。
+        ack_timeout (float): 等待確認的秒數上限。
+        clock_skew (float): 本機與券商時鐘的容許誤差秒數，委託時間早於
+            送出時間超過此值的回報不視為確認。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str, Any], Future],
+        ok_code: Any = None,
+        ack_timeout: float = 2.0,
+        clock_skew: float = 1.0,
+    ):
+        self._send = send
+        self.ok_code = ok_code
+        self.ack_timeout = ack_timeout
+        self.clock_skew = clock_skew
+        self._lock = threading.Lock()
+        self._orders: Dict[str, _AmendState] = {}
+        self.n_requests = 0
+        self.n_sent = 0
+        self.n_coalesced = 0
+        self.n_acked = 0
+        self.n_timeout = 0
+        self.n_dropped = 0
+        self.ack_latency_total = 0.0
+        self.ack_latency_max = 0.0
+
+    def submit(self, ordNo: str, kind: str, value: Any) -> Future:
+        """ 改單，回傳送出該目標值的 RCode；被後來的改單取代時與其共用同一個 Future """
+        with self._lock:
+            self.n_requests += 1
+            state = self._orders.get(ordNo)
+            if state is None:
+                state = self._orders[ordNo] = _AmendState()
+
+            pending = state.pending.get(kind)
+            if pending is not None:
+                self.n_coalesced += 1
+                future = pending[1]
+            else:
+                future = Future()
+            state.pending[kind] = (value, future)
+
+        self._dispatch(ordNo)
+        return future
+
+    def drop(self, ordNo: str) -> int:
+        """ 取消排隊中的改單，例如即將刪單時；回傳取消的筆數 """
+        with self._lock:
+            state = self._orders.get(ordNo)
+            if state is None:
+                return 0
+            dropped = list(state.pending.values())
+            state.pending.clear()
+            self.n_dropped += len(dropped)
+        for _, future in dropped:
+            future.cancel()
+        return len(dropped)
+
+    def _dispatch(self, ordNo: str):
+        with self._lock:
+            state = self._orders.get(ordNo)
+            if state is None or state.in_flight is not None or not state.pending:
+                return
+            kind = next(iter(state.pending))
+            value, future = state.pending.pop(kind)
+            state.in_flight = (kind, value)
+            state.sent_at = time.perf_counter()
+            state.sent_us = _time_of_day_us(time.time())
+            state.seq += 1
+            seq = state.seq
+            self.n_sent += 1
+            state.timer = threading.Timer(self.ack_timeout, self._expire, (ordNo, seq))
+            state.timer.daemon = True
+            state.timer.start()
+
+        try:
+            sent = self._send(ordNo, kind, value)
+        except Exception as e:
+            sent = Future()
+            sent.set_exception(e)
+        sent.add_done_callback(lambda f: self._on_sent(ordNo, seq, future, f))
+
+    def _clear_in_flight(self, state: _AmendState):
+        # 需持有 self._lock
+        state.in_flight = None
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+    def _release(self, ordNo: str, seq: int) -> bool:
+        """ 第 seq 筆改單仍在途時清除，回傳是否清除 """
+        with self._lock:
+            state = self._orders.get(ordNo)
+            if state is None or state.in_flight is None or state.seq != seq:
+                return False
+            self._clear_in_flight(state)
+            return True
+
+    def _expire(self, ordNo: str, seq: int):
+        # 逾時未確認的改單視為遺失，送出排隊中的下一筆
+        if self._release(ordNo, seq):
+            with self._lock:
+                self.n_timeout += 1
+            self._dispatch(ordNo)
+
+    def _on_sent(self, ordNo: str, seq: int, future: Future, sent: Future):
+        if sent.cancelled() or sent.exception() is not None:
+            # 沒有送出的改單不會有回報，直接送出下一筆
+            self._release(ordNo, seq)
+            if sent.cancelled():
+                future.cancel()
+            elif not future.done():
+                future.set_exception(sent.exception())
+            self._dispatch(ordNo)
+            return
+
+        rc = sent.result()
+        if not future.done():
+            future.set_result(rc)
+        if self.ok_code is not None and rc != self.ok_code:
+            self._release(ordNo, seq)
+            self._dispatch(ordNo)
+
+    def _is_ack(self, data: Any, state: OrderState, amend: _AmendState) -> bool:
+        """ 委託回報是否反映在途的改單 """
+        order = data.order
+        if order.tableName == "RPT:TwsDeal":
+            return False
+        report_us = _report_time_us(order)
+        if report_us is not None and report_us < amend.sent_us - self.clock_skew * 1000000:
+            return False
+        if state.request_rejected:
+            # 改單被拒絕只結束在途的改單，委託仍在
+            return True
+        kind, value = amend.in_flight
+        if kind == "price":
+            price, target = _to_float(order.price), _to_float(value)
+            return price is not None and target is not None and abs(price - target) < 1e-6
+        # 改量只會減少剩餘股數，剩餘股數不超過目標值即已生效
+        return state.leaves_qty <= int(value)
+
+    def on_report(self, data: Any, state: OrderState, reply: bool = False):
+        """ 套用 OrderStateBook 更新後的委託回報；reply 為 True 表示來自 OnChangeReply """
+        if state is None:
+            return
+        ordNo = state.ordNo
+        with self._lock:
+            amend = self._orders.get(ordNo)
+            if amend is None:
+                return
+
+            if amend.in_flight is not None and (reply or self._is_ack(data, state, amend)):
+                latency = time.perf_counter() - amend.sent_at
+                self.n_acked += 1
+                self.ack_latency_total += latency
+                self.ack_latency_max = max(self.ack_latency_max, latency)
+                self._clear_in_flight(amend)
+
+            if state.is_open:
+                finished = ()
+            else:
+                finished = list(amend.pending.values())
+                self.n_dropped += len(finished)
+                self._clear_in_flight(amend)
+                del self._orders[ordNo]
+
+        for _, future in finished:
+            future.cancel()
+        if state.is_open:
+            self._dispatch(ordNo)
+
+    def close(self):
+        """ 停止所有計時器並取消排隊中的改單 """
+        with self._lock:
+            orders = list(self._orders.values())
+            self._orders.clear()
+            for amend in orders:
+                self._clear_in_flight(amend)
+        for amend in orders:
+            for _, future in amend.pending.values():
+                future.cancel()
+
+    def in_flight(self, ordNo: str) -> Tuple[str, Any]:
+        amend = self._orders.get(ordNo)
+        return None if amend is None else amend.in_flight
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.n_requests,
+            "sent": self.n_sent,
+            "coalesced": self.n_coalesced,
+            "acked": self.n_acked,
+            "timeout": self.n_timeout,
+            "dropped": self.n_dropped,
+            "ack_latency_avg": self.ack_latency_total / self.n_acked if self.n_acked else 0.0,
+            "ack_latency_max": self.ack_latency_max,
+        }
@@ -1,9 +1,18 @@
 import threading
+from typing import Any, Dict, Iterator, List, Union
 
 from tech_analysis_api_v2.api import TechAnalysis
 from tech_analysis_api_v2.model import *
 
-event = threading.Event()
+from ..bulk_fetch import FetchResult, fetch_many
+from ..rate_limit import TokenBucket
+from ..trade_cache import TradeCache
+from ..trade_data import TradeData
+from ..utils import now
+
+
+# GetHisBS_Stock 查詢當日資料時的錯誤訊息
+_ERR_TODAY = "不能回補當天"
 
 
 def OnDigitalSSOEvent(aIsOK, aMsg):
@@ -12,8 +21,6 @@ def OnDigitalSSOEvent(aIsOK, aMsg):
 
 def OnTAConnStuEvent(aIsOK):
     print(f'OnTAConnStuEvent: {aIsOK}')
-    if aIsOK:
-        event.set()
 
 
 class BackTesting:
@@ -22,19 +29,53 @@ class BackTesting:
         self,
         user: str,
         password: str,
+        cache: TradeCache = None,  # 歷史成交資料的本機快取
+        offline: bool = False,     # 只讀快取，不登入也不連線
+        login_timeout: float = None,  # 等待連線的秒數上限，預設一直等待
     ):
         self.user = user
         self.password = password
-        self.tech_analysis = TechAnalysis(OnDigitalSSOEvent, OnTAConnStuEvent, None, None)
+        self.cache = cache
+        self.offline = offline
+        self.tech_analysis = None
+        self.login_timeout = login_timeout
+        # 每個實例各自等待自己的連線結果
+        self._connected = threading.Event()
+
+        if self.offline and self.cache is None:
+            raise ValueError("Offline mode requires a cache.")
+
+        if not self.offline:
+            self.login()
+
+    def login(self):
+        self.tech_analysis = TechAnalysis(OnDigitalSSOEvent, self._on_conn_status, None, None)
         self.tech_analysis.Login(self.user, self.password)
-        event.wait()
+        if not self._connected.wait(self.login_timeout):
+            raise TimeoutError(f"TechAnalysis login timed out after {self.login_timeout}s.")
+
+    def _on_conn_status(self, aIsOK):
+        OnTAConnStuEvent(aIsOK)
+        if aIsOK:
+            self._connected.set()
+
+    def get_data(
+        self,
+        prod_id: str,
+        date: str,
+        columnar: bool = False,  # 是否回傳欄位式的 TradeData
+    ) -> Union[List[Dict[str, Any]], TradeData]:
+        if self.cache is not None:
+            return self._get_cached_data(prod_id, date, columnar)
 
-    def get_data(self, prod_id: str, date: str):
         _data, err_msg = self.tech_analysis.GetHisBS_Stock(prod_id, date)
 
         if err_msg != "":
             print(err_msg)
-            return []
+            return TradeData.empty(prod_id, date) if columnar else []
+
+        if columnar:
+            return TradeData.from_objects(prod_id, _data, date)
 
         data = [
             {
@@ -48,3 +89,79 @@ class BackTesting:
         ]
 
         return data
+
+    def _get_cached_data(self, prod_id: str, date: str, columnar: bool):
+        data = self.cache.get(prod_id, date)
+
+        if data is None:
+            if self.offline:
+                print(f"No cached data for {prod_id} on {date} (offline mode).")
+                data = TradeData.empty(prod_id, date)
+            else:
+                data = self.get_data_uncached(prod_id, date)
+
+        return data if columnar else data.records
+
+    def get_data_uncached(self, prod_id: str, date: str) -> TradeData:
+        try:
+            return self.fetch(prod_id, date)
+        except (RuntimeError, ValueError) as e:
+            print(e)
+            return TradeData.empty(prod_id, date)
+
+    def fetch(self, prod_id: str, date: str) -> TradeData:
+        """
+        向券商查詢並寫入快取；當日資料尚未收盤，不寫入快取。
+        查詢當日資料時拋出 ValueError，其他查詢失敗拋出 RuntimeError。
+        """
+        _data, err_msg = self.tech_analysis.GetHisBS_Stock(prod_id, date)
+
+        if err_msg == _ERR_TODAY:
+            raise ValueError(f"{prod_id} {date}: {err_msg}")
+        if err_msg != "":
+            raise RuntimeError(f"{prod_id} {date}: {err_msg}")
+
+        data = TradeData.from_objects(prod_id, _data, date)
+        if self.cache is not None and date < now("%Y%m%d"):
+            self.cache.put(prod_id, date, data)
+
+        return data
+
+    def get_data_bulk(
+        self,
+        prod_ids: List[str],
+        dates: List[str],
+        max_workers: int = 4,
+        max_requests_per_sec: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        progress: bool = True,
+    ) -> Iterator[FetchResult]:
+        """
+        並行查詢多檔股票、多個交易日的歷史成交，依完成順序回傳 FetchResult，
+        其 key 為 (prod_id, date)、data 為 TradeData。快取命中者直接回傳，不佔用查詢額度。
+        只有逾時與連線錯誤會重試，查詢當日資料或股票代號錯誤等失敗直接以 error 回報。
+        """
+        keys = []
+        for prod_id in prod_ids:
+            for date in dates:
+                data = self.cache.get(prod_id, date) if self.cache is not None else None
+                if data is not None:
+                    yield FetchResult((prod_id, date), data, None, 0, 0.0)
+                elif self.offline:
+                    yield FetchResult((prod_id, date), None, KeyError(f"{prod_id} {date} not cached"), 0, 0.0)
+                else:
+                    keys.append((prod_id, date))
+
+        if not keys:
+            return
+
+        yield from fetch_many(
+            self.fetch,
+            keys,
+            max_workers=max_workers,
+            rate_limiter=TokenBucket(max_requests_per_sec, burst=max_workers),
+            retries=retries,
+            backoff=backoff,
+            progress=progress,
+        )
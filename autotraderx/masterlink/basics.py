@@ -0,0 +1,102 @@
+import datetime
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+__all__ = ["SymbolBasic", "BasicsCache"]
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SymbolBasic(NamedTuple):
+    symbol: str
+    name: str
+    ref_price: float     # 參考價
+    limit_up: float      # 漲停價
+    limit_down: float    # 跌停價
+
+    @classmethod
+    def from_basic(cls, data: Any) -> "SymbolBasic":
+        """ 由 ReqBasic 回傳的 Basic 建立 """
+        return cls(
+            symbol=data.symbol,
+            name=data.name,
+            ref_price=_to_float(data.refPrice),
+            limit_up=_to_float(data.riseStopPrice),
+            limit_down=_to_float(data.fallStopPrice),
+        )
+
+    def in_limits(self, price: float) -> bool:
+        # 沒有漲跌停資料時（例如部分權證）不做檢查
+        if self.limit_up <= 0 or self.limit_down <= 0:
+            return True
+        return self.limit_down - 1e-6 <= price <= self.limit_up + 1e-6
+
+
+class BasicsCache:
+    """
+    當日有效的股票基本資料快取。
+
+    參考價與漲跌停價每個交易日只變動一次，快取的內容在 session_start
+    之後的第一次存取時整批失效，之後由 ReqBasic 的回覆重新填入。
+
+    Args:
+        session_start (str): 交易日的切換時間，格式為 HH:MM。
+    """
+
+    def __init__(self, session_start: str = "08:00"):
+        hour, minute = map(int, session_start.split(":"))
+        self._offset = datetime.timedelta(hours=hour, minutes=minute)
+        self._lock = threading.Lock()
+        self._data: Dict[str, SymbolBasic] = {}
+        self._session = self.trading_day()
+
+    def trading_day(self, t: datetime.datetime = None) -> str:
+        """ t 所屬的交易日，session_start 之前算前一日 """
+        t = datetime.datetime.now() if t is None else t
+        return (t - self._offset).strftime("%Y%m%d")
+
+    def _check_session(self):
+        session = self.trading_day()
+        if session != self._session:
+            self._data.clear()
+            self._session = session
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, symbol: str) -> bool:
+        return self.get(symbol) is not None
+
+    def put(self, data: Any) -> SymbolBasic:
+        basic = data if isinstance(data, SymbolBasic) else SymbolBasic.from_basic(data)
+        with self._lock:
+            self._check_session()
+            self._data[basic.symbol] = basic
+        return basic
+
+    def get(self, symbol: str) -> SymbolBasic:
+        with self._lock:
+            self._check_session()
+            return self._data.get(symbol)
+
+    def missing(self, symbols: Iterable[str]) -> List[str]:
+        with self._lock:
+            self._check_session()
+            return [s for s in dict.fromkeys(symbols) if s not in self._data]
+
+    def check_price(self, symbol: str, price: float) -> bool:
+        """ 委託價是否在漲跌停範圍內；尚無基本資料時視為通過 """
+        basic = self.get(symbol)
+        return basic is None or basic.in_limits(price)
+
+    def invalidate(self, symbol: str = None):
+        with self._lock:
+            if symbol is None:
+                self._data.clear()
+            else:
+                self._data.pop(symbol, None)
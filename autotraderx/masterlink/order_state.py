@@ -0,0 +1,226 @@
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+__all__ = ["OrderState", "OrderStateBook", "FINAL_STATUSES", "REQUEST_STATUSES"]
+
+
+# 狀態代碼為 ReportOrder.order.status 的 ")" 之前，參考 MasterTradePy 的 getStatusMap。
+# 委託已接受之後，下列代碼描述的是改單、刪單「要求」的處理步驟，不代表委託本身結束；
+# 例如改價被拒絕（99）時委託仍在交易所，剩餘股數不變
+REQUEST_STATUSES = {
+    "0",    # 委託要求處理中
+    "3",    # 委託要求退回給使用者確定或強迫
+    "5",    # 委託要求排隊中
+    "6",    # 委託要求傳送中
+    "7",    # 委託要求已送出（等回報）
+    "88",   # 部份結束（失敗）
+    "89",   # 部份結束
+    "90",   # 委託要求已結束
+    "95",   # 委託要求狀態不明
+    "99",   # 委託要求拒絕
+}
+
+# 委託本身已結束的狀態；99 只在委託尚未被接受時（新單被拒絕）才是委託狀態
+FINAL_STATUSES = {
+    "81",   # 內部刪除
+    "91",   # 新單尚未送出就被刪單
+    "99",   # 新單要求拒絕
+    "111",  # 全部成交
+    "120",  # 委託因IOC/FOK未成交而取消
+}
+
+# 出現過即表示委託已被接受
+_ACCEPTED_STATUSES = {"100", "101", "110", "111"}
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class OrderState:
+    """ 單一委託書號的最新狀態與成交明細 """
+
+    __slots__ = (
+        "ordNo", "symbol", "side", "price", "qty", "leaves_qty", "cum_qty", "deal_qty",
+        "status", "status_code", "order_status_code", "last_request_status", "accepted",
+        "table_name", "last_message", "trx_time",
+        "last_deal_time", "user_def", "fills", "report", "updated_at",
+    )
+
+    def __init__(self, ordNo: str):
+        self.ordNo = ordNo
+        self.symbol = ""
+        self.side = ""
+        self.price = ""
+        self.qty = 0
+        self.leaves_qty = 0
+        self.cum_qty = 0
+        self.deal_qty = 0       # 成交回報累計的成交股數，委託回報可能先更新 cum_qty
+        self.status = ""                # 最近一筆回報的狀態，可能是委託或改單、刪單要求的狀態
+        self.status_code = ""
+        self.order_status_code = ""     # 最近一筆委託狀態的代碼
+        self.last_request_status = ""   # 最近一筆改單、刪單要求的狀態，例如 "99)委託要求拒絕"
+        self.accepted = False
+        self.table_name = ""
+        self.last_message = ""
+        self.trx_time = ""
+        self.last_deal_time = ""
+        self.user_def = ""
+        self.fills: List[Tuple[str, str, int]] = []  # (成交時間, 成交價格, 成交股數)
+        self.report = None
+        self.updated_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """ 以剩餘股數與委託狀態判斷，改單、刪單要求被拒絕不影響 """
+        return self.order_status_code not in FINAL_STATUSES and self.leaves_qty > 0
+
+    @property
+    def request_rejected(self) -> bool:
+        """ 最近一筆回報是否為改單、刪單要求被拒絕 """
+        return self.accepted and self.status_code == "99"
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderState(ordNo={self.ordNo!r}, symbol={self.symbol!r}, side={self.side!r}, "
+            f"price={self.price!r}, qty={self.qty}, cum_qty={self.cum_qty}, "
+            f"leaves_qty={self.leaves_qty}, status={self.status!r})"
+        )
+
+
+class OrderStateBook:
+    """
+    以委託書號為 key 的委託狀態簿。
+
+    每筆回報以增量方式套用到對應的 OrderState，並維護股票代號、狀態代碼
+    與未完成委託的次要索引，查詢成本只與結果數量有關，與整個交易時段的
+    回報數量無關。
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._orders: Dict[str, OrderState] = {}
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        self._by_user_def: Dict[str, str] = {}
+        self._open_by_symbol: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[OrderState]:
+        with self._lock:
+            return iter(list(self._orders.values()))
+
+    def __contains__(self, ordNo: str) -> bool:
+        return ordNo in self._orders
+
+    def apply_report(self, data: Any) -> OrderState:
+        """ 套用 OnReport 收到的 ReportOrder """
+        order = data.order
+        org_order = data.orgOrder
+        ordNo = order.ordNo
+        if not ordNo:
+            return None
+
+        with self._lock:
+            state = self._orders.get(ordNo)
+            if state is None:
+                state = self._orders[ordNo] = OrderState(ordNo)
+
+            old_symbol, old_code = state.symbol, state.status_code
+            cum_qty = _to_int(order.cumQty)
+
+            # 成交回報的 cumQty 為累計值，與前一筆成交回報的差額即本次成交股數；
+            # 不與 cum_qty 比較，因為 ORD:TwsOrd 的委託回報可能先帶來新的 cumQty
+            if order.tableName == "RPT:TwsDeal" and cum_qty > state.deal_qty:
+                state.fills.append((order.lastdealTime, order.dealPri, cum_qty - state.deal_qty))
+                state.deal_qty = cum_qty
+
+            state.symbol = order.symbol
+            state.side = order.side
+            state.price = order.price or org_order.price
+            state.qty = _to_int(org_order.qty)
+            state.leaves_qty = _to_int(order.leavesQty)
+            state.cum_qty = max(cum_qty, state.cum_qty)
+            state.status = order.status
+            state.status_code = order.status.split(")")[0]
+            if state.accepted and state.status_code in REQUEST_STATUSES:
+                state.last_request_status = order.status
+            else:
+                state.order_status_code = state.status_code
+                state.accepted = state.accepted or state.status_code in _ACCEPTED_STATUSES or cum_qty > 0
+            state.table_name = order.tableName
+            state.last_message = data.lastMessage
+            state.trx_time = order.trxTime or state.trx_time
+            state.last_deal_time = order.lastdealTime or state.last_deal_time
+            state.user_def = org_order.userDef or state.user_def
+            state.report = data
+            state.updated_at = time.time()
+
+            self._reindex(state, old_symbol, old_code)
+
+        return state
+
+    def apply_reply(self, data: Any) -> OrderState:
+        """ 套用 OnNewOrderReply/OnChangeReply/OnCancelReply，格式與 ReportOrder 相同時才處理 """
+        if hasattr(data, "order") and hasattr(data, "orgOrder"):
+            return self.apply_report(data)
+        return None
+
+    def _reindex(self, state: OrderState, old_symbol: str, old_code: str):
+        ordNo = state.ordNo
+
+        if old_symbol != state.symbol:
+            self._by_symbol.get(old_symbol, set()).discard(ordNo)
+            self._open_by_symbol.get(old_symbol, set()).discard(ordNo)
+            self._by_symbol.setdefault(state.symbol, set()).add(ordNo)
+
+        if old_code != state.status_code:
+            self._by_status.get(old_code, set()).discard(ordNo)
+            self._by_status.setdefault(state.status_code, set()).add(ordNo)
+
+        if state.user_def:
+            self._by_user_def[state.user_def] = ordNo
+
+        if state.is_open:
+            self._open_by_symbol.setdefault(state.symbol, set()).add(ordNo)
+        else:
+            self._open_by_symbol.get(state.symbol, set()).discard(ordNo)
+
+    def get(self, ordNo: str) -> OrderState:
+        return self._orders.get(ordNo)
+
+    def get_by_user_def(self, user_def: str) -> OrderState:
+        with self._lock:
+            ordNo = self._by_user_def.get(user_def)
+            return self._orders.get(ordNo) if ordNo is not None else None
+
+    def by_symbol(self, symbol: str) -> List[OrderState]:
+        with self._lock:
+            return [self._orders[o] for o in self._by_symbol.get(symbol, ())]
+
+    def by_status(self, status_code: str) -> List[OrderState]:
+        with self._lock:
+            return [self._orders[o] for o in self._by_status.get(status_code, ())]
+
+    def open_orders(self, symbol: str = None) -> List[OrderState]:
+        with self._lock:
+            if symbol is not None:
+                return [self._orders[o] for o in self._open_by_symbol.get(symbol, ())]
+            return [
+                self._orders[o]
+                for ordNos in self._open_by_symbol.values() for o in ordNos
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._orders.clear()
+            self._by_symbol.clear()
+            self._by_status.clear()
+            self._by_user_def.clear()
+            self._open_by_symbol.clear()
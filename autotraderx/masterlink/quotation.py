@@ -1,14 +1,19 @@
 import signal
 import sys
 import time
-from typing import List
+from typing import Any, Callable, Dict, List
 
 from PY_Trade_package.MarketDataMart import MarketDataMart, SystemEvent
 from PY_Trade_package.Product import ProductBasic, ProductTick
 from PY_Trade_package.Sol_D import Sol_D
 from PY_Trade_package.SolPYAPI_Model import RCode
 
-from ..utils import now
+from ..kbar import KBarAggregator
+from ..market_depth import MarketDepth
+from ..stock_index import StockIndex, get_stock_index
+from ..tick_store import TickStore
+from ..tick_writer import TickWriter
+from ..utils import match_time_to_us, now
 
 
 class QuotationSystem:
@@ -19,6 +24,10 @@ class QuotationSystem:
         password: str,
         product_type: str = "TWS",
         subscribe_list: List[str] = [],
+        tick_store: TickStore = None,
+        tick_writer: TickWriter = None,
+        markdown_log: bool = False,  # 結束時是否由 tick_store 輸出 markdown 成交紀錄表
+        kbars: KBarAggregator = None,  # 由成交即時合成 K 棒
     ):
         self.user = user
         self.password = password
@@ -26,24 +35,51 @@ class QuotationSystem:
         self.subscribe_list = subscribe_list
         self.stock_infos = {}
 
+        # 各股票的五檔行情，策略執行緒可直接讀取 self.depth.snapshot(symbol)
+        self.depth = MarketDepth()
+        self.kbars = kbars
+
+        # 額外的行情 callback：match 收到 ProductTick，order_book 收到更新後的 DepthSnapshot
+        self._listeners: Dict[str, List[Callable[[Any], None]]] = {"match": [], "order_book": []}
+
+        self.markdown_log = markdown_log
+
+        # 成交資料交由背景執行緒批次寫入 tick_store，避免阻塞行情 callback
+        self.tick_store = tick_store if tick_store is not None else TickStore()
+        self.tick_writer = tick_writer if tick_writer is not None \
+            else TickWriter(opener=self.tick_store.open_appender)
+
         market_data_mart: MarketDataMart = self._setup_market_data_mart()
         self.sol_D: Sol_D = self._setup_sol_d(market_data_mart) # 相依性注入
 
 
-    def run(self):
+    @property
+    def stock_index(self) -> StockIndex:
+        """ 與 Trader 共用的股票基本資料索引 """
+        return get_stock_index()
+
+    def add_listener(self, event: str, fn: Callable[[Any], None]):
+        """ 註冊 "match" 或 "order_book" 的 callback，於行情執行緒呼叫 """
+        self._listeners[event].append(fn)
+
+    def remove_listener(self, event: str, fn: Callable[[Any], None]):
+        if fn in self._listeners[event]:
+            self._listeners[event].remove(fn)
+
+    def start(self):
+        """ 登入並訂閱，不阻塞 """
         self.login()
+        self.tick_writer.start()
         for prod_code in self.subscribe_list:
             self.sol_D.Subscribe(self.product_type, prod_code)
 
-            # 建立初始成交紀錄表
-            markdown_lines = []
-            markdown_lines.append(f"# 日成交資料 - {prod_code}\n")
-            markdown_lines.append("| 成交時間 | 成交價 | 漲跌 | 成交量 | 總量 |")
-            markdown_lines.append("| ---- | ---- | ---- | ---- | ---- |\n")
-            formatted_text = "\n".join(markdown_lines)
+    def subscribe(self, prod_code: str):
+        if prod_code not in self.subscribe_list:
+            self.subscribe_list = self.subscribe_list + [prod_code]
+        self.sol_D.Subscribe(self.product_type, prod_code)
 
-            with open(f'log_{now("%Y%m%d")}_{prod_code}_match.md', "a", encoding="utf-8") as f:
-                f.write(formatted_text)
+    def run(self):
+        self.start()
 
         signal.signal(signal.SIGINT, self.signal_handler)
         while True:
@@ -71,11 +107,23 @@ class QuotationSystem:
         self.disconnect()
 
     def disconnect(self):
+        self.close()
+        sys.exit(0)
+
+    def close(self):
+        """ 取消訂閱並斷線，輸出紀錄，但不結束程式 """
         if len(self.subscribe_list):
             for prod_code in self.subscribe_list:
                 self.sol_D.Unsubscribe(self.product_type, prod_code)
         self.sol_D.DisConnect()
-        sys.exit(0)
+        self.tick_writer.stop()
+        if self.kbars is not None:
+            self.kbars.flush()
+
+        if self.markdown_log:
+            date = now("%Y%m%d")
+            for prod_code in self.subscribe_list:
+                self.tick_store.render_markdown(prod_code, date, f'log_{date}_{prod_code}_match.md')
 
     def _setup_market_data_mart(self) -> MarketDataMart:
         market_data_mart = MarketDataMart()
@@ -141,22 +189,29 @@ class QuotationSystem:
 
     def event_on_order_book(self, data: ProductTick):
         """ 接收五檔行情資料 """
-        self.buy_prices = data.BuyPrice
-        self.buy_qtys = data.BuyQty
-        self.sell_prices = data.SellPrice
-        self.sell_qtys = data.SellQty
+        snapshot = self.depth.on_order_book(data)
+        for fn in tuple(self._listeners["order_book"]):
+            fn(snapshot)
 
     def event_on_match(self, data: ProductTick):
         """ 接收成交行情資料 """
 
         pre_close_price = self.stock_infos[data.Symbol]["pre_close_price"]
-        diff = float(data.MatchPrice) - float(pre_close_price)
-        diff = diff
-        if diff >= 0:
-            diff = f"+{diff:.3f}"
-        else:
-            diff = f"{diff:.3f}"
+        price = float(data.MatchPrice)
+        diff = price - float(pre_close_price)
+
+        record = (
+            match_time_to_us(data.MatchTime),
+            price,
+            int(data.MatchQty),
+            int(data.TotalMatchQty),
+            diff,
+        )
+        date = now("%Y%m%d")
+        self.tick_writer.put((date, data.Symbol), record)
+
+        if self.kbars is not None:
+            self.kbars.on_match(data, date)
 
-        formatted_text = f"| {data.MatchTime} | {data.MatchPrice} | {diff} | {data.MatchQty} | {data.TotalMatchQty}\n"
-        with open(f'log_{now("%Y%m%d")}_{data.Symbol}_match.md', "a", encoding="utf-8") as f:
-            f.write(formatted_text)
\ No newline at end of file
+        for fn in tuple(self._listeners["match"]):
+            fn(data)
@@ -0,0 +1,252 @@
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+from ..tick_store import TickStore
+from ..trade_data import TradeData
+from ..utils import match_time_to_us, us_to_match_time
+
+__all__ = [
+    "ReplayBasic",
+    "ReplayTick",
+    "ReplayMarketDataMart",
+    "ReplayEngine",
+]
+
+
+_BASIC, _ORDER_BOOK, _MATCH = 0, 1, 2
+
+
+class ReplayBasic:
+    """ 與 ProductBasic 欄位相同的替身物件 """
+
+    FIELDS = (
+        "Symbol", "ChineseName", "Exchange", "TodayRefPrice", "RiseStopPrice",
+        "FallStopPrice", "PreTotalMatchQty", "PreTodayRefPrice", "PreClosePrice",
+        "IndustryCategory", "StockAnomalyCode", "NonTenParValueRemark",
+        "AbnormalRecommendationIndicator", "DayTradingRemark", "TradingUnit",
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.FIELDS:
+            setattr(self, name, kwargs.get(name, ""))
+
+
+class ReplayTick:
+    """ 與 ProductTick 欄位相同的替身物件（僅成交與五檔相關欄位） """
+
+    __slots__ = (
+        "Symbol", "MatchTime", "MatchPrice", "MatchQty", "TotalMatchQty",
+        "IsTxTrail", "OrderBookTime", "BuyPrice", "BuyQty", "SellPrice", "SellQty",
+    )
+
+    def __init__(
+        self,
+        Symbol: str,
+        MatchTime: str = "",
+        MatchPrice: Any = "",
+        MatchQty: Any = "",
+        TotalMatchQty: Any = "",
+        IsTxTrail: bool = False,
+        OrderBookTime: str = "",
+        BuyPrice: List[Any] = None,
+        BuyQty: List[Any] = None,
+        SellPrice: List[Any] = None,
+        SellQty: List[Any] = None,
+    ):
+        self.Symbol = Symbol
+        self.MatchTime = MatchTime
+        self.MatchPrice = MatchPrice
+        self.MatchQty = MatchQty
+        self.TotalMatchQty = TotalMatchQty
+        self.IsTxTrail = IsTxTrail
+        self.OrderBookTime = OrderBookTime
+        self.BuyPrice = BuyPrice if BuyPrice is not None else [''] * 5
+        self.BuyQty = BuyQty if BuyQty is not None else [''] * 5
+        self.SellPrice = SellPrice if SellPrice is not None else [''] * 5
+        self.SellQty = SellQty if SellQty is not None else [''] * 5
+
+
+class ReplayMarketDataMart:
+    """ MarketDataMart 的替身，只保留 callback 欄位 """
+
+    def __init__(self):
+        self.OnSystemEvent: Callable = None
+        self.OnUpdateBasic: Callable = None
+        self.OnMatch: Callable = None
+        self.OnOrderBook: Callable = None
+
+    @classmethod
+    def bind(cls, handler: Any) -> "ReplayMarketDataMart":
+        """ 依 QuotationSystem 的 callback 命名綁定事件 """
+        market_data_mart = cls()
+        market_data_mart.OnSystemEvent = getattr(handler, "observer_on_system_event", None)
+        market_data_mart.OnUpdateBasic = getattr(handler, "event_on_update_basic", None)
+        market_data_mart.OnMatch = getattr(handler, "event_on_match", None)
+        market_data_mart.OnOrderBook = getattr(handler, "event_on_order_book", None)
+        return market_data_mart
+
+
+class ReplayEngine:
+    """
+    以錄製的成交與五檔資料重播 QuotationSystem 的行情 callback。
+
+    Args:
+        market_data_mart (ReplayMarketDataMart): 接收事件的替身 MarketDataMart。
+        speed (float): 1 為實際時間，10、100 為加速倍數，None 或 0 為不等待全速重播。
+    """
+
+    def __init__(
+        self,
+        market_data_mart: ReplayMarketDataMart,
+        speed: float = None,
+    ):
+        self.market_data_mart = market_data_mart
+        self.speed = speed
+        self._events = []
+        self._seq = 0
+
+    def _push(self, time_us: int, kind: int, payload: Any):
+        self._events.append((time_us, kind, self._seq, payload))
+        self._seq += 1
+
+    def add_basic(self, symbol: str, pre_close_price: float, **kwargs):
+        kwargs.setdefault("PreClosePrice", pre_close_price)
+        kwargs.setdefault("TodayRefPrice", pre_close_price)
+        self._push(-1, _BASIC, ReplayBasic(Symbol=symbol, **kwargs))
+
+    def add_tick(
+        self,
+        symbol: str,
+        time_us: int,
+        price: float,
+        qty: int,
+        total_qty: int,
+        is_try_match: bool = False,
+    ):
+        tick = ReplayTick(
+            Symbol=symbol,
+            MatchTime=us_to_match_time(time_us),
+            MatchPrice=price,
+            MatchQty=qty,
+            TotalMatchQty=total_qty,
+            IsTxTrail=is_try_match,
+        )
+        self._push(time_us, _MATCH, tick)
+
+    def add_order_book(
+        self,
+        symbol: str,
+        time_us: int,
+        buy_prices: Sequence[Any],
+        buy_qtys: Sequence[Any],
+        sell_prices: Sequence[Any],
+        sell_qtys: Sequence[Any],
+    ):
+        tick = ReplayTick(
+            Symbol=symbol,
+            OrderBookTime=us_to_match_time(time_us),
+            BuyPrice=list(buy_prices),
+            BuyQty=list(buy_qtys),
+            SellPrice=list(sell_prices),
+            SellQty=list(sell_qtys),
+        )
+        self._push(time_us, _ORDER_BOOK, tick)
+
+    def load_tick_store(self, store: TickStore, symbol: str, date: str):
+        columns = store.read(symbol, date)
+        if not len(columns["time"]):
+            return
+
+        pre_close_price = float(columns["price"][0] - columns["diff"][0])
+        self.add_basic(symbol, pre_close_price)
+        for t, p, q, tq in zip(
+            columns["time"].tolist(),
+            columns["price"].tolist(),
+            columns["qty"].tolist(),
+            columns["total_qty"].tolist(),
+        ):
+            self.add_tick(symbol, t, p, q, tq)
+
+    def load_backtesting(
+        self,
+        data: List[Dict[str, Any]],
+        pre_close_price: float = None,
+    ):
+        """
+        讀入 BackTesting.get_data 的回傳結果；未給昨收價時以第一筆成交價代替。
+        成交時間可為 SDK 的數值（HHMMSSffffff）或 "09:00:01.123456" 字串。
+        """
+        if not len(data):
+            return
+
+        self.load_trade_data(TradeData.from_records(data), pre_close_price)
+
+    def load_trade_data(self, data: TradeData, pre_close_price: float = None):
+        """ 讀入 BackTesting.get_data(columnar=True) 的回傳結果 """
+        if not len(data):
+            return
+
+        if pre_close_price is None:
+            pre_close_price = float(data.price[0])
+        self.add_basic(data.symbol, pre_close_price)
+
+        for t, p, q, tq, tm in zip(
+            data.time.tolist(),
+            data.price.tolist(),
+            data.qty.tolist(),
+            data.qty.cumsum().tolist(),
+            data.try_match.tolist(),
+        ):
+            self.add_tick(data.symbol, t, p, q, tq, is_try_match=tm)
+
+    def load_markdown_log(self, path: Union[str, Path], symbol: str):
+        """ 讀入舊版 log_{date}_{symbol}_match.md 成交紀錄表 """
+        row = re.compile(r"^\|\s*([\d:.]+)\s*\|\s*([\d.]+)\s*\|\s*([+\-\d.]+)\s*\|\s*(\d+)\s*\|\s*(\d+)")
+
+        has_basic = False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                m = row.match(line)
+                if m is None:
+                    continue
+                match_time, price, diff, qty, total_qty = m.groups()
+                if not has_basic:
+                    self.add_basic(symbol, float(price) - float(diff))
+                    has_basic = True
+                self.add_tick(symbol, match_time_to_us(match_time), float(price), int(qty), int(total_qty))
+
+    def run(self) -> Dict[str, float]:
+        """ 依時間順序送出所有事件，回傳重播統計 """
+        events = sorted(self._events, key=lambda e: (e[0], e[2]))
+        handlers = {
+            _BASIC: self.market_data_mart.OnUpdateBasic,
+            _ORDER_BOOK: self.market_data_mart.OnOrderBook,
+            _MATCH: self.market_data_mart.OnMatch,
+        }
+
+        n_ticks = 0
+        first_time = None
+        t0 = time.perf_counter()
+        for time_us, kind, _, payload in events:
+            if self.speed and time_us >= 0:
+                if first_time is None:
+                    first_time = time_us
+                delay = (time_us - first_time) / 1e6 / self.speed - (time.perf_counter() - t0)
+                if delay > 0:
+                    time.sleep(delay)
+
+            handler = handlers[kind]
+            if handler is not None:
+                handler(payload)
+            if kind == _MATCH:
+                n_ticks += 1
+        elapsed = time.perf_counter() - t0
+
+        return {
+            "events": len(events),
+            "ticks": n_ticks,
+            "elapsed": elapsed,
+            "ticks_per_sec": n_ticks / elapsed if elapsed > 0 else float("inf"),
+        }
@@ -0,0 +1,265 @@
+import threading
+from collections import Counter
+from typing import Any, Dict, NamedTuple
+
+from ..rate_limit import TokenBucket
+from .basics import BasicsCache
+from .order_state import FINAL_STATUSES, OrderState
+
+__all__ = ["RiskLimits", "RiskGate"]
+
+
+class RiskLimits(NamedTuple):
+    """ 各項上限，None 表示不檢查；股數以股為單位，金額以元為單位 """
+    max_order_qty: int = None           # 單筆委託股數
+    max_order_notional: float = None    # 單筆委託金額
+    max_position: int = None            # 單一股票的淨部位（含未成交委託）
+    max_gross_position: int = None      # 所有股票部位絕對值加總（含未成交委託）
+    max_gross_notional: float = None    # 所有股票部位金額加總（含未成交委託）
+    max_orders_per_sec: float = None    # 新單送出速率
+    order_burst: int = 1                # 送出速率的瞬間突發量
+
+
+class _SymbolRisk:
+
+    __slots__ = ("position", "open_buy", "open_sell", "last_price", "notional")
+
+    def __init__(self):
+        self.position = 0       # 今日成交的淨部位，買正賣負
+        self.open_buy = 0       # 未成交的買進股數
+        self.open_sell = 0      # 未成交的賣出股數
+        self.last_price = 0.0   # 最近成交價，用於部位金額
+        self.notional = 0.0     # abs(position) * last_price
+
+
+class _OrderRisk:
+
+    __slots__ = ("symbol", "is_buy", "price", "open_qty", "cum_qty")
+
+    def __init__(self, symbol: str, is_buy: bool, price: float, open_qty: int = 0, cum_qty: int = 0):
+        self.symbol = symbol
+        self.is_buy = is_buy
+        self.price = price
+        self.open_qty = open_qty
+        self.cum_qty = cum_qty
+
+
+class RiskGate:
+    """
+    送出委託前的風控檢查。
+
+    check 通過時即預留該筆委託的股數與金額，之後由 on_report 依回報的
+    成交與剩餘股數增量更新部位，委託結束時釋放預留；部位與金額的加總
+    都以增量維護，每項檢查只有常數次的字典查詢與算術。
+
+    檢查順序為停止交易、單筆上限、漲跌停、單一股票部位、總部位、總金額，
+    最後才是送出速率，被前面的檢查擋下的委託不會消耗速率額度。
+
+    Args:
+        limits (RiskLimits): 各項上限。
+        basics (BasicsCache): 漲跌停價的來源，沒有資料的股票不檢查價格。
+    """
+
+    def __init__(self, limits: RiskLimits = None, basics: BasicsCache = None):
+        self._lock = threading.Lock()
+        self.basics = basics
+        self.limits = RiskLimits()
+        self._bucket: TokenBucket = None
+        self._symbols: Dict[str, _SymbolRisk] = {}
+        self._pending: Dict[str, _OrderRisk] = {}   # 已送出、尚未收到回報，以 userDef 為 key
+        self._orders: Dict[str, _OrderRisk] = {}    # 以委託書號為 key
+        self.gross_position = 0        # 成交部位絕對值加總
+        self.gross_notional = 0.0      # 成交部位金額加總
+        self.open_qty = 0              # 未成交委託股數加總
+        self.open_notional = 0.0       # 未成交委託金額加總
+        self.halted = False
+        self.halt_reason = ""
+        self.rejections = Counter()
+        self.set_limits(limits or RiskLimits())
+
+    def set_limits(self, limits: RiskLimits):
+        with self._lock:
+            self.limits = limits
+            self._bucket = None if limits.max_orders_per_sec is None \
+                else TokenBucket(limits.max_orders_per_sec, limits.order_burst)
+
+    # 停止交易
+    def halt(self, reason: str = "manual"):
+        self.halted = True
+        self.halt_reason = reason
+
+    def resume(self):
+        self.halted = False
+        self.halt_reason = ""
+
+    def _symbol(self, symbol: str) -> _SymbolRisk:
+        risk = self._symbols.get(symbol)
+        if risk is None:
+            risk = self._symbols[symbol] = _SymbolRisk()
+        return risk
+
+    def _reject(self, reason: str, message: str) -> str:
+        self.rejections[reason] += 1
+        return message
+
+    def check(
+        self,
+        symbol: str,
+        side: str,
+        qty: int,
+        price: float,
+        is_limit: bool = True,
+        user_def: str = None,
+    ) -> str:
+        """
+        檢查一筆新單，不通過時回傳錯誤訊息；通過且有 user_def 時預留部位，
+        送出失敗須呼叫 release。
+        """
+        if self.halted:
+            return self._reject("halted", f"已停止交易：{self.halt_reason}")
+
+        limits = self.limits
+        is_buy = side == "B"
+        qty = int(qty)
+        price = float(price or 0)
+
+        basic = self.basics.get(symbol) if self.basics is not None else None
+        if is_limit and basic is not None and not basic.in_limits(price):
+            return self._reject(
+                "price_band", f"{symbol} 委託價 {price} 超出漲跌停範圍 {basic.limit_down} ~ {basic.limit_up}")
+        # 市價單以漲停價估計金額
+        if not is_limit and basic is not None and basic.limit_up > 0:
+            price = basic.limit_up
+        notional = price * qty
+
+        if limits.max_order_qty is not None and qty > limits.max_order_qty:
+            return self._reject("order_qty", f"{symbol} 委託股數 {qty} 超過單筆上限 {limits.max_order_qty}")
+        if limits.max_order_notional is not None and notional > limits.max_order_notional:
+            return self._reject(
+                "order_notional", f"{symbol} 委託金額 {notional:,.0f} 超過單筆上限 {limits.max_order_notional:,.0f}")
+
+        with self._lock:
+            risk = self._symbols.get(symbol) or _SymbolRisk()
+
+            if limits.max_position is not None:
+                if is_buy:
+                    worst = risk.position + risk.open_buy + qty
+                else:
+                    worst = -(risk.position - risk.open_sell - qty)
+                if worst > limits.max_position:
+                    return self._reject(
+                        "position", f"{symbol} 部位將達 {worst} 股，超過上限 {limits.max_position}")
+
+            if limits.max_gross_position is not None:
+                gross = self.gross_position + self.open_qty + qty
+                if gross > limits.max_gross_position:
+                    return self._reject(
+                        "gross_position", f"總部位將達 {gross} 股，超過上限 {limits.max_gross_position}")
+
+            if limits.max_gross_notional is not None:
+                gross = self.gross_notional + self.open_notional + notional
+                if gross > limits.max_gross_notional:
+                    return self._reject(
+                        "gross_notional", f"總部位金額將達 {gross:,.0f}，超過上限 {limits.max_gross_notional:,.0f}")
+
+            if self._bucket is not None and not self._bucket.try_acquire():
+                return self._reject("rate", f"委託送出速率超過每秒 {limits.max_orders_per_sec} 筆")
+
+            if user_def:
+                order = _OrderRisk(symbol, is_buy, price)
+                self._pending[user_def] = order
+                self._set_open(order, qty)
+
+        return None
+
+    def release(self, user_def: str):
+        """ 釋放 check 預留但沒有送出的委託 """
+        with self._lock:
+            order = self._pending.pop(user_def, None)
+            if order is not None:
+                self._set_open(order, 0)
+
+    def _set_open(self, order: _OrderRisk, open_qty: int):
+        delta = open_qty - order.open_qty
+        if not delta:
+            return
+        risk = self._symbol(order.symbol)
+        if order.is_buy:
+            risk.open_buy += delta
+        else:
+            risk.open_sell += delta
+        self.open_qty += delta
+        self.open_notional += delta * order.price
+        order.open_qty = open_qty
+
+    def _fill(self, order: _OrderRisk, qty: int, price: float):
+        risk = self._symbol(order.symbol)
+        old_position = risk.position
+        risk.position += qty if order.is_buy else -qty
+        if price > 0:
+            risk.last_price = price
+        notional = abs(risk.position) * risk.last_price
+        self.gross_position += abs(risk.position) - abs(old_position)
+        self.gross_notional += notional - risk.notional
+        risk.notional = notional
+
+    def on_report(self, data: Any, state: OrderState):
+        """ 套用 OrderStateBook.apply_report 之後的委託狀態；非本程式送出的委託也會計入成交部位 """
+        if state is None:
+            # 尚未取得委託書號就被拒絕的新單（例如流量管制），依 userDef 釋放預留；
+            # 只看委託的最終狀態，改單、刪單要求的步驟（例如 90）不釋放
+            user_def = data.orgOrder.userDef
+            if user_def and (data.order.status or "").split(")")[0] in FINAL_STATUSES:
+                self.release(user_def)
+            return
+        with self._lock:
+            order = self._orders.get(state.ordNo)
+            if order is None:
+                user_def = data.orgOrder.userDef
+                order = self._pending.pop(user_def, None) if user_def else None
+                if order is None:
+                    try:
+                        price = float(state.price or 0)
+                    except ValueError:
+                        price = 0.0
+                    order = _OrderRisk(state.symbol, state.side == "B", price)
+                self._orders[state.ordNo] = order
+
+            if state.cum_qty > order.cum_qty:
+                try:
+                    deal_price = float(data.order.dealPri or 0)
+                except ValueError:
+                    deal_price = 0.0
+                self._fill(order, state.cum_qty - order.cum_qty, deal_price)
+                order.cum_qty = state.cum_qty
+
+            # is_open 只依剩餘股數與委託狀態判斷，改價、刪單被拒絕時仍保留未成交部位
+            if state.is_open:
+                self._set_open(order, state.leaves_qty)
+            else:
+                self._set_open(order, 0)
+
+    def position(self, symbol: str) -> int:
+        risk = self._symbols.get(symbol)
+        return 0 if risk is None else risk.position
+
+    def exposure(self, symbol: str) -> Dict[str, Any]:
+        risk = self._symbols.get(symbol) or _SymbolRisk()
+        return {
+            "position": risk.position,
+            "open_buy": risk.open_buy,
+            "open_sell": risk.open_sell,
+            "notional": risk.notional,
+        }
+
+    def reset(self):
+        """ 清除部位與預留，例如換日時 """
+        with self._lock:
+            self._symbols.clear()
+            self._pending.clear()
+            self._orders.clear()
+            self.gross_position = 0
+            self.gross_notional = 0.0
+            self.open_qty = 0
+            self.open_notional = 0.0
+            self.rejections.clear()
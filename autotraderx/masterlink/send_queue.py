@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Hashable, List
+
+from ..rate_limit import TokenBucket
+
+__all__ = ["SendScheduler", "CANCEL", "AMEND", "NEW", "LANE_NAMES"]
+
+
+# 優先順序：刪單 > 改單 > 新單
+CANCEL, AMEND, NEW = 0, 1, 2
+LANE_NAMES = ("cancel", "amend", "new")
+
+
+class _Request:
+
+    __slots__ = ("lane", "key", "fn", "args", "future", "queued_at", "dropped")
+
+    def __init__(self, lane: int, key: Hashable, fn: Callable, args: tuple):
+        self.lane = lane
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+        self.dropped = False
+
+
+class _LaneStats:
+
+    __slots__ = ("sent", "coalesced", "dropped", "wait_total", "wait_max", "waits")
+
+    def __init__(self, samples: int):
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits: Deque[float] = deque(maxlen=samples)
+
+
+class SendScheduler:
+    """
+    在 MasterTradeAPI 之前以 token bucket 控制送出速率的委託佇列。
+
+    委託要求依刪單、改單、新單分為三條佇列，有 token 可用時才決定
+    送出哪一筆，因此排隊中的新單不會擋住之後才進來的刪單；已取消的
+    要求不會消耗 token。
+    同一個 key（例如同一委託書號的改價）尚未送出時，新的要求直接
+    取代佇列中的參數，只送出最後一次；刪單會取消同一委託書號排隊中
+    的改單。送出由背景執行緒呼叫 API，結果（RCode）以 Future 帶回。
+
+    券商以每秒筆數限制時，rate + burst 不應超過該限制。
+
+    Args:
+        rate (float): 每秒送出的委託要求數。
+        burst (int): 允許的瞬間突發量。
+        samples (int): 每條佇列保留的等待時間樣本數，用於計算百分位數。
+    """
+
+    def __init__(self, rate: float, burst: int = 1, samples: int = 10000):
+        self.bucket = TokenBucket(rate, burst)
+        self._lanes: List[Deque[_Request]] = [deque(), deque(), deque()]
+        self._pending: Dict[Hashable, _Request] = {}
+        self._stats = [_LaneStats(samples) for _ in LANE_NAMES]
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="TraderSend", daemon=True)
+        self._thread.start()
+
+    def submit(self, lane: int, fn: Callable, *args: Any, key: Hashable = None) -> Future:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SendScheduler is closed.")
+
+            request = self._pending.get(key) if key is not None else None
+            if request is not None and self._is_live(request):
+                request.args = args
+                self._stats[lane].coalesced += 1
+                return request.future
+
+            request = _Request(lane, key, fn, args)
+            if key is not None:
+                self._pending[key] = request
+            self._lanes[lane].append(request)
+            self._cond.notify()
+            return request.future
+
+    def drop(self, key: Hashable) -> bool:
+        """ 取消排隊中尚未送出的要求，其 Future 會被 cancel """
+        with self._cond:
+            request = self._pending.pop(key, None)
+            if request is None:
+                return False
+            request.dropped = True
+            self._stats[request.lane].dropped += 1
+        request.future.cancel()
+        return True
+
+    @staticmethod
+    def _is_live(request: _Request) -> bool:
+        return not request.dropped and not request.future.cancelled()
+
+    def _has_request(self) -> bool:
+        for lane in self._lanes:
+            while lane and not self._is_live(lane[0]):
+                self._forget(lane.popleft())
+            if lane:
+                return True
+        return False
+
+    def _forget(self, request: _Request):
+        if request.key is not None and self._pending.get(request.key) is request:
+            del self._pending[request.key]
+
+    def _pop(self) -> _Request:
+        """ 取出優先順序最高、尚未取消的要求，並標記為執行中使其不能再被取消 """
+        for lane in self._lanes:
+            while lane:
+                request = lane.popleft()
+                self._forget(request)
+                if not request.dropped and request.future.set_running_or_notify_cancel():
+                    return request
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if not self._has_request():
+                    self._cond.wait()
+                    continue
+                # 等到有 token 時才決定送出哪一筆：等待期間進來的刪單可以插隊，
+                # 被取消的要求也不會消耗 token
+                delay = self.bucket.wait_time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                request = self._pop()
+            if request is None:
+                continue
+
+            # 只有這個執行緒取用 token，通常立即取得
+            self.bucket.acquire()
+
+            wait = time.perf_counter() - request.queued_at
+            stats = self._stats[request.lane]
+            stats.sent += 1
+            stats.wait_total += wait
+            stats.wait_max = max(stats.wait_max, wait)
+            stats.waits.append(wait)
+
+            try:
+                request.future.set_result(request.fn(*request.args))
+            except Exception as e:
+                request.future.set_exception(e)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for lane in self._lanes for r in lane if not r.dropped)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """ 各佇列的送出數、合併數、取消數與排隊等待秒數 """
+        result = {}
+        with self._cond:
+            for name, lane, stats in zip(LANE_NAMES, self._lanes, self._stats):
+                waits = sorted(stats.waits)
+                result[name] = {
+                    "queued": sum(1 for r in lane if not r.dropped),
+                    "sent": stats.sent,
+                    "coalesced": stats.coalesced,
+                    "dropped": stats.dropped,
+                    "wait_avg": stats.wait_total / stats.sent if stats.sent else 0.0,
+                    "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                    "wait_p99": waits[min(int(len(waits) * 0.99), len(waits) - 1)] if waits else 0.0,
+                    "wait_max": stats.wait_max,
+                }
+        return result
+
+    def close(self):
+        """ 停止送出，排隊中的要求全部取消 """
+        with self._cond:
+            self._closed = True
+            requests = [r for lane in self._lanes for r in lane if not r.dropped]
+            for lane in self._lanes:
+                lane.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+        for request in requests:
+            request.future.cancel()
@@ -1,14 +1,27 @@
+import asyncio
+import threading
 import time
-from typing import Dict, List, Union
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from itertools import count
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, Union
 
 from MasterTradePy.api import MasterTradeAPI
 from MasterTradePy.constant import (OrderType, PriceType, RCode, Side,
                                     TradingSession, TradingUnit)
 from MasterTradePy.model import *
-from MasterTradePy.model import MarketTrader, SystemEvent
+from MasterTradePy.model import Basic, MarketTrader, SystemEvent
 from prettytable import PrettyTable
 
-from ..utils import get_curdir, load_json
+from ..stock_index import StockIndex, get_stock_index
+from ..utils import get_curdir
+from .amend import AmendManager
+from .basics import BasicsCache, SymbolBasic
+from .order_state import OrderState, OrderStateBook
+from .risk import RiskGate, RiskLimits
+from .send_queue import AMEND, CANCEL, NEW, SendScheduler
 
 DIR = get_curdir(__file__)
 
@@ -64,32 +77,217 @@ def translate(data: Dict[str, Union[str, int]]) -> Dict[str, Union[str, int]]:
     ]
 
 
+class OrderAck(NamedTuple):
+    user_def: str
+    ordNo: str
+    status: str
+    latency: float  # 送出委託到收到第一筆回報的秒數
+    state: OrderState
+
+
+class CancelReport(NamedTuple):
+    requested: List[str]                # 送出刪單的委託書號
+    confirmed: List[str]                # 已收到委託結束的回報
+    failed: Dict[str, str]              # 送出失敗或被拒絕，委託書號 -> 原因
+    pending: List[str]                  # 逾時仍未確認
+    elapsed: float                      # 送出到全部確認（或逾時）的秒數
+    latencies: Dict[str, float]         # 各筆送出到確認的秒數
+
+    @property
+    def done(self) -> bool:
+        return not self.failed and not self.pending
+
+
 class CustomMarketTrader(MarketTrader):
 
-    def __init__(self):
-        self.new_order_replies = []
-        self.change_replies = []
-        self.cancel_replies = []
-        self.reports = []
-        self.req_results = []
-        self.system_events = []
-        self.announcement_events = []
-        self.errors = []
+    def __init__(
+        self,
+        history_size: int = 1000,
+        basics: BasicsCache = None,
+        risk: RiskGate = None,
+        amends: AmendManager = None,
+    ):
+        # 委託狀態以委託書號為 key 增量更新，其餘事件只保留最近 history_size 筆
+        self.order_book = OrderStateBook()
+        self.basics = basics if basics is not None else BasicsCache()
+        self.risk = risk
+        self.amends = amends
+        self.new_order_replies = deque(maxlen=history_size)
+        self._reports = deque(maxlen=history_size)
+        self.change_replies = deque(maxlen=history_size)
+        self.cancel_replies = deque(maxlen=history_size)
+        self.req_results = deque(maxlen=history_size)
+        self.system_events = deque(maxlen=history_size)
+        self.announcement_events = deque(maxlen=history_size)
+        self.errors = deque(maxlen=history_size)
+        self.history_size = history_size
+
+        self._report_collectors: List[List[Any]] = []
+
+        # 以 userDef 對應送出中的委託，收到第一筆回報時完成 Future
+        self._ack_lock = threading.Lock()
+        self._ack_waiters: Dict[str, Tuple[Future, float]] = {}
+        # 以委託書號等待委託結束（刪單確認、全部成交、拒絕）
+        self._close_waiters: Dict[str, List[Future]] = {}
+
+        # 依 workID 分組的查詢結果，供查詢函式等待回覆
+        self._req_cond = threading.Condition()
+        self._req_results_by_id: Dict[str, List[Any]] = {}
+        self._req_last_time: Dict[str, float] = {}
 
     def OnNewOrderReply(self, data) -> None:
         self.new_order_replies.append(data)
+        self.order_book.apply_reply(data)
 
     def OnChangeReply(self, data) -> None:
         self.change_replies.append(data)
+        state = self.order_book.apply_reply(data)
+        if self.amends is not None and state is not None:
+            self.amends.on_report(data, state, reply=True)
+        if self._close_waiters and state is not None:
+            self._resolve_close(state)
 
     def OnCancelReply(self, data) -> None:
         self.cancel_replies.append(data)
+        state = self.order_book.apply_reply(data)
+        if self._close_waiters and state is not None:
+            self._resolve_close(state)
+
+    @property
+    def reports(self) -> Tuple[Any, ...]:
+        """ 最近 history_size 筆 OnReport 回報，與舊版的 reports 相容；唯讀，委託狀態請用 order_book """
+        return tuple(self._reports)
 
     def OnReport(self, data) -> None:
-        self.reports.append(data)
+        self._reports.append(data)
+        state = self.order_book.apply_report(data)
+        if self.risk is not None:
+            self.risk.on_report(data, state)
+        if self.amends is not None:
+            self.amends.on_report(data, state)
+        if self._ack_waiters:
+            self._resolve_ack(data, state)
+        if self._close_waiters and state is not None:
+            self._resolve_close(state)
+        for collector in tuple(self._report_collectors):
+            collector.append(data)
+
+    def expect_ack(self, user_def: str) -> Future:
+        """ 登記即將送出的委託，需在呼叫 NewOrder 之前登記 """
+        future = Future()
+        with self._ack_lock:
+            self._ack_waiters[user_def] = (future, time.perf_counter())
+        return future
+
+    def discard_ack(self, user_def: str, error: Exception = None):
+        with self._ack_lock:
+            waiter = self._ack_waiters.pop(user_def, None)
+        if waiter is not None and error is not None:
+            waiter[0].set_exception(error)
+
+    def _resolve_ack(self, data, state: OrderState):
+        user_def = data.orgOrder.userDef
+        if not user_def:
+            return
+        with self._ack_lock:
+            waiter = self._ack_waiters.pop(user_def, None)
+        if waiter is None:
+            return
+        future, t0 = waiter
+        future.set_result(OrderAck(
+            user_def=user_def,
+            ordNo=data.order.ordNo,
+            status=data.order.status,
+            latency=time.perf_counter() - t0,
+            state=state,
+        ))
+
+    def expect_close(self, ordNo: str) -> Future:
+        """ 委託不再有剩餘股數時完成，結果為 OrderState；已結束的委託立即完成 """
+        future = Future()
+        with self._ack_lock:
+            state = self.order_book.get(ordNo)
+            if state is not None and not state.is_open:
+                future.set_result(state)
+            else:
+                self._close_waiters.setdefault(ordNo, []).append(future)
+        return future
+
+    def discard_close(self, ordNo: str, future: Future, error: Exception = None):
+        with self._ack_lock:
+            waiters = self._close_waiters.get(ordNo, [])
+            if future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._close_waiters[ordNo]
+        if error is not None and not future.done():
+            future.set_exception(error)
+
+    def _resolve_close(self, state: OrderState):
+        if state.is_open:
+            return
+        with self._ack_lock:
+            waiters = self._close_waiters.pop(state.ordNo, None)
+        for future in waiters or ():
+            if not future.done():
+                future.set_result(state)
+
+    def add_report_collector(self, collector: Any):
+        """ 之後收到的每筆回報都會以 collector.append(data) 送出，於 SDK 執行緒呼叫 """
+        self._report_collectors.append(collector)
+
+    def remove_report_collector(self, collector: Any):
+        # 以 is 比對，內容相同的 list 不會被誤刪
+        self._report_collectors[:] = [c for c in self._report_collectors if c is not collector]
+
+    @contextmanager
+    def collect_reports(self):
+        """ 收集區塊內收到的回報，供 QryRepAll/QryRepDeal 取得查詢結果 """
+        collector = []
+        self.add_report_collector(collector)
+        try:
+            yield collector
+        finally:
+            self.remove_report_collector(collector)
 
     def OnReqResult(self, workID: str, data) -> None:
         self.req_results.append(data)
+        if isinstance(data, Basic):
+            self.basics.put(data)
+        with self._req_cond:
+            # 沒有人等待的查詢結果（例如 ReqBasic）只保留最近 history_size 個 workID
+            if workID not in self._req_results_by_id and len(self._req_results_by_id) >= self.history_size:
+                stale = next(iter(self._req_results_by_id))
+                self._req_results_by_id.pop(stale)
+                self._req_last_time.pop(stale, None)
+            self._req_results_by_id.setdefault(workID, []).append(data)
+            self._req_last_time[workID] = time.monotonic()
+            self._req_cond.notify_all()
+
+    def wait_req_result(self, workID: str, timeout: float = 5.0, settle: float = 0.05) -> List[Any]:
+        """
+        等待 workID 的查詢結果。
+
+        同一次查詢的所有資料列由 SDK 在同一個 callback 迴圈內連續送出，
+        收到第一筆後只要 settle 秒內沒有新資料即視為完成；逾時回傳已收到的部分。
+        """
+        deadline = time.monotonic() + timeout
+        with self._req_cond:
+            while True:
+                t = time.monotonic()
+                last = self._req_last_time.get(workID)
+                if last is not None and t - last >= settle:
+                    break
+                if t >= deadline:
+                    break
+                wait = deadline - t if last is None else min(deadline - t, settle - (t - last))
+                self._req_cond.wait(wait)
+
+            self._req_last_time.pop(workID, None)
+            rows = self._req_results_by_id.pop(workID, [])
+
+        # 無資料時 SDK 會回傳字串 "No Data(OnSorTaskResult)"
+        return [row for row in rows if not isinstance(row, str)]
 
     def OnSystemEvent(self, data: SystemEvent) -> None:
         self.system_events.append(data)
@@ -111,7 +309,11 @@ class Trader:
         is_sim: bool = True,    # 是否連測試主機
         is_force: bool = True,  # 是否單一帳號通過強制登入
         is_event: bool = False,  # 是否連接競賽主機
-        verbose: bool = True # 是否輸出資訊至 cmd
+        verbose: bool = True, # 是否輸出資訊至 cmd
+        query_timeout: float = 5.0,  # 查詢等待回覆的秒數上限
+        risk_limits: RiskLimits = None,  # 送出委託前的風控上限，預設不限制
+        max_requests_per_sec: float = None,  # 委託要求的送出速率上限，預設不排隊直接送出
+        request_burst: int = 1,  # 送出速率的瞬間突發量
     ):
         self.username = user
         self.password = password
@@ -120,11 +322,26 @@ class Trader:
         self.is_force = is_force
         self.is_event = is_event
         self.verbose = verbose
+        self.query_timeout = query_timeout
         self.status = None
-        self.stock_info = load_json(DIR.parent / "stock_infos.json")
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="TraderQuery")
+        # userDef 以啟動時間為前綴，避免與先前執行階段的委託重複
+        self._user_def_prefix = f"{int(time.time()) % 0x100000:05X}"
+        self._user_def_seq = count(1)
+        self.basics = BasicsCache()
+        self.risk = RiskGate(risk_limits, self.basics)
+        self.max_requests_per_sec = max_requests_per_sec
+        self.request_burst = request_burst
+        self.sender: SendScheduler = None
+        self.amends = AmendManager(self._send_amend, ok_code=RCode.OK)
+
+    @property
+    def stock_info(self) -> StockIndex:
+        """ 行程內共用的股票基本資料索引，第一次使用時才載入 """
+        return get_stock_index(DIR.parent / "stock_infos.json")
 
     def login(self):
-        self.trader = CustomMarketTrader()
+        self.trader = CustomMarketTrader(basics=self.basics, risk=self.risk, amends=self.amends)
         self.api = MasterTradeAPI(self.trader)
         self.api.SetConnectionHost('solace140.masterlink.com.tw:55555')
         rc = self.api.Login(
@@ -136,25 +353,55 @@ class Trader:
         )
         if rc != RCode.OK:
             print("登入失敗，請檢查使用者名稱和密碼是否正確")
+        if self.max_requests_per_sec is not None:
+            self.sender = SendScheduler(self.max_requests_per_sec, self.request_burst)
         self.status = True
 
     def stop(self):
+        if self.sender is not None:
+            self.sender.close()
+        self.amends.close()
         self.api.disClient()
+        self._executor.shutdown(wait=False)
         self.status = False
 
     # 查詢成交回報
     def get_trade_report(self) -> List[Dict[str, Union[str, int]]]:
-        self.api.QryRepDeal(self.account_number)
         print(f"\n\n查詢成交...\n\n")
-        time.sleep(1)
-        return self.process_data(self.trader.reports, only_deal=True)
+        # QryRepDeal 在呼叫端執行緒同步觸發 OnReport，回傳時即已收齊
+        with self.trader.collect_reports() as reports:
+            self.api.QryRepDeal(self.account_number)
+        return self.process_data(reports, only_deal=True)
 
     # 查詢委託回報
     def get_order_report(self) -> List[Dict[str, Union[str, int]]]:
-        self.api.QryRepAll(self.account_number)
         print(f"\n\n查詢委託...\n\n")
-        time.sleep(1)
-        return self.process_data(self.trader.reports)
+        # QryRepAll 在呼叫端執行緒同步觸發 OnReport，回傳時即已收齊
+        with self.trader.collect_reports() as reports:
+            self.api.QryRepAll(self.account_number)
+        return self.process_data(reports)
+
+    def get_open_orders(self, symbol: str = None) -> List[OrderState]:
+        """ 由委託狀態簿取得未完成委託，不需向券商查詢 """
+        return self.trader.order_book.open_orders(symbol)
+
+    def get_trade_report_future(self) -> Future:
+        return self._executor.submit(self.get_trade_report)
+
+    def get_order_report_future(self) -> Future:
+        return self._executor.submit(self.get_order_report)
+
+    def get_inventory_future(self, timeout: float = None) -> Future:
+        return self._executor.submit(self.get_inventory, timeout)
+
+    async def get_trade_report_async(self) -> List[Dict[str, Union[str, int]]]:
+        return await asyncio.wrap_future(self.get_trade_report_future())
+
+    async def get_order_report_async(self) -> List[Dict[str, Union[str, int]]]:
+        return await asyncio.wrap_future(self.get_order_report_future())
+
+    async def get_inventory_async(self, timeout: float = None) -> Dict[str, Dict[str, str]]:
+        return await asyncio.wrap_future(self.get_inventory_future(timeout))
 
     def process_data(self, trader_reports, only_deal: bool = False):
         export_data = []
@@ -203,7 +450,7 @@ class Trader:
             row = [
                 translated_table_name,
                 data.order.ordNo,
-                self.stock_info[data.order.symbol]["名稱"],
+                self.stock_info.name(data.order.symbol),
                 data.order.symbol,
                 side_map[data.order.side],
                 price_type_map[data.order.priceType],
@@ -222,7 +469,7 @@ class Trader:
             export_data.append({
                 "類型": translated_table_name,
                 "委託書號": data.order.ordNo,
-                "股票": self.stock_info[data.order.symbol]["名稱"],
+                "股票": self.stock_info.name(data.order.symbol),
                 "股票代號": data.order.symbol,
                 "買賣別": side_map[data.order.side],
                 "委託方式(價格)": price_type_map[data.order.priceType],
@@ -251,10 +498,11 @@ class Trader:
         return export_data
 
     # 查詢庫存
-    def get_inventory(self) -> List[Dict[str, Union[str, int]]]:
-        self.api.ReqInventoryRayinTotal(self.account_number)
+    def get_inventory(self, timeout: float = None) -> Dict[str, Dict[str, str]]:
+        work_id = self.api.ReqInventoryRayinTotal(self.account_number)
         print(f"\n\n查詢庫存...\n\n")
-        time.sleep(1)  # 等待資料填充
+        timeout = self.query_timeout if timeout is None else timeout
+        req_results = self.trader.wait_req_result(work_id, timeout=timeout)
 
         # Create a PrettyTable object
         table = PrettyTable()
@@ -265,9 +513,9 @@ class Trader:
         table.field_names = field_names
 
         # Add rows to the table
-        for data in self.trader.req_results:
+        for data in req_results:
             row = [
-                self.stock_info[data.symbol]["名稱"],
+                self.stock_info.name(data.symbol),
                 data.symbol,
                 str(int(data.qty) // 1000),
                 data.qtyZero,
@@ -277,7 +525,7 @@ class Trader:
             table.add_row(row)
 
             export_data[data.symbol] = {
-                "股票": self.stock_info[data.symbol]["名稱"],
+                "股票": self.stock_info.name(data.symbol),
                 "集保庫存（張）": str(int(data.qty) // 1000),
                 "零股庫存（股）": data.qtyZero,
                 "融資庫存（張）": str(int(data.qtyCredit) // 1000),
@@ -296,6 +544,79 @@ class Trader:
 
         return export_data
 
+    def get_basic(self, symbol: str, timeout: float = None) -> SymbolBasic:
+        """ 取得當日參考價與漲跌停價，快取中沒有時才向券商查詢 """
+        basic = self.basics.get(symbol)
+        if basic is None:
+            work_id = self.api.ReqBasic(symbol)
+            timeout = self.query_timeout if timeout is None else timeout
+            self.trader.wait_req_result(work_id, timeout=timeout)
+            basic = self.basics.get(symbol)
+        return basic
+
+    def preload_basics(self, symbols: Iterable[str], timeout: float = None) -> Dict[str, SymbolBasic]:
+        """ 一次送出所有缺少的 ReqBasic 再等待回覆，用於開盤前預先載入觀察清單 """
+        symbols = list(dict.fromkeys(symbols))
+        work_ids = [self.api.ReqBasic(symbol) for symbol in self.basics.missing(symbols)]
+
+        timeout = self.query_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        for work_id in work_ids:
+            self.trader.wait_req_result(work_id, timeout=max(deadline - time.monotonic(), 0))
+
+        return {symbol: self.basics.get(symbol) for symbol in symbols}
+
+    def _check_risk(
+        self,
+        symbol: str,
+        side: Side,
+        qty: int,
+        price: float,
+        price_type: PriceType = PriceType.MKT,
+        user_def: str = '',
+    ) -> str:
+        """ 送出前的風控檢查（含漲跌停），不通過時回傳錯誤訊息 """
+        return self.risk.check(symbol, side, qty, price, price_type == PriceType.LMT, user_def)
+
+    def _make_order(
+        self,
+        symbol: str,
+        side: Side,
+        qty: int,
+        price: float,
+        order_type: OrderType = OrderType.ROD,
+        price_type: PriceType = PriceType.MKT,
+        trading_session: TradingSession = TradingSession.NORMAL,
+        trading_unit: TradingUnit = TradingUnit.COMMON,
+        user_def: str = '',
+    ) -> Order:
+        return Order(
+            tradingSession=trading_session,
+            side=side,
+            symbol=symbol,
+            priceType=price_type,
+            price=str(price),
+            tradingUnit=trading_unit,
+            qty=str(qty),
+            orderType=order_type,
+            tradingAccount=self.account_number,
+            userDef=user_def
+        )
+
+    def _submit(self, lane: int, fn, request: Any, key: Any = None) -> Future:
+        """ 經由 SendScheduler 送出委託要求；未設定速率上限時直接送出 """
+        if self.sender is not None:
+            return self.sender.submit(lane, fn, request, key=key)
+        future = Future()
+        try:
+            future.set_result(fn(request))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def next_user_def(self) -> str:
+        return f"{self._user_def_prefix}{next(self._user_def_seq) % 100000:05d}"
+
     def set_order(
         self,
         symbol: str,    # 股票代號
@@ -306,53 +627,254 @@ class Trader:
         price_type: PriceType = PriceType.MKT,  # 價格類型
         trading_session: TradingSession = TradingSession.NORMAL,  # 交易時段
         trading_unit: TradingUnit = TradingUnit.COMMON,  # 交易單位
+        user_def: str = '',  # 自訂欄位，會在回報中帶回
     ):
-        self.api.ReqBasic(symbol)
-
-        order = Order(
-            tradingSession=trading_session,
-            side=side,
-            symbol=symbol,
-            priceType=price_type,
-            price=str(price),
-            tradingUnit=trading_unit,
-            qty=str(qty),
-            orderType=order_type,
-            tradingAccount=self.account_number,
-            userDef=''
+        if price_type == PriceType.LMT:
+            self.get_basic(symbol)
+        user_def = user_def or self.next_user_def()
+        err_msg = self._check_risk(symbol, side, qty, price, price_type, user_def)
+        if err_msg is not None:
+            if self.verbose:
+                print(err_msg)
+            return
+
+        order = self._make_order(
+            symbol, side, qty, price, order_type, price_type,
+            trading_session, trading_unit, user_def
         )
-        rc = self.api.NewOrder(order)
+        try:
+            rc = self._submit(NEW, self.api.NewOrder, order).result()
+        except CancelledError:
+            # stop 時排隊中的委託會被取消
+            self.risk.release(user_def)
+            raise RuntimeError("NewOrder cancelled before sending, the trader has been stopped.") from None
+        except Exception:
+            self.risk.release(user_def)
+            raise
+        if rc != RCode.OK:
+            self.risk.release(user_def)
+        if not self.verbose:
+            return
         if rc == RCode.OK:
             print(u'已送出委託')
         else:
             print(u'下單失敗! 請再次執行程式，依據回報資料修正輸入')
 
+    def set_orders(self, orders: List[Dict[str, Any]]) -> List[Future]:
+        """
+        批次送出委託，回傳與 orders 順序相同的 Future。
+
+        限價單的基本資料由快取取得，缺少的股票一次預先查詢；NewOrder 連續送出
+        而不等待前一筆的回報。每筆委託帶有唯一的 userDef，收到第一筆對應回報時
+        Future 完成，結果為 OrderAck（含委託書號與回報延遲）；未通過風控檢查
+        （含超出漲跌停）的委託不會送出，與送出失敗的委託一樣由 Future 帶回例外。
+
+        Args:
+            orders (List[Dict]): set_order 的參數，例如
+                {"symbol": "2330", "side": Side.Buy, "qty": 1000, "price": 580}。
+        """
+        self.preload_basics(
+            o["symbol"] for o in orders
+            if o.get("price_type", PriceType.MKT) == PriceType.LMT
+        )
+
+        futures = []
+        n_failed = 0
+        for kwargs in orders:
+            kwargs = dict(kwargs)
+            user_def = kwargs.setdefault("user_def", self.next_user_def())
+            err_msg = self._check_risk(
+                kwargs["symbol"], kwargs["side"], kwargs["qty"], kwargs["price"],
+                kwargs.get("price_type", PriceType.MKT), user_def
+            )
+            if err_msg is not None:
+                n_failed += 1
+                future = Future()
+                future.set_exception(ValueError(err_msg))
+                futures.append(future)
+                continue
+
+            order = self._make_order(**kwargs)
+
+            future = self.trader.expect_ack(user_def)
+            try:
+                sent = self._submit(NEW, self.api.NewOrder, order)
+            except Exception as e:
+                # 例如 SendScheduler 已關閉
+                sent = Future()
+                sent.set_exception(e)
+            sent.add_done_callback(lambda f, user_def=user_def: self._on_new_order_sent(user_def, f))
+            # 已取消的 Future 呼叫 exception() 會拋出 CancelledError，須先檢查
+            if sent.done() and (sent.cancelled() or sent.exception() is not None or sent.result() != RCode.OK):
+                n_failed += 1
+            futures.append(future)
+
+        if self.verbose:
+            print(f"已送出 {len(orders) - n_failed} 筆委託，失敗 {n_failed} 筆")
+
+        return futures
+
+    def _on_new_order_sent(self, user_def: str, sent: Future):
+        if sent.cancelled():
+            error = RuntimeError("NewOrder cancelled before sending")
+        elif sent.exception() is not None:
+            error = sent.exception()
+        elif sent.result() != RCode.OK:
+            error = RuntimeError(f"NewOrder failed: {sent.result()}")
+        else:
+            return
+        self.risk.release(user_def)
+        self.trader.discard_ack(user_def, error)
+
     def buy(self, symbol: str, qty: int, price: float):
         self.set_order(symbol, Side.Buy, qty * 1000, price)
 
     def sell(self, symbol: str, qty: int, price: float):
         self.set_order(symbol, Side.Sell, qty * 1000, price)
 
-    def change_price(self, order_number: str, mod_price: float):
-        replaceOrder = OrderPriceChange(
+    def _send_amend(self, order_number: str, kind: str, value: Any) -> Future:
+        if kind == "price":
+            replaceOrder = OrderPriceChange(
+                ordNo=order_number,
+                price=str(value),
+                tradingAccount=self.account_number
+            )
+            return self._submit(AMEND, self.api.ChangeOrderPrice, replaceOrder, key=("price", order_number))
+        replaceOrder = OrderQtyChange(
             ordNo=order_number,
-            price=str(mod_price),
+            qty=str(value),
             tradingAccount=self.account_number
         )
-        rcode = self.api.ChangeOrderPrice(replaceOrder)
-        if rcode == RCode.OK:
-            print(u'已送出委託')
-        else:
-            print(u'改價失敗! 請再次執行程式，依據回報資料修正輸入')
-
-    def change_qty(self, order_number, mod_qty: int):
+        return self._submit(AMEND, self.api.ChangeOrderQty, replaceOrder, key=("qty", order_number))
+
+    def change_price_future(self, order_number: str, mod_price: float) -> Future:
+        """
+        送出改價，結果為 RCode。同一委託書號前一筆改單尚未收到回報時先排隊，
+        排隊中的改價只保留最後一次。
+        """
+        return self.amends.submit(order_number, "price", mod_price)
+
+    def change_qty_future(self, order_number: str, mod_qty: int) -> Future:
+        """ 送出改量，mod_qty 為 0 時即刪單，以最高優先送出並取消同一委託書號排隊中的改單 """
+        if int(mod_qty) != 0:
+            return self.amends.submit(order_number, "qty", mod_qty)
+
+        self.amends.drop(order_number)
+        if self.sender is not None:
+            self.sender.drop(("price", order_number))
+            self.sender.drop(("qty", order_number))
         replaceOrder = OrderQtyChange(
             ordNo=order_number,
             qty=str(mod_qty),
             tradingAccount=self.account_number
         )
-        rcode = self.api.ChangeOrderQty(replaceOrder)
+        return self._submit(CANCEL, self.api.ChangeOrderQty, replaceOrder, key=("cancel", order_number))
+
+    def _wait_amend(self, future: Future, timeout: float = None) -> RCode:
+        """ 等待改單送出，逾時或被取消（例如委託已結束）時回傳 None """
+        timeout = self.query_timeout if timeout is None else timeout
+        try:
+            return future.result(timeout=timeout)
+        except (FutureTimeoutError, CancelledError):
+            return None
+
+    def change_price(self, order_number: str, mod_price: float, timeout: float = None):
+        rcode = self._wait_amend(self.change_price_future(order_number, mod_price), timeout)
+        if rcode == RCode.OK:
+            print(u'已送出委託')
+        else:
+            print(u'改價失敗! 請再次執行程式，依據回報資料修正輸入')
+
+    def change_qty(self, order_number, mod_qty: int, timeout: float = None):
+        rcode = self._wait_amend(self.change_qty_future(order_number, mod_qty), timeout)
         if rcode == RCode.OK:
             print(u'已送出委託')
         else:
-            print(u'改量失敗! 請再次執行程式，依據回報資料修正輸入')
\ No newline at end of file
+            print(u'改量失敗! 請再次執行程式，依據回報資料修正輸入')
+
+    def cancel_order_future(self, order_number: str) -> Future:
+        """
+        刪單（改量為 0），委託結束時完成，結果為 OrderState。
+
+        刪單要求被拒絕時委託仍未結束，future 不會完成，委託留在未完成委託中可再次刪單。
+        """
+        closed = self.trader.expect_close(order_number)
+        if closed.done():
+            return closed
+
+        def on_sent(sent: Future):
+            if sent.cancelled():
+                error = RuntimeError("Cancel dropped before sending")
+            elif sent.exception() is not None:
+                error = sent.exception()
+            elif sent.result() != RCode.OK:
+                error = RuntimeError(f"ChangeOrderQty failed: {sent.result()}")
+            else:
+                return
+            self.trader.discard_close(order_number, closed, error)
+
+        self.change_qty_future(order_number, 0).add_done_callback(on_sent)
+        return closed
+
+    def cancel_orders(self, symbol: str = None, timeout: float = None) -> CancelReport:
+        """
+        刪除未完成委託，symbol 為 None 時刪除全部。
+
+        未完成委託由委託狀態簿取得，所有刪單連續送出後再一起等待回報，
+        最多等待 timeout 秒；回傳各筆是否確認、失敗原因與所花時間。
+        """
+        timeout = self.query_timeout if timeout is None else timeout
+        t0 = time.perf_counter()
+        ordNos = [state.ordNo for state in self.trader.order_book.open_orders(symbol)]
+
+        latencies: Dict[str, float] = {}
+
+        def on_closed(ordNo: str, future: Future):
+            latencies[ordNo] = time.perf_counter() - t0
+
+        futures = {}
+        for ordNo in ordNos:
+            future = self.cancel_order_future(ordNo)
+            future.add_done_callback(lambda f, ordNo=ordNo: on_closed(ordNo, f))
+            futures[ordNo] = future
+
+        wait(list(futures.values()), timeout=timeout)
+        elapsed = time.perf_counter() - t0
+
+        confirmed, failed, pending = [], {}, []
+        for ordNo, future in futures.items():
+            if not future.done():
+                pending.append(ordNo)
+                self.trader.discard_close(ordNo, future)
+            elif future.exception() is not None:
+                failed[ordNo] = str(future.exception())
+            else:
+                confirmed.append(ordNo)
+
+        report = CancelReport(ordNos, confirmed, failed, pending, elapsed, dict(latencies))
+        if self.verbose:
+            print(
+                f"刪單 {len(ordNos)} 筆：確認 {len(confirmed)} 筆，失敗 {len(failed)} 筆，"
+                f"逾時 {len(pending)} 筆，耗時 {elapsed:.3f} 秒"
+            )
+        return report
+
+    def cancel_order(self, order_number: str, timeout: float = None) -> CancelReport:
+        """ 刪除單筆委託並等待確認 """
+        timeout = self.query_timeout if timeout is None else timeout
+        t0 = time.perf_counter()
+        future = self.cancel_order_future(order_number)
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.trader.discard_close(order_number, future)
+            return CancelReport([order_number], [], {}, [order_number], time.perf_counter() - t0, {})
+        except Exception as e:
+            return CancelReport([order_number], [], {order_number: str(e)}, [], time.perf_counter() - t0, {})
+
+        elapsed = time.perf_counter() - t0
+        return CancelReport([order_number], [order_number], {}, [], elapsed, {order_number: elapsed})
+
+    def cancel_all(self, timeout: float = None) -> CancelReport:
+        """ 刪除所有未完成委託，例如收盤前出清 """
+        return self.cancel_orders(None, timeout)
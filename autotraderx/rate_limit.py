@@ -0,0 +1,59 @@
+import threading
+import time
+
+__all__ = ["TokenBucket"]
+
+
+class TokenBucket:
+    """
+    執行緒安全的 token bucket 限流器。
+
+    Args:
+        rate (float): 每秒補充的 token 數。
+        burst (int): bucket 容量，即允許的瞬間突發量。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be larger than 0.")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, t: float):
+        self._tokens = min(self.burst, self._tokens + (t - self._last) * self.rate)
+        self._last = t
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """ 距離可取得 tokens 所需的秒數 """
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(tokens - self._tokens, 0) / self.rate
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                t = time.monotonic()
+                self._refill(t)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - t
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
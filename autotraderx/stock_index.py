@@ -0,0 +1,284 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Union
+
+import numpy as np
+
+__all__ = ["StockInfo", "StockIndex", "get_stock_index"]
+
+
+DEFAULT_JSON_PATH = Path(__file__).resolve().parent / "stock_infos.json"
+
+# 檔頭：magic, 版本, 代號欄寬, 筆數, meta 長度
+_HEADER = struct.Struct("<4sHHII")
+_MAGIC = b"ATXS"
+_ENDS = struct.Struct("<II")
+_VERSION = 1
+
+# 以字串儲存的欄位，市場別與產業別另以類別編號儲存
+_STR_FIELDS = ("name", "list_date", "isin")
+
+
+class StockInfo(NamedTuple):
+    code: str
+    name: str
+    market: str
+    industry: str
+    list_date: str
+    isin: str
+
+    def to_dict(self) -> Dict[str, str]:
+        """ 與 stock_infos.json 相同的中文欄位 """
+        return {
+            "名稱": self.name,
+            "代號": self.code,
+            "市場別": self.market,
+            "產業別": self.industry,
+            "上市日期": self.list_date,
+            "國際代碼": self.isin,
+        }
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _layout(start: int, rows: int, code_width: int) -> Dict[str, int]:
+    """ 各區段在檔案中的位移，讀寫兩端共用 """
+    layout = {"codes": _align(start)}
+    layout["market"] = _align(layout["codes"] + rows * code_width)
+    layout["industry"] = _align(layout["market"] + rows * 2)
+    layout["ends"] = _align(layout["industry"] + rows * 2)
+    layout["blob"] = _align(layout["ends"] + len(_STR_FIELDS) * (rows + 1) * 4)
+    return layout
+
+
+class StockIndex:
+    """
+    股票基本資料索引。
+
+    由 stock_infos.json 編譯成一個二進位快照：代號排序後存成定長位元組陣列，
+    市場別與產業別存成類別編號，其餘字串依欄位接成一段 UTF-8 資料並記錄
+    結束位置。快照以 mmap 唯讀開啟，不需在每次啟動時解析整份 JSON，
+    查詢時才解碼需要的欄位。
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        magic, version, code_width, rows, meta_len = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Invalid stock index snapshot.")
+
+        meta = json.loads(bytes(buffer[_HEADER.size:_HEADER.size + meta_len]).decode("utf-8"))
+        layout = _layout(_HEADER.size + meta_len, rows, code_width)
+
+        self._buffer = buffer
+        self._rows = rows
+        self._markets: List[str] = meta["markets"]
+        self._industries: List[str] = meta["industries"]
+        self._blob = layout["blob"]
+        self._ends_offset = layout["ends"]
+
+        self._codes = np.frombuffer(buffer, dtype=f"S{code_width}", count=rows, offset=layout["codes"])
+        self._market_ids = np.frombuffer(buffer, dtype="<u2", count=rows, offset=layout["market"])
+        self._industry_ids = np.frombuffer(buffer, dtype="<u2", count=rows, offset=layout["industry"])
+        self._ends = np.frombuffer(
+            buffer, dtype="<u4", count=len(_STR_FIELDS) * (rows + 1), offset=layout["ends"]
+        ).reshape(len(_STR_FIELDS), rows + 1)
+
+        self._row_of: Dict[str, int] = None
+
+    @classmethod
+    def from_dict(cls, infos: Dict[str, Dict[str, str]]) -> "StockIndex":
+        return cls(cls.compile(infos))
+
+    @classmethod
+    def from_json(cls, path: Union[str, Path]) -> "StockIndex":
+        with open(str(path), "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "StockIndex":
+        with open(str(path), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    @classmethod
+    def load(cls, json_path: Union[str, Path] = None, snapshot_path: Union[str, Path] = None) -> "StockIndex":
+        """
+        優先開啟快照；快照不存在或比 JSON 舊時重新編譯並寫出快照，
+        無法寫入時只使用記憶體中的索引。
+        """
+        json_path = Path(json_path or DEFAULT_JSON_PATH)
+        snapshot_path = Path(snapshot_path or json_path.with_suffix(".idx"))
+
+        if snapshot_path.exists() and (
+            not json_path.exists() or snapshot_path.stat().st_mtime >= json_path.stat().st_mtime
+        ):
+            return cls.open(snapshot_path)
+
+        with open(str(json_path), "r", encoding="utf-8") as f:
+            buffer = cls.compile(json.load(f))
+
+        tmp = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(str(tmp), "wb") as f:
+                f.write(buffer)
+            os.replace(str(tmp), str(snapshot_path))
+        except OSError:
+            if tmp.exists():
+                tmp.unlink()
+
+        return cls(buffer)
+
+    @staticmethod
+    def compile(infos: Dict[str, Dict[str, str]]) -> bytes:
+        """ 將 stock_infos.json 的內容編譯成快照 """
+        codes = sorted(infos)
+        rows = len(codes)
+        encoded = [c.encode("utf-8") for c in codes]
+        code_width = max((len(c) for c in encoded), default=1)
+
+        markets = sorted({infos[c]["市場別"] for c in codes})
+        industries = sorted({infos[c]["產業別"] for c in codes})
+        market_no = {m: i for i, m in enumerate(markets)}
+        industry_no = {m: i for i, m in enumerate(industries)}
+
+        meta = json.dumps({"markets": markets, "industries": industries}, ensure_ascii=False).encode("utf-8")
+        layout = _layout(_HEADER.size + len(meta), rows, code_width)
+
+        keys = {"name": "名稱", "list_date": "上市日期", "isin": "國際代碼"}
+        chunks = []
+        ends = np.zeros((len(_STR_FIELDS), rows + 1), dtype="<u4")
+        offset = 0
+        for i, field in enumerate(_STR_FIELDS):
+            values = [infos[c][keys[field]].encode("utf-8") for c in codes]
+            ends[i, 0] = offset
+            ends[i, 1:] = offset + np.cumsum([len(v) for v in values], dtype=np.int64)
+            offset = int(ends[i, -1])
+            chunks.extend(values)
+
+        buffer = bytearray(layout["blob"] + offset)
+        _HEADER.pack_into(buffer, 0, _MAGIC, _VERSION, code_width, rows, len(meta))
+        buffer[_HEADER.size:_HEADER.size + len(meta)] = meta
+
+        def put(name, array):
+            data = array.tobytes()
+            buffer[layout[name]:layout[name] + len(data)] = data
+
+        put("codes", np.array(encoded, dtype=f"S{code_width}"))
+        put("market", np.array([market_no[infos[c]["市場別"]] for c in codes], dtype="<u2"))
+        put("industry", np.array([industry_no[infos[c]["產業別"]] for c in codes], dtype="<u2"))
+        put("ends", ends)
+        buffer[layout["blob"]:] = b"".join(chunks)
+        return bytes(buffer)
+
+    def _field(self, field: int, row: int) -> str:
+        # 單筆查詢直接以 struct 讀取，比 numpy 純量索引快
+        start, end = _ENDS.unpack_from(self._buffer, self._ends_offset + (field * (self._rows + 1) + row) * 4)
+        return self._buffer[self._blob + start:self._blob + end].decode("utf-8")
+
+    def _info(self, row: int) -> StockInfo:
+        return StockInfo(
+            code=self._codes[row].decode("utf-8"),
+            name=self._field(0, row),
+            market=self._markets[self._market_ids[row]],
+            industry=self._industries[self._industry_ids[row]],
+            list_date=self._field(1, row),
+            isin=self._field(2, row),
+        )
+
+    def _row(self, code: str) -> int:
+        if self._row_of is None:
+            self._row_of = {c.decode("utf-8"): i for i, c in enumerate(self._codes.tolist())}
+        return self._row_of.get(code)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, code: str) -> bool:
+        return self._row(code) is not None
+
+    def __getitem__(self, code: str) -> Dict[str, str]:
+        """ 與 stock_infos.json 相同格式的 dict，找不到時拋出 KeyError """
+        info = self.get(code)
+        if info is None:
+            raise KeyError(code)
+        return info.to_dict()
+
+    def get(self, code: str) -> StockInfo:
+        row = self._row(code)
+        return None if row is None else self._info(row)
+
+    def name(self, code: str, default: str = "") -> str:
+        row = self._row(code)
+        return default if row is None else self._field(0, row)
+
+    def codes(self) -> List[str]:
+        return [c.decode("utf-8") for c in self._codes.tolist()]
+
+    def markets(self) -> List[str]:
+        return list(self._markets)
+
+    def industries(self) -> List[str]:
+        return list(self._industries)
+
+    def by_prefix(self, prefix: str) -> List[StockInfo]:
+        """ 代號以 prefix 開頭的股票，依代號排序 """
+        key = prefix.encode("utf-8")
+        lo = int(np.searchsorted(self._codes, key, side="left"))
+        hi = int(np.searchsorted(self._codes, key + b"\xff", side="left"))
+        return [self._info(row) for row in range(lo, hi)]
+
+    def search_name(self, keyword: str) -> List[StockInfo]:
+        """ 名稱包含 keyword 的股票，直接在 UTF-8 資料上搜尋 """
+        key = keyword.encode("utf-8")
+        name_ends = self._ends[0]
+        start = self._blob + int(name_ends[0])
+        end = self._blob + int(name_ends[-1])
+
+        rows = []
+        pos = self._buffer.find(key, start, end)
+        while pos != -1:
+            offset = pos - self._blob
+            row = int(np.searchsorted(name_ends, offset, side="right")) - 1
+            row_end = int(name_ends[row + 1])
+            if offset + len(key) <= row_end:
+                rows.append(row)
+                # 同一檔只列一次
+                pos = self._buffer.find(key, self._blob + row_end, end)
+            else:
+                pos = self._buffer.find(key, pos + 1, end)
+        return [self._info(row) for row in rows]
+
+    def filter(self, market: str = None, industry: str = None) -> List[StockInfo]:
+        """ 依市場別及產業別篩選 """
+        mask = np.ones(self._rows, dtype=bool)
+        if market is not None:
+            if market not in self._markets:
+                return []
+            mask &= self._market_ids == self._markets.index(market)
+        if industry is not None:
+            if industry not in self._industries:
+                return []
+            mask &= self._industry_ids == self._industries.index(industry)
+        return [self._info(int(row)) for row in np.flatnonzero(mask)]
+
+
+_SHARED: Dict[str, StockIndex] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def get_stock_index(json_path: Union[str, Path] = None) -> StockIndex:
+    """ 同一行程內共用的 StockIndex，每個 JSON 檔只載入一次 """
+    key = str(Path(json_path or DEFAULT_JSON_PATH).resolve())
+    index = _SHARED.get(key)
+    if index is None:
+        with _SHARED_LOCK:
+            index = _SHARED.get(key)
+            if index is None:
+                index = _SHARED[key] = StockIndex.load(key)
+    return index
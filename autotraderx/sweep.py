@@ -0,0 +1,126 @@
+import itertools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Type, Union
+
+import numpy as np
+from prettytable import PrettyTable
+from tqdm import tqdm as Tqdm
+
+from .backtest import BacktestEngine, Strategy
+from .trade_data import TRADE_DTYPE, TradeData
+
+__all__ = ["parameter_grid", "run_sweep", "format_sweep_table"]
+
+
+# 子行程共用的資料，由 _init_worker 以 memmap 開啟
+_SHARED_DATA: List[TradeData] = []
+
+
+def parameter_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def _dump_shared(data: List[TradeData], path: Path) -> List[Tuple[str, str, int, int]]:
+    """ 將所有 TradeData 接成一個 .npy 檔，回傳 (symbol, date, offset, length) 索引 """
+    total = sum(len(d) for d in data)
+    array = np.lib.format.open_memmap(path, mode="w+", dtype=TRADE_DTYPE, shape=(total,))
+
+    index = []
+    offset = 0
+    for d in data:
+        array[offset:offset + len(d)] = d.array
+        index.append((d.symbol, d.date, offset, len(d)))
+        offset += len(d)
+    array.flush()
+    del array
+    return index
+
+
+def _init_worker(path: str, index: List[Tuple[str, str, int, int]]):
+    global _SHARED_DATA
+    array = np.load(path, mmap_mode="r")
+    _SHARED_DATA = [
+        TradeData(symbol, array[offset:offset + length], date)
+        for symbol, date, offset, length in index
+    ]
+
+
+def _run_one(
+    strategy_cls: Type[Strategy],
+    params: Dict[str, Any],
+    engine_kwargs: Dict[str, Any],
+) -> Dict[str, Any]:
+    engine = BacktestEngine(strategy_cls(**params), **engine_kwargs)
+    engine.add_many(_SHARED_DATA)
+    result = engine.run()
+    return {**params, **result.summary()}
+
+
+def format_sweep_table(results: List[Dict[str, Any]], top: int = None) -> PrettyTable:
+    table = PrettyTable()
+    if not results:
+        return table
+    table.field_names = ["排名"] + list(results[0])
+    for rank, row in enumerate(results[:top], start=1):
+        table.add_row([rank] + list(row.values()))
+    table.align = "r"
+    return table
+
+
+def run_sweep(
+    strategy_cls: Type[Strategy],
+    grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]],
+    data: Iterable[TradeData],
+    metric: str = "net_pnl",
+    max_workers: int = None,
+    engine_kwargs: Dict[str, Any] = None,
+    workdir: Union[str, Path] = None,
+    verbose: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    以多行程對參數網格做回測，結果依 metric 由大到小排序。
+
+    歷史資料只寫出一次成 .npy 檔，各子行程以 memmap 唯讀開啟，
+    不會在每個任務間 pickle 複製成交資料。
+
+    Args:
+        strategy_cls (Type[Strategy]): 策略類別，以 strategy_cls(**params) 建立，需可被 pickle。
+        grid (Union[Dict, List[Dict]]): 參數網格，或已展開的參數組合。
+        data (Iterable[TradeData]): 回測用的歷史成交資料。
+        metric (str): 排序依據，為 BacktestResult.summary() 的欄位。
+        max_workers (int): 子行程數，預設為 CPU 核心數。
+        engine_kwargs (Dict): 傳給 BacktestEngine 的其他參數。
+        workdir (Union[str, Path]): 放置共用資料檔的資料夾，預設為暫存資料夾。
+        verbose (bool): 是否顯示進度與結果表格。
+    """
+    params_list = parameter_grid(grid) if isinstance(grid, dict) else list(grid)
+    engine_kwargs = engine_kwargs or {}
+    data = list(data)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmpdir:
+        path = Path(tmpdir) / "ticks.npy"
+        index = _dump_shared(data, path)
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(str(path), index),
+        ) as executor:
+            futures = [
+                executor.submit(_run_one, strategy_cls, params, engine_kwargs)
+                for params in params_list
+            ]
+            for future in Tqdm(as_completed(futures), total=len(futures), disable=not verbose, leave=False):
+                results.append(future.result())
+
+    results.sort(key=lambda r: r[metric], reverse=True)
+
+    if verbose:
+        print(format_sweep_table(results, top=20))
+
+    return results
@@ -0,0 +1,112 @@
+from typing import Union
+
+import numpy as np
+
+__all__ = [
+    "to_cents",
+    "tick_size",
+    "price_to_tick_index",
+    "tick_index_to_price",
+    "snap_price",
+    "shift_ticks",
+    "price_ladder",
+    "ticks_between",
+]
+
+
+# 臺灣證券交易所股票升降單位，以「分」為單位避免浮點誤差
+#   未滿 10 元: 0.01、10~50: 0.05、50~100: 0.1、100~500: 0.5、500~1000: 1、1000 以上: 5
+BAND_LOWER = np.array([0, 1000, 5000, 10000, 50000, 100000], dtype=np.int64)
+BAND_TICK = np.array([1, 5, 10, 50, 100, 500], dtype=np.int64)
+# 每個區間第一個價位在全域價位序號中的位置
+BAND_INDEX = np.concatenate([[0], np.cumsum(np.diff(BAND_LOWER) // BAND_TICK[:-1])]).astype(np.int64)
+
+Prices = Union[float, np.ndarray]
+
+_MODES = ("nearest", "up", "down")
+
+# 換算為「分」時容許的浮點誤差
+_EPS = 1e-6
+
+
+def _result(value: np.ndarray, scalar: bool):
+    return value.item() if scalar else value
+
+
+def to_cents(price: Prices, mode: str = "nearest") -> np.ndarray:
+    """
+    價格轉為整數「分」，10.049999 這類浮點誤差會被修正為 1005；
+    不足一分的部分依 mode 四捨五入、無條件進位或捨去。
+    """
+    cents = np.asarray(price, dtype=np.float64) * 100
+    if mode == "up":
+        cents = np.ceil(cents - _EPS)
+    elif mode == "down":
+        cents = np.floor(cents + _EPS)
+    else:
+        cents = np.rint(cents)
+    return cents.astype(np.int64)
+
+
+def tick_size(price: Prices) -> Prices:
+    """ 價格所在區間的升降單位 """
+    cents = to_cents(price)
+    band = np.searchsorted(BAND_LOWER, cents, side="right") - 1
+    return _result(BAND_TICK[band] / 100, np.ndim(price) == 0)
+
+
+def price_to_tick_index(price: Prices, mode: str = "nearest") -> Union[int, np.ndarray]:
+    """
+    價格轉為全域價位序號，0.01 元為 1，每往上一個合法價位加 1。
+
+    不在價位上的價格依 mode 取最接近（nearest，剛好一半時往上）、
+    往上（up）或往下（down）的價位。
+    """
+    if mode not in _MODES:
+        raise ValueError(f"Invalid mode: {mode}, must be one of {_MODES}.")
+
+    cents = to_cents(price, mode)
+    if np.any(cents <= 0):
+        raise ValueError("Input price must larger than 0.")
+
+    band = np.searchsorted(BAND_LOWER, cents, side="right") - 1
+    tick = BAND_TICK[band]
+    q, r = np.divmod(cents - BAND_LOWER[band], tick)
+    index = BAND_INDEX[band] + q
+
+    if mode == "up":
+        index = index + (r > 0)
+    elif mode == "nearest":
+        index = index + (2 * r >= tick)
+    return _result(index, np.ndim(price) == 0)
+
+
+def tick_index_to_price(index: Union[int, np.ndarray]) -> Prices:
+    idx = np.maximum(np.asarray(index, dtype=np.int64), 1)
+    band = np.searchsorted(BAND_INDEX, idx, side="right") - 1
+    cents = BAND_LOWER[band] + (idx - BAND_INDEX[band]) * BAND_TICK[band]
+    return _result(cents / 100, np.ndim(index) == 0)
+
+
+def snap_price(price: Prices, mode: str = "nearest") -> Prices:
+    """ 將價格對齊到合法價位 """
+    return tick_index_to_price(price_to_tick_index(price, mode))
+
+
+def shift_ticks(price: Prices, n: Union[int, np.ndarray], mode: str = "nearest") -> Prices:
+    """ 由 price（先依 mode 對齊價位）移動 n 個價位，跨越區間時依各區間的升降單位計算 """
+    return tick_index_to_price(np.asarray(price_to_tick_index(price, mode)) + n)
+
+
+def price_ladder(price: Prices, n_ticks: int, step: int = 1, mode: str = "nearest") -> np.ndarray:
+    """
+    由 price 起每隔 step 個價位取一個價格，共 n_ticks 個；step 為負時往下。
+    price 為陣列時結果的最後一維為階梯。
+    """
+    index = np.asarray(price_to_tick_index(price, mode))[..., None]
+    return tick_index_to_price(index + step * np.arange(n_ticks))
+
+
+def ticks_between(low: Prices, high: Prices) -> Union[int, np.ndarray]:
+    """ 兩個價位之間相差幾個價位 """
+    return price_to_tick_index(high) - price_to_tick_index(low)
@@ -0,0 +1,181 @@
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .utils import us_to_match_time
+
+__all__ = ["TickStore", "TICK_COLUMNS"]
+
+
+# 欄位名稱, array typecode, numpy dtype
+TICK_COLUMNS = (
+    ("time", "q", np.dtype("<i8")),       # 當日微秒數
+    ("price", "d", np.dtype("<f8")),      # 成交價
+    ("qty", "q", np.dtype("<i8")),        # 成交量
+    ("total_qty", "q", np.dtype("<i8")),  # 總量
+    ("diff", "d", np.dtype("<f8")),       # 與昨收價差
+)
+
+
+# 已完整寫入的筆數，每批資料的所有欄位寫出後才更新
+_COMMITTED_FILE = "committed.bin"
+_COUNT = struct.Struct("<Q")
+
+
+def _column_rows(folder: Path) -> List[int]:
+    rows = []
+    for name, _, dtype in TICK_COLUMNS:
+        path = folder / f"{name}.bin"
+        rows.append(path.stat().st_size // dtype.itemsize if path.exists() else 0)
+    return rows
+
+
+def _committed_rows(folder: Path) -> int:
+    """ 已確認寫入的筆數；沒有紀錄檔（舊版資料）時以最短的欄位為準 """
+    rows = min(_column_rows(folder))
+    try:
+        raw = (folder / _COMMITTED_FILE).read_bytes()
+    except FileNotFoundError:
+        return rows
+    if len(raw) != _COUNT.size:
+        return 0
+    return min(_COUNT.unpack(raw)[0], rows)
+
+
+class _ColumnAppender:
+    """
+    逐批 append 各欄位，所有欄位寫出後才更新 committed.bin 的筆數。
+    開啟時先把各欄位截斷為已確認的筆數，上次寫入中斷留下的部分資料
+    不會讓之後 append 的各欄位錯位。
+    """
+
+    def __init__(self, folder: Path):
+        folder.mkdir(parents=True, exist_ok=True)
+        self.rows = _committed_rows(folder)
+        for (name, _, dtype), size in zip(TICK_COLUMNS, _column_rows(folder)):
+            if size > self.rows:
+                os.truncate(folder / f"{name}.bin", self.rows * dtype.itemsize)
+        self.files = [
+            open(folder / f"{name}.bin", "ab")
+            for name, _, _ in TICK_COLUMNS
+        ]
+        path = folder / _COMMITTED_FILE
+        self.committed = open(path, "r+b" if path.exists() else "w+b")
+        self._commit()
+
+    def _commit(self):
+        self.committed.seek(0)
+        self.committed.write(_COUNT.pack(self.rows))
+        self.committed.flush()
+
+    def write(self, records: Sequence[Tuple]):
+        for idx, (f, (_, typecode, _)) in enumerate(zip(self.files, TICK_COLUMNS)):
+            array(typecode, [r[idx] for r in records]).tofile(f)
+        for f in self.files:
+            f.flush()
+        self.rows += len(records)
+        self._commit()
+
+    def flush(self):
+        for f in self.files:
+            f.flush()
+        self.committed.flush()
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.committed.close()
+
+
+class TickStore:
+    """
+    以欄位為單位的成交資料儲存格式。
+
+    每個交易日、每檔股票一個資料夾，每個欄位一個固定寬度的二進位檔
+    （little-endian），寫入時逐批 append，讀取時以 np.memmap 直接映射。
+    committed.bin 記錄完整寫入的筆數，讀取時只取到該筆數為止。
+
+        {root}/{date}/{symbol}/time.bin
+        {root}/{date}/{symbol}/price.bin
+        ...
+        {root}/{date}/{symbol}/committed.bin
+    """
+
+    def __init__(self, root: Union[str, Path] = "tick_store"):
+        self.root = Path(root)
+
+    def folder(self, symbol: str, date: str) -> Path:
+        return self.root / date / symbol
+
+    def open_appender(self, key: Tuple[str, str]) -> _ColumnAppender:
+        """ 給 TickWriter 使用的 opener，key 為 (date, symbol) """
+        date, symbol = key
+        return _ColumnAppender(self.folder(symbol, date))
+
+    def append(self, symbol: str, date: str, records: Sequence[Tuple]):
+        appender = _ColumnAppender(self.folder(symbol, date))
+        try:
+            appender.write(records)
+        finally:
+            appender.close()
+
+    def dates(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def symbols(self, date: str) -> List[str]:
+        folder = self.root / date
+        if not folder.is_dir():
+            return []
+        return sorted(p.name for p in folder.iterdir() if p.is_dir())
+
+    def read(self, symbol: str, date: str) -> Dict[str, np.ndarray]:
+        """ 回傳唯讀的 memmap 欄位，不複製資料 """
+        folder = self.folder(symbol, date)
+        # 寫入中斷時各欄位長度可能不一致，只取已確認寫入的部分
+        count = _committed_rows(folder) if folder.is_dir() else 0
+        columns = {}
+        for name, _, dtype in TICK_COLUMNS:
+            if count == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(folder / f"{name}.bin", dtype=dtype, mode="r", shape=(count,))
+        return columns
+
+    def render_markdown(
+        self,
+        symbol: str,
+        date: str,
+        path: Union[str, Path] = None
+    ) -> str:
+        """ 將儲存的成交資料輸出為原本的 markdown 成交紀錄表 """
+        columns = self.read(symbol, date)
+
+        markdown_lines = []
+        markdown_lines.append(f"# 日成交資料 - {symbol}\n")
+        markdown_lines.append("| 成交時間 | 成交價 | 漲跌 | 成交量 | 總量 |")
+        markdown_lines.append("| ---- | ---- | ---- | ---- | ---- |\n")
+        formatted_text = "\n".join(markdown_lines)
+
+        rows = [
+            f"| {us_to_match_time(t)} | {p} | {d:+.3f} | {q} | {tq}\n"
+            for t, p, q, tq, d in zip(
+                columns["time"].tolist(),
+                columns["price"].tolist(),
+                columns["qty"].tolist(),
+                columns["total_qty"].tolist(),
+                columns["diff"].tolist(),
+            )
+        ]
+        formatted_text += "".join(rows)
+
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(formatted_text)
+
+        return formatted_text
@@ -0,0 +1,196 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+__all__ = ["TickWriter"]
+
+
+class _TextSink:
+
+    def __init__(self, path: str):
+        self.f = open(path, "a", encoding="utf-8")
+
+    def write(self, records: List[str]):
+        self.f.write("".join(records))
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class TickWriter:
+    """
+    非同步批次寫檔器。
+
+    行情 callback 只負責把資料放進有界佇列，由背景執行緒持有每個 key
+    （預設為檔案路徑）的 handle，依筆數或時間批次寫出。寫出失敗時該批
+    資料計入 failed、錯誤記錄於 last_error，並關閉該 key 的 handle，
+    下一批重新開啟，背景執行緒不會因此停止。
+
+    Args:
+        opener (Callable[[Hashable], Any]): 依 key 開啟 sink 的函式，sink 需提供
+            write(records)/flush()/close()，預設以 append 模式開啟文字檔。
+        max_queue (int): 佇列上限，佇列滿時丟棄資料並計數。
+        batch_size (int): 累積筆數達到此值即寫出。
+        flush_interval (float): 距上次寫出超過此秒數即寫出。
+    """
+
+    def __init__(
+        self,
+        opener: Callable[[Hashable], Any] = None,
+        max_queue: int = 100000,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+    ):
+        self.opener = opener or _TextSink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._handles: Dict[Hashable, Any] = {}
+        self._pending: Dict[Hashable, List[Any]] = {}
+        self._pending_count = 0
+        self._thread = None
+        self._stop = object()
+        self._stopping = False
+
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.failed = 0
+        self.errors = 0
+        self.last_error: Exception = None
+        self.written = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._worker, name="TickWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> bool:
+        """ 寫出剩餘資料並關閉所有 handle，timeout 秒內未完成時回傳 False，可再次呼叫 """
+        thread = self._thread
+        if thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if not self._stopping and thread.is_alive():
+            try:
+                self._queue.put(self._stop, timeout=timeout)
+            except queue.Full:
+                return False
+            self._stopping = True
+
+        thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if thread.is_alive():
+            return False
+        self._thread = None
+        self._stopping = False
+        return True
+
+    def put(self, key: Hashable, record: Any) -> bool:
+        """ 由行情 callback 呼叫，不阻塞；佇列已滿時回傳 False """
+        try:
+            self._queue.put_nowait((key, record))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "errors": self.errors,
+                "written": self.written,
+                "flushes": self.flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": self.max_flush_ms,
+                "avg_flush_ms": self._total_flush_ms / self.flushes if self.flushes else 0.0,
+            }
+
+    def _worker(self):
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(self.flush_interval - (time.monotonic() - last_flush), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._stop:
+                self._flush()
+                self._close_all()
+                return
+
+            if item is not None:
+                key, record = item
+                self._pending.setdefault(key, []).append(record)
+                self._pending_count += 1
+
+            if self._pending_count >= self.batch_size \
+                    or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush()
+                last_flush = time.monotonic()
+
+    def _flush(self):
+        if not self._pending_count:
+            return
+
+        t0 = time.perf_counter()
+        written = 0
+        for key, records in self._pending.items():
+            if not records:
+                continue
+            try:
+                handle = self._handles.get(key)
+                if handle is None:
+                    handle = self._handles[key] = self.opener(key)
+                handle.write(records)
+                handle.flush()
+                written += len(records)
+            except Exception as e:
+                self._on_error(key, records, e)
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        with self._lock:
+            self.written += written
+            self.flushes += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self._total_flush_ms += elapsed
+
+        self._pending = {}
+        self._pending_count = 0
+
+    def _on_error(self, key: Hashable, records: List[Any], error: Exception):
+        with self._lock:
+            self.errors += 1
+            self.failed += len(records)
+            self.last_error = error
+        print(f"TickWriter: failed to write {len(records)} records to {key}: {error!r}")
+
+        handle = self._handles.pop(key, None)
+        if handle is not None:
+            try:
+                handle.close()
+            except Exception:
+                pass
+
+    def _close_all(self):
+        handles, self._handles = self._handles, {}
+        for key, handle in handles.items():
+            try:
+                handle.close()
+            except Exception as e:
+                self._on_error(key, [], e)
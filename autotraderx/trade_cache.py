@@ -0,0 +1,159 @@
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple, Union
+
+import numpy as np
+
+from .trade_data import TRADE_DTYPE, TradeData
+
+__all__ = ["TradeCache"]
+
+
+# magic, version, reserved, rows, crc32
+_HEADER = struct.Struct("<4sHHQI")
+_MAGIC = b"ATXT"
+_VERSION = 1
+
+
+class TradeCache:
+    """
+    歷史成交資料的本機快取，以 (prod_id, date) 為 key。
+
+    每個 key 存成一個二進位檔：固定長度 header 後接 TRADE_DTYPE 的原始
+    bytes，header 內含筆數與 CRC32，讀取時驗證失敗即視為未命中並刪除。
+    總容量超過 max_bytes 時依最近存取時間（LRU）淘汰。
+
+        {root}/{prod_id}/{date}.bin
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path] = "trade_cache",
+        max_bytes: int = 2 * 1024 ** 3,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # (prod_id, date) -> 檔案大小，依存取時間排序
+        self._total_bytes = 0
+        self._load_index()
+
+    def _path(self, prod_id: str, date: str) -> Path:
+        return self.root / prod_id / f"{date}.bin"
+
+    def _load_index(self):
+        if not self.root.is_dir():
+            return
+        entries = []
+        for path in self.root.glob("*/*.bin"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, (path.parent.name, path.stem), stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._index
+
+    def get(self, prod_id: str, date: str) -> TradeData:
+        """ 命中時回傳 TradeData，未命中或檔案損毀時回傳 None """
+        key = (prod_id, date)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+
+            path = self._path(prod_id, date)
+            try:
+                raw = path.read_bytes()
+            except OSError:
+                raw = b""
+
+            array = self._decode(raw)
+            if array is None:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._index.move_to_end(key)
+            os.utime(path)
+            self.hits += 1
+
+        return TradeData(prod_id, array, date)
+
+    def put(self, prod_id: str, date: str, data: TradeData):
+        key = (prod_id, date)
+        payload = data.array.tobytes()
+        header = _HEADER.pack(_MAGIC, _VERSION, 0, len(data), zlib.crc32(payload))
+
+        path = self._path(prod_id, date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            size = _HEADER.size + len(payload)
+            self._index[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def verify(self) -> int:
+        """ 檢查所有快取檔，刪除損毀者並回傳刪除數量 """
+        removed = 0
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    raw = self._path(*key).read_bytes()
+                except OSError:
+                    raw = b""
+                if self._decode(raw) is None:
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def _decode(self, raw: bytes) -> np.ndarray:
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, _, rows, crc = _HEADER.unpack_from(raw)
+        payload = memoryview(raw)[_HEADER.size:]
+        if magic != _MAGIC or version != _VERSION \
+                or len(payload) != rows * TRADE_DTYPE.itemsize \
+                or zlib.crc32(payload) != crc:
+            return None
+        return np.frombuffer(raw, dtype=TRADE_DTYPE, count=rows, offset=_HEADER.size)
+
+    def _remove(self, key: Tuple[str, str]):
+        self._total_bytes -= self._index.pop(key, 0)
+        try:
+            self._path(*key).unlink()
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            self._remove(oldest)
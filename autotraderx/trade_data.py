@@ -0,0 +1,153 @@
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+from .utils import match_time_to_us
+
+__all__ = ["TradeData", "TRADE_DTYPE", "SIDE_BUY", "SIDE_SELL"]
+
+
+TRADE_DTYPE = np.dtype([
+    ("time", "<i8"),       # 當日微秒數
+    ("price", "<f8"),      # 成交價格
+    ("qty", "<i8"),        # 成交量
+    ("try_match", "?"),    # 是否為試搓
+    ("side", "i1"),        # 1: 買, -1: 賣, 0: 未知
+])
+
+SIDE_BUY, SIDE_SELL = 1, -1
+
+# 歷史成交明細（TBSRec.BS）為整數：1 外盤（買進成交）、2 內盤（賣出成交）
+_SIDE_MAP = {"B": SIDE_BUY, "S": SIDE_SELL, "Buy": SIDE_BUY, "Sell": SIDE_SELL, 1: SIDE_BUY, 2: SIDE_SELL}
+# records 還原為 TBSRec.BS 的整數，0 為未知
+_SIDE_BS = {SIDE_BUY: 1, SIDE_SELL: 2, 0: 0}
+
+
+def _us_to_sdk_time(us: int) -> float:
+    """ 當日微秒數轉回 TBSRec.Match_Time 的 float（HHMMSSffffff） """
+    seconds, micro = divmod(int(us), 1000000)
+    minutes, ss = divmod(seconds, 60)
+    hh, mm = divmod(minutes, 60)
+    return float(((hh * 100 + mm) * 100 + ss) * 1000000 + micro)
+
+
+def _to_flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().upper() in ("Y", "1", "TRUE", "T")
+    return bool(value)
+
+
+class TradeData:
+    """
+    歷史成交資料的欄位式容器。
+
+    資料存放於一個 structured array（TRADE_DTYPE），各欄位以屬性取得
+    numpy view；舊版的 list of dict 格式由 records 延遲產生。
+    """
+
+    def __init__(self, symbol: str, array: np.ndarray, date: str = None):
+        if array.dtype != TRADE_DTYPE:
+            raise TypeError(f"Expected dtype {TRADE_DTYPE}, got {array.dtype}.")
+        self.symbol = symbol
+        self.date = date
+        self.array = array
+        self._records = None
+
+    @classmethod
+    def empty(cls, symbol: str, date: str = None) -> "TradeData":
+        return cls(symbol, np.empty(0, dtype=TRADE_DTYPE), date)
+
+    @classmethod
+    def from_objects(cls, symbol: str, objects: Sequence[Any], date: str = None) -> "TradeData":
+        """ 由 TechAnalysis.GetHisBS_Stock 回傳的物件建立 """
+        rows = [
+            (
+                match_time_to_us(d.Match_Time),
+                float(d.Match_Price),
+                int(d.Match_Quantity),
+                _to_flag(d.Is_TryMatch),
+                _SIDE_MAP.get(d.BS, 0),
+            ) for d in objects
+        ]
+        return cls(symbol, np.array(rows, dtype=TRADE_DTYPE), date)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]], date: str = None) -> "TradeData":
+        """ 由舊版 BackTesting.get_data 的 list of dict 建立 """
+        symbol = records[0]["股票代號"] if len(records) else ""
+        rows = [
+            (
+                match_time_to_us(d["成交時間"]),
+                float(d["成交價格"]),
+                int(d["成交量"]),
+                _to_flag(d["試搓"]),
+                _SIDE_MAP.get(d["買賣"], 0),
+            ) for d in records
+        ]
+        return cls(symbol, np.array(rows, dtype=TRADE_DTYPE), date)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __repr__(self) -> str:
+        return f"TradeData(symbol={self.symbol!r}, date={self.date!r}, rows={len(self)})"
+
+    @property
+    def time(self) -> np.ndarray:
+        return self.array["time"]
+
+    @property
+    def price(self) -> np.ndarray:
+        return self.array["price"]
+
+    @property
+    def qty(self) -> np.ndarray:
+        return self.array["qty"]
+
+    @property
+    def try_match(self) -> np.ndarray:
+        return self.array["try_match"]
+
+    @property
+    def side(self) -> np.ndarray:
+        return self.array["side"]
+
+    def without_try_match(self) -> "TradeData":
+        return TradeData(self.symbol, self.array[~self.array["try_match"]], self.date)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        for t, p, q, tm, s in zip(
+            self.time.tolist(),
+            self.price.tolist(),
+            self.qty.tolist(),
+            self.try_match.tolist(),
+            self.side.tolist(),
+        ):
+            yield {
+                "股票代號": self.symbol,
+                "成交時間": _us_to_sdk_time(t),
+                "成交價格": p,
+                "成交量": q,
+                "試搓": tm,
+                "買賣": _SIDE_BS[s],
+            }
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """
+        舊版 BackTesting.get_data 的 list of dict 格式，第一次存取時才產生；
+        欄位型別與 SDK 相同：成交時間為 float 的 HHMMSSffffff，買賣為 1 外盤、2 內盤、0 未知
+        """
+        if self._records is None:
+            self._records = list(self.iter_records())
+        return self._records
+
+    def to_pandas(self):
+        import pandas as pd
+
+        df = pd.DataFrame(self.array)
+        df.insert(0, "symbol", self.symbol)
+        if self.date is not None:
+            df.index = pd.to_datetime(self.date, format="%Y%m%d") \
+                + pd.to_timedelta(df["time"].to_numpy(), unit="us")
+        return df
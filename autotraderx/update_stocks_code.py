@@ -1,53 +1,157 @@
+import argparse
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from .isin_parser import IsinRow, iter_isin_rows
+from .stock_index import DEFAULT_JSON_PATH
+
+__all__ = ["ISIN_URLS", "StockDiff", "fetch_pages", "load_fixtures", "parse_page", "diff_stock_infos", "update_stock_infos"]
+
 
 # 取得臺灣證券交易所公告內容
-urls = [
+ISIN_URLS = [
     "https://isin.twse.com.tw/isin/C_public.jsp?strMode=2", # 上市證券
     "https://isin.twse.com.tw/isin/C_public.jsp?strMode=4", # 上櫃證券
     "https://isin.twse.com.tw/isin/C_public.jsp?strMode=5"  # 興櫃證券
 ]
 
-# All data infos
-data = {}
+ENCODING = "cp950"
+CHUNK_SIZE = 1 << 16
+
+StockInfos = Dict[str, Dict[str, str]]
+
+
+class StockDiff(NamedTuple):
+    added: StockInfos
+    delisted: StockInfos
+    changed: Dict[str, Tuple[Dict[str, str], Dict[str, str]]]  # 代號 -> (舊資料, 新資料)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.delisted or self.changed)
+
+    def summary(self) -> str:
+        return f"新增 {len(self.added)} 檔，下市 {len(self.delisted)} 檔，異動 {len(self.changed)} 檔"
+
+
+def _to_info(row: IsinRow) -> Dict[str, str]:
+    return {
+        "名稱": row.name,
+        "代號": row.code,
+        "市場別": row.market,
+        "產業別": row.industry,
+        "上市日期": row.list_date,
+        "國際代碼": row.isin
+    }
+
+
+def parse_page(source: Union[bytes, str, Iterable[bytes]]) -> StockInfos:
+    """ 以串流方式解析 ISIN 頁面，source 可為分段的位元組 """
+    return {row.code: _to_info(row) for row in iter_isin_rows(source, ENCODING)}
+
+
+def fetch_pages(urls: List[str] = ISIN_URLS, timeout: float = 30.0) -> List[StockInfos]:
+    """ 以共用連線池的 Session 同時下載所有頁面，邊下載邊解析 """
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(urls))
+        session.mount("https://", adapter)
+
+        def _get(url):
+            with session.get(url, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                return parse_page(response.iter_content(CHUNK_SIZE))
+
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            return list(executor.map(_get, urls))
+
+
+def _read_chunks(path: Union[str, Path]) -> Iterator[bytes]:
+    with open(str(path), "rb") as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+
+
+def load_fixtures(paths: List[Union[str, Path]]) -> List[StockInfos]:
+    """ 解析先前存下的 ISIN 頁面，可離線更新或測試 """
+    return [parse_page(_read_chunks(p)) for p in paths]
+
+
+def diff_stock_infos(old: StockInfos, new: StockInfos) -> StockDiff:
+    return StockDiff(
+        added={code: new[code] for code in new.keys() - old.keys()},
+        delisted={code: old[code] for code in old.keys() - new.keys()},
+        changed={
+            code: (old[code], new[code])
+            for code in new.keys() & old.keys() if old[code] != new[code]
+        },
+    )
+
+
+def update_stock_infos(
+    output: Union[str, Path] = DEFAULT_JSON_PATH,
+    fixtures: List[Union[str, Path]] = None,
+    dry_run: bool = False,
+    verbose: bool = True,
+) -> StockDiff:
+    """
+    下載（或由 fixtures 讀取）ISIN 頁面並更新 stock_infos.json。
+
+    與現有檔案比較後只在有差異時寫入，寫入時先寫暫存檔再替換，
+    不會留下寫到一半的檔案。某個頁面解析失敗時，該市場別的舊資料會保留，
+    不會被當成下市。
+
+    Args:
+        output (Union[str, Path]): stock_infos.json 的路徑。
+        fixtures (List[Union[str, Path]]): 離線的 ISIN 頁面檔，None 時從網路下載。
+        dry_run (bool): 只計算差異，不寫入檔案。
+        verbose (bool): 是否輸出處理資訊。
+    """
+    output = Path(output)
+    pages = load_fixtures(fixtures) if fixtures is not None else fetch_pages()
+
+    data = {}
+    for index, infos in enumerate(pages, start=1):
+        if verbose:
+            print(f"Processing page {index}/{len(pages)}: {len(infos)} rows")
+        data.update(infos)
 
-total_urls = len(urls)
-for index, url in enumerate(urls, start=1):
-    print(f"Processing URL {index}/{total_urls}: {url}")
+    old = {}
+    if output.exists():
+        with open(str(output), "r", encoding="utf-8") as f:
+            old = json.load(f)
 
-    response = requests.get(url)
-    response.encoding = 'big5'  # 設定正確的編碼格式
+    markets = {info["市場別"] for info in data.values()}
+    for code, info in old.items():
+        if code not in data and info["市場別"] not in markets:
+            data[code] = info
 
-    # 使用 BeautifulSoup 解析 HTML
-    soup = BeautifulSoup(response.text, 'html.parser')
-    table = soup.find('table', {'class': 'h4'})
+    diff = diff_stock_infos(old, data)
+    if verbose:
+        print(diff.summary())
 
-    if not table:
-        print(f"Table not found for URL: {url}")
-        continue
+    if diff and not dry_run:
+        tmp = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+        with open(str(tmp), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(str(tmp), str(output))
+        if verbose:
+            print(f"All data has been processed and saved to {output}")
 
-    for row in table.find_all('tr')[1:]:  # 跳過表頭
-        cells = row.find_all('td')
-        if len(cells) != 7:
-            continue
+    return diff
 
-        code, name = cells[0].text.split("\u3000")
-        internationality = cells[1].text
-        list_date = cells[2].text
-        market_type = cells[3].text
-        industry_type = cells[4].text
 
-        data[code] = {
-            "名稱": name,
-            "代號": code,
-            "市場別": market_type,
-            "產業別": industry_type,
-            "上市日期": list_date,
-            "國際代碼": internationality
-        }
+def main():
+    parser = argparse.ArgumentParser(description="更新 stock_infos.json")
+    parser.add_argument("--output", type=str, default=str(DEFAULT_JSON_PATH))
+    parser.add_argument("--fixtures", type=str, nargs="+", default=None, help="離線的 ISIN 頁面檔")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    update_stock_infos(args.output, args.fixtures, args.dry_run)
 
-with open("stock_infos.json", "w", encoding="utf-8") as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
 
-print("All data has been processed and saved to stock_infos.json")
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,13 @@ from pathlib import Path
 from time import struct_time
 from typing import Any, Dict, List, Tuple, Union
 
+import numpy as np
 import yaml
 from natsort import natsorted
 from tqdm import tqdm as Tqdm
 
+from .tick_grid import price_to_tick_index, snap_price, tick_index_to_price
+
 __all__ = [
     "load_yaml",
     "load_json",
@@ -27,118 +30,190 @@ __all__ = [
     "now",
     "divide_into_parts",
     "divide_range",
+    "calc_handling_fee",
+    "calc_transaction_tax",
+    "calc_break_even_price",
+    "match_time_to_us",
+    "us_to_match_time",
 ]
 
 
 def get_next_tick_price(price, mode: str = "Buy"):
+    """
+    往上（Buy）或往下（Sell）的下一個合法價位，price 可為 NumPy 陣列。
 
-    thresholds = [
-        (10, 0.01),
-        (49.95, 0.05),
-        (99.9, 0.1),
-        (499.5, 0.5),
-        (999, 1),
-        (float('inf'), 5)  # Handle all prices above 999 inclusively
-    ]
-
+    以價位序號計算，跨越升降單位區間時（例如 10.00 往上為 10.05、
+    50.00 往下為 49.95）與證交所價位表一致；不在價位上的價格取
+    嚴格大於（Buy）或小於（Sell）price 的最近價位。
+    """
     direction = 1 if mode == "Buy" else -1 if mode == "Sell" else None
 
     if direction is None:
         raise ValueError("Invalid mode. Please use 'Buy' or 'Sell'.")
 
-    if price <= 0:
+    if np.any(np.asarray(price) <= 0):
         raise ValueError("Input price must larger than 0.")
 
-    for limit, change in thresholds:
-        if price <= limit:
-            return price + (change * direction)
-
-    raise ValueError("Unexpected price value.")
+    if direction > 0:
+        index = np.asarray(price_to_tick_index(price, "down")) + 1
+    else:
+        index = np.asarray(price_to_tick_index(price, "up")) - 1
+        if np.any(index < 1):
+            raise ValueError("No lower tick price for the input price.")
+    return tick_index_to_price(index if np.ndim(price) else index.item())
 
 
-def calc_minimum_profit(
+def calc_handling_fee(
     price: float,
-    number: int = 1,
-    mode: str = "Buy",
-    transaction_tax_percentage: float = 0.003,
+    shares: int,
     handling_fee_percentage: float = 0.001425,
     discount_percentage: float = 0.6,
-    is_day_trading: bool = False
-) -> float:
-    if mode not in ["Buy", "Sell"]:
-        raise ValueError("Input mode must be in ['Buy', 'Sell']")
+    minimum_fee: int = 20,
+) -> int:
+    """ 手續費，與 calc_minimum_profit 相同的算法：無條件進位，低於最低手續費以最低計 """
+    fee = math.ceil(price * shares * handling_fee_percentage * discount_percentage)
+    return max(fee, minimum_fee)
+
 
+def calc_transaction_tax(
+    price: float,
+    shares: int,
+    transaction_tax_percentage: float = 0.003,
+    is_day_trading: bool = False,
+) -> int:
+    """ 證交稅，僅賣出時收取；現股當沖減半 """
     day_trading_discount_percentage = 0.5 if is_day_trading else 1
+    return math.ceil(price * shares * transaction_tax_percentage * day_trading_discount_percentage)
 
-    if mode == "Buy":
-        initial_price = price
-        buy_handling_fee = math.ceil(price * number * 1000 * handling_fee_percentage * discount_percentage)
-        buy_handling_fee = max(buy_handling_fee, 20)
 
-        iteration = 0
-        max_iterations = 1000  # Prevent infinite loop
+def _handling_fee_array(amount, handling_fee_percentage, discount_percentage, minimum_fee):
+    return np.maximum(np.ceil(amount * handling_fee_percentage * discount_percentage), minimum_fee)
 
-        while iteration < max_iterations:
-            price = round(get_next_tick_price(price, mode=mode), 3)
-            sell_handling_fee = math.ceil(price * number * 1000 * handling_fee_percentage * discount_percentage)
-            sell_handling_fee = max(sell_handling_fee, 20)
-            transaction_tax = math.ceil(price * number * 1000 * transaction_tax_percentage * day_trading_discount_percentage)
 
-            profit = (price - initial_price) * number * 1000 - buy_handling_fee - sell_handling_fee - transaction_tax
-            if profit > 0:
-                break
+def _transaction_tax_array(amount, transaction_tax_percentage, day_trading_discount_percentage):
+    return np.ceil(amount * transaction_tax_percentage * day_trading_discount_percentage)
 
-            iteration += 1
 
-        if iteration == max_iterations:
-            raise Exception("Failed to find a profitable price within the max iterations.")
+def calc_break_even_price(
+    price,
+    number=1,
+    mode: str = "Buy",
+    transaction_tax_percentage: float = 0.003,
+    handling_fee_percentage: float = 0.001425,
+    discount_percentage: float = 0.6,
+    is_day_trading: bool = False,
+    minimum_fee: int = 20,
+):
+    """
+    扣除買賣手續費與證交稅後，第一個有獲利的出場價位。
 
-        info = {
-            "buy_price": round(initial_price, 3),
-            "number": number,
-            "buy_handling_fee": buy_handling_fee,
-            "sell_handling_fee": sell_handling_fee,
-            "transaction_tax": transaction_tax,
-            "sell_price": round(price, 3),
-            "estimated_profit": int(profit)
-        }
+    mode 為 Buy 時以 price 買進，往上找賣出價；為 Sell 時以 price 賣出，
+    往下找買回價。number 為張數，price 與 number 可為陣列，回傳形狀與
+    兩者 broadcast 的結果相同。
 
-        return price, info
+    價位越遠，價差的增加一定大於手續費與稅的增加，獲利隨價位單調，
+    因此以價位序號做二分搜尋：先倍增步數找到有獲利的上界，再逐步縮小。
+    """
+    if mode not in ["Buy", "Sell"]:
+        raise ValueError("Input mode must be in ['Buy', 'Sell']")
 
-    elif mode == "Sell":
-        initial_price = price
-        sell_handling_fee = math.ceil(price * number * 1000 * handling_fee_percentage * discount_percentage)
-        sell_handling_fee = max(sell_handling_fee, 20)
-        transaction_tax = math.ceil(price * number * 1000 * transaction_tax_percentage * day_trading_discount_percentage)
+    price, number = np.broadcast_arrays(
+        np.asarray(price, dtype=np.float64), np.asarray(number, dtype=np.int64))
+    if np.any(price <= 0):
+        raise ValueError("Input price must larger than 0.")
+    if np.any(number <= 0):
+        raise ValueError("Input number must larger than 0.")
 
-        iteration = 0
-        max_iterations = 1000  # Prevent infinite loop
+    day_trading_discount_percentage = 0.5 if is_day_trading else 1
+    direction = 1 if mode == "Buy" else -1
+    shares = number * 1000
 
-        while iteration < max_iterations:
-            price = round(get_next_tick_price(price, mode=mode), 3)
-            buy_handling_fee = math.ceil(price * number * 1000 * handling_fee_percentage * discount_percentage)
-            buy_handling_fee = max(sell_handling_fee, 20)
+    def fee(p):
+        return _handling_fee_array(p * shares, handling_fee_percentage, discount_percentage, minimum_fee)
 
-            profit = (initial_price - price) * number * 1000 - buy_handling_fee - sell_handling_fee - transaction_tax
-            if profit > 0:
-                break
+    def tax(p):
+        return _transaction_tax_array(p * shares, transaction_tax_percentage, day_trading_discount_percentage)
 
-            iteration += 1
+    # 進場一側的費用固定；稅只在賣出時收取
+    entry_cost = fee(price) + (tax(price) if mode == "Sell" else 0)
+    # 第 0 步為不超過進場價的價位，第 1 步起一定比進場價更有利
+    origin = np.asarray(price_to_tick_index(price, "down" if mode == "Buy" else "up"))
 
-        if iteration == max_iterations:
-            raise Exception("Failed to find a profitable price within the max iterations.")
+    def profitable(steps):
+        exit_price = tick_index_to_price(origin + direction * steps)
+        exit_cost = fee(exit_price) + (tax(exit_price) if mode == "Buy" else 0)
+        return (exit_price - price) * direction * shares - entry_cost - exit_cost > 0
 
-        info = {
-            "buy_price": round(initial_price, 3),
-            "number": number,
-            "buy_handling_fee": buy_handling_fee,
-            "sell_handling_fee": sell_handling_fee,
-            "transaction_tax": transaction_tax,
-            "sell_price": round(price, 3),
-            "estimated_profit": int(profit)
-        }
+    if mode == "Buy":
+        # 1000 元以上每個價位 500 分，換算為分時不會溢位
+        max_steps = np.full_like(origin, np.iinfo(np.int64).max // 4 // 500)
+    else:
+        # 往下最多只能走到 0.01 元
+        max_steps = origin - 1
+        if np.any(max_steps <= 0) or not profitable(max_steps).all():
+            raise ValueError("Failed to find a profitable price.")
+
+    lo = np.zeros_like(origin)
+    hi = np.minimum(np.ones_like(origin), max_steps)
+    found = profitable(hi)
+    while not found.all():
+        # 已走到最遠價位仍沒有獲利，例如費率設定錯誤
+        if np.all(found | (hi >= max_steps)):
+            raise ValueError("Failed to find a profitable price.")
+        lo = np.where(found, lo, hi)
+        hi = np.where(found, hi, np.minimum(hi * 2, max_steps))
+        found = profitable(hi)
+
+    # 不變式：lo 步沒有獲利、hi 步有獲利
+    while np.any(hi - lo > 1):
+        mid = (lo + hi) // 2
+        ok = profitable(mid)
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+
+    return tick_index_to_price(origin + direction * hi)
 
-        return price, info
+
+def calc_minimum_profit(
+    price: float,
+    number: int = 1,
+    mode: str = "Buy",
+    transaction_tax_percentage: float = 0.003,
+    handling_fee_percentage: float = 0.001425,
+    discount_percentage: float = 0.6,
+    is_day_trading: bool = False
+) -> float:
+    if mode not in ["Buy", "Sell"]:
+        raise ValueError("Input mode must be in ['Buy', 'Sell']")
+
+    exit_price = calc_break_even_price(
+        price,
+        number,
+        mode=mode,
+        transaction_tax_percentage=transaction_tax_percentage,
+        handling_fee_percentage=handling_fee_percentage,
+        discount_percentage=discount_percentage,
+        is_day_trading=is_day_trading,
+    )
+    buy_price, sell_price = (price, exit_price) if mode == "Buy" else (exit_price, price)
+
+    shares = number * 1000
+    buy_handling_fee = calc_handling_fee(buy_price, shares, handling_fee_percentage, discount_percentage)
+    sell_handling_fee = calc_handling_fee(sell_price, shares, handling_fee_percentage, discount_percentage)
+    transaction_tax = calc_transaction_tax(sell_price, shares, transaction_tax_percentage, is_day_trading)
+    profit = (sell_price - buy_price) * shares - buy_handling_fee - sell_handling_fee - transaction_tax
+
+    info = {
+        "buy_price": round(buy_price, 3),
+        "number": number,
+        "buy_handling_fee": buy_handling_fee,
+        "sell_handling_fee": sell_handling_fee,
+        "transaction_tax": transaction_tax,
+        "sell_price": round(sell_price, 3),
+        "estimated_profit": int(profit)
+    }
+
+    return exit_price, info
 
 
 def load_yaml(path: Union[Path, str]) -> dict:
@@ -276,6 +351,30 @@ def now(fmt: str = None):
     return t
 
 
+def match_time_to_us(match_time: Union[str, int, float]) -> int:
+    """ 成交時間（"09:00:01.123456"、"090001123456" 或數值 90001123456.0）轉為當日微秒數 """
+    if isinstance(match_time, (int, float, np.integer, np.floating)):
+        # 歷史成交明細（TBSRec.Match_Time）為 float 的 HHMMSSffffff
+        match_time = str(int(round(float(match_time)))).zfill(12)
+
+    if ":" in match_time:
+        hh, mm, ss = match_time.split(":")
+        ss, _, frac = ss.partition(".")
+    else:
+        digits = "".join(c for c in match_time if c.isdigit())
+        hh, mm, ss, frac = digits[0:2], digits[2:4], digits[4:6], digits[6:]
+
+    micro = int((frac + "000000")[:6])
+    return ((int(hh) * 60 + int(mm)) * 60 + int(ss)) * 1000000 + micro
+
+
+def us_to_match_time(us: int) -> str:
+    seconds, micro = divmod(int(us), 1000000)
+    minutes, ss = divmod(seconds, 60)
+    hh, mm = divmod(minutes, 60)
+    return f"{hh:02d}:{mm:02d}:{ss:02d}.{micro:06d}"
+
+
 def divide_into_parts(A, B):
     result = []
     full_parts = A // B
@@ -288,36 +387,15 @@ def divide_into_parts(A, B):
 
 
 def round_up_price(price):
-    if price < 10:
-        # 小於10元，升降單位為0.01元
-        return math.ceil(price / 0.01) * 0.01
-    elif price < 50:
-        # 10元至未滿50元，升降單位為0.05元
-        return math.ceil(price / 0.05) * 0.05
-    elif price < 100:
-        # 50元至未滿100元，升降單位為0.1元
-        return math.ceil(price / 0.1) * 0.1
-    elif price < 500:
-        # 100元至未滿500元，升降單位為0.5元
-        return math.ceil(price / 0.5) * 0.5
-    elif price < 1000:
-        # 500元至未滿1000元，升降單位為1元
-        return math.ceil(price / 1.0) * 1.0
-    else:
-        # 1000元以上，升降單位為5元
-        return math.ceil(price / 5.0) * 5.0
+    """ 無條件進位到合法價位，price 可為 NumPy 陣列 """
+    return snap_price(price, "up")
 
 
 def divide_range(A, B, num_parts):
     if num_parts == 1:
         return [A], [A]
 
-    step = (A - B) / (num_parts - 1)
-    result, original = [], []
-    for i in range(num_parts):
-        value = A - step * i
-        original.append(round(value, 2))
-
-        value = round_up_price(value)
-        result.append(round(value, 2))
-    return result, original
\ No newline at end of file
+    values = np.linspace(A, B, num_parts)
+    original = np.round(values, 2).tolist()
+    result = np.asarray(round_up_price(values)).tolist()
+    return result, original
@@ -0,0 +1,70 @@
+"""
+模擬報價迴圈以固定頻率對同一筆委託改價，比較每次直接送出 ChangeOrderPrice
+與經由 AmendManager（前一筆改單確認前只保留最後一次目標價）的委託要求數。
+
+    python benchmark/benchmark_amend.py --orders 5 --rate 200 --seconds 1 --latency 0.02
+"""
+import argparse
+import random
+import time
+
+from MasterTradePy.constant import PriceType, Side
+
+from autotraderx.masterlink.basics import SymbolBasic
+from stub_broker import make_trader
+
+
+def run(n_orders: int, rate: float, seconds: float, latency: float, managed: bool):
+    trader = make_trader(latency=latency, send_cost=0)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+    acks = trader.set_orders([
+        {"symbol": "2330", "side": Side.Buy, "qty": 1000, "price": 100.0, "price_type": PriceType.LMT}
+        for _ in range(n_orders)
+    ])
+    ordNos = [f.result(timeout=5).ordNo for f in acks]
+    trader.api.n_requests = 0
+
+    targets = {}
+    interval = 1 / rate
+    t_end = time.perf_counter() + seconds
+    n_calls = 0
+    while time.perf_counter() < t_end:
+        for ordNo in ordNos:
+            price = round(100 + random.randint(-10, 10) * 0.5, 2)
+            targets[ordNo] = price
+            if managed:
+                trader.change_price_future(ordNo, price)
+            else:
+                trader._send_amend(ordNo, "price", price)
+            n_calls += 1
+        time.sleep(interval)
+
+    # 等最後一筆改單確認
+    time.sleep(latency * 4)
+    final = {ordNo: float(trader.api.orders[ordNo][1].price) for ordNo in ordNos}
+    stale = sum(final[o] != targets[o] for o in ordNos)
+
+    label = "managed" if managed else "direct"
+    print(f"{label:>8}: change_price calls {n_calls}, broker requests {trader.api.n_requests}, "
+          f"orders not at latest target {stale}/{n_orders}")
+    if managed:
+        stats = trader.amends.stats()
+        print(f"          coalesced {stats['coalesced']}, acked {stats['acked']}, timeout {stats['timeout']}, "
+              f"ack latency avg {stats['ack_latency_avg'] * 1e3:.1f}ms, max {stats['ack_latency_max'] * 1e3:.1f}ms")
+    trader.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=200, help="每秒改價次數（每筆委託）")
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    run(args.orders, args.rate, args.seconds, args.latency, managed=False)
+    run(args.orders, args.rate, args.seconds, args.latency, managed=True)
+
+
+if __name__ == "__main__":
+    main()
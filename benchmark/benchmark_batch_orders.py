@@ -0,0 +1,72 @@
+"""
+比較逐筆 set_order（每筆等待回報）與 set_orders 批次送出的委託吞吐量。
+
+以 StubMasterTradeAPI 模擬券商端的送出成本與回報延遲，不需登入。
+
+    python benchmark/benchmark_batch_orders.py --orders 200 --symbols 5 --latency 0.02
+"""
+import argparse
+import time
+from concurrent.futures import wait
+
+from MasterTradePy.constant import PriceType, Side
+
+from autotraderx.utils import divide_into_parts
+from stub_broker import make_trader
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--send-cost", type=float, default=0.001)
+    args = parser.parse_args()
+
+    # 將每檔股票的母單拆成 1 張的子單
+    per_symbol = divide_into_parts(args.orders, -(-args.orders // args.symbols))
+    orders = [
+        {
+            "symbol": f"{1101 + s}",
+            "side": Side.Buy,
+            "qty": 1000,
+            "price": 100.0,
+            "price_type": PriceType.LMT,
+        }
+        for s, n in enumerate(per_symbol) for _ in range(n)
+    ]
+
+    trader = make_trader(latency=args.latency, send_cost=args.send_cost)
+    t0 = time.perf_counter()
+    for order in orders:
+        n = len(trader.trader.order_book)
+        trader.set_order(**order)
+        while len(trader.trader.order_book) == n:
+            time.sleep(0.0005)
+    serial = time.perf_counter() - t0
+    serial_requests = trader.api.n_requests
+    trader.stop()
+
+    trader = make_trader(latency=args.latency, send_cost=args.send_cost)
+    t0 = time.perf_counter()
+    futures = trader.set_orders(orders)
+    sent = time.perf_counter() - t0
+    wait(futures)
+    batch = time.perf_counter() - t0
+    latencies = sorted(f.result().latency for f in futures)
+    batch_requests = trader.api.n_requests
+    trader.stop()
+
+    n = len(orders)
+    print(f"orders: {n}")
+    print(f"serial: {serial:.3f}s ({n / serial:.1f} orders/s), api calls={serial_requests}")
+    print(f"batch:  {batch:.3f}s ({n / batch:.1f} orders/s), api calls={batch_requests}, send={sent:.3f}s")
+    print(
+        f"ack latency: p50={latencies[n // 2] * 1000:.1f}ms "
+        f"p99={latencies[min(n - 1, n * 99 // 100)] * 1000:.1f}ms"
+    )
+    print(f"speedup: {serial / batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
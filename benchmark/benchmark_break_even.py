@@ -0,0 +1,63 @@
+"""
+比較逐價位暴力搜尋與 calc_break_even_price 在整批部位上的速度；
+兩者結果一致的驗證在 tests/test_break_even.py。
+
+暴力搜尋與舊版 calc_minimum_profit 相同，一次走一個價位並重算手續費與稅，
+但改用 tick_grid 取得下一個價位，且買回時以買回價計算手續費。
+
+    python benchmark/benchmark_break_even.py --n 20000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from autotraderx.tick_grid import snap_price
+from autotraderx.utils import calc_break_even_price, get_next_tick_price
+
+
+def brute_force(price, number, mode, tax_pct, fee_pct, discount, is_day_trading, minimum_fee=20):
+    shares = number * 1000
+    day_trading = 0.5 if is_day_trading else 1
+
+    def fee(p):
+        return max(math.ceil(p * shares * fee_pct * discount), minimum_fee)
+
+    def tax(p):
+        return math.ceil(p * shares * tax_pct * day_trading)
+
+    exit_price = price
+    while True:
+        exit_price = get_next_tick_price(exit_price, mode)
+        if mode == "Buy":
+            profit = (exit_price - price) * shares - fee(price) - fee(exit_price) - tax(exit_price)
+        else:
+            profit = (price - exit_price) * shares - fee(price) - tax(price) - fee(exit_price)
+        if profit > 0:
+            return exit_price
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    prices = snap_price(rng.uniform(1, 1500, args.n))
+    numbers = rng.integers(1, 50, args.n)
+
+    values, lots = prices.tolist(), numbers.tolist()
+    t0 = time.perf_counter()
+    for p, n in zip(values, lots):
+        brute_force(p, n, "Buy", 0.003, 0.001425, 0.6, False)
+    t_brute = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    calc_break_even_price(prices, numbers, "Buy")
+    t_fast = time.perf_counter() - t0
+    print(f"{args.n} positions  brute force: {t_brute:.3f}s, solver: {t_fast:.4f}s ({t_brute / t_fast:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+比較逐筆呼叫與 fetch_many 並行查詢歷史成交的耗時。
+
+以 StubTechAnalysis 模擬 GetHisBS_Stock 的網路延遲，不需登入。
+
+    python benchmark/benchmark_bulk_fetch.py --symbols 20 --days 10 --latency 0.05
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from autotraderx.bulk_fetch import fetch_many
+from autotraderx.rate_limit import TokenBucket
+from autotraderx.trade_data import TradeData
+
+
+class StubTechAnalysis:
+
+    def __init__(self, latency: float, rows: int, fail_rate: float = 0.0):
+        self.latency = latency
+        self.rows = rows
+        self.fail_rate = fail_rate
+
+    def GetHisBS_Stock(self, prod_id: str, date: str):
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            return [], "stub: temporary failure"
+
+        # 欄位型別與 tech_analysis_api_v2.model.TBSRec 相同
+        data = [
+            SimpleNamespace(
+                Prod=prod_id,
+                Match_Time=float(f"{9 + i // 36000:02d}{i // 600 % 60:02d}{i // 10 % 60:02d}{i % 10}00000"),
+                Match_Price=500 + i % 20 * 0.5,
+                Match_Quantity=1 + i % 7,
+                Is_TryMatch=False,
+                BS=1 if i % 2 else 2,
+            ) for i in range(self.rows)
+        ]
+        return data, ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    ta = StubTechAnalysis(args.latency, args.rows, args.fail_rate)
+
+    def fetch(prod_id, date):
+        _data, err_msg = ta.GetHisBS_Stock(prod_id, date)
+        if err_msg != "":
+            raise ConnectionError(err_msg)
+        return TradeData.from_objects(prod_id, _data, date)
+
+    keys = [
+        (f"{1000 + s}", f"202401{d + 1:02d}")
+        for s in range(args.symbols) for d in range(args.days)
+    ]
+
+    t0 = time.perf_counter()
+    for key in keys:
+        try:
+            fetch(*key)
+        except ConnectionError:
+            pass
+    serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = list(fetch_many(
+        fetch,
+        keys,
+        max_workers=args.workers,
+        rate_limiter=TokenBucket(args.rate, burst=args.workers),
+        backoff=0.01,
+        progress=False,
+    ))
+    parallel = time.perf_counter() - t0
+    failed = sum(r.error is not None for r in results)
+
+    print(f"requests: {len(keys)}")
+    print(f"serial:   {serial:.3f}s ({len(keys) / serial:.1f} req/s)")
+    print(f"parallel: {parallel:.3f}s ({len(keys) / parallel:.1f} req/s), failed={failed}")
+    print(f"speedup:  {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
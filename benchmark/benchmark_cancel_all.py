@@ -0,0 +1,55 @@
+"""
+量測 cancel_all 出清所有未完成委託所需的時間：先以 set_orders 掛上多檔股票的委託，
+再一次刪除，統計確認筆數與各筆送出到確認的延遲。
+
+    python benchmark/benchmark_cancel_all.py --orders 200 --symbols 20 --latency 0.02 --limit 100
+"""
+import argparse
+from concurrent.futures import wait
+
+from MasterTradePy.constant import PriceType, Side
+
+from autotraderx.masterlink.basics import SymbolBasic
+from stub_broker import make_trader
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--limit", type=int, default=None, help="券商端每秒委託要求上限")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    kwargs = {}
+    if args.limit is not None:
+        kwargs = dict(max_per_sec=args.limit, max_requests_per_sec=args.limit - 1)
+    trader = make_trader(latency=args.latency, send_cost=0.0002, **kwargs)
+
+    symbols = [f"{1101 + i}" for i in range(args.symbols)]
+    for symbol in symbols:
+        trader.basics.put(SymbolBasic(symbol, symbol, 100.0, 110.0, 90.0))
+    acks = trader.set_orders([
+        {"symbol": symbols[i % len(symbols)], "side": Side.Buy, "qty": 1000, "price": 99.0,
+         "price_type": PriceType.LMT}
+        for i in range(args.orders)
+    ])
+    wait(acks, timeout=args.timeout * 4)
+    print(f"open orders: {len(trader.get_open_orders())}")
+
+    one = trader.cancel_orders(symbols[0], timeout=args.timeout)
+    print(f"cancel {symbols[0]}: confirmed {len(one.confirmed)}/{len(one.requested)} in {one.elapsed * 1e3:.1f}ms")
+
+    report = trader.cancel_all(timeout=args.timeout)
+    latencies = sorted(report.latencies.values())
+    p = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1e3 if latencies else 0.0
+    print(f"cancel_all: requested {len(report.requested)}, confirmed {len(report.confirmed)}, "
+          f"failed {len(report.failed)}, pending {len(report.pending)}")
+    print(f"  elapsed {report.elapsed * 1e3:.1f}ms, confirm latency p50 {p(0.5):.1f}ms, p99 {p(0.99):.1f}ms")
+    print(f"  open orders after: {len(trader.get_open_orders())}, broker rejections: {trader.api.n_rejected}")
+    trader.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+比較 BeautifulSoup 建立整頁 DOM 與 iter_isin_rows 串流解析 ISIN 頁面的耗時與記憶體。
+
+可用 --fixtures 指定先前存下的頁面（big5 原始位元組），未指定時產生一頁模擬資料。
+
+    python benchmark/benchmark_isin_parser.py --rows 40000
+    python benchmark/benchmark_isin_parser.py --fixtures strMode2.html strMode4.html
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from autotraderx.isin_parser import iter_isin_rows
+
+
+def make_page(rows: int) -> bytes:
+    lines = [
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=big5"></head><body>',
+        '<table class="h4" align=center cellSpacing=3 cellPadding=2 width=750 border=0>',
+        "<tr align=center><td bgcolor=#D5FFD5>有價證券代號及名稱 </td><td bgcolor=#D5FFD5>國際證券辨識號碼(ISIN Code)</td>"
+        "<td bgcolor=#D5FFD5>上市日</td><td bgcolor=#D5FFD5>市場別</td><td bgcolor=#D5FFD5>產業別</td>"
+        "<td bgcolor=#D5FFD5>CFICode</td><td bgcolor=#D5FFD5>備註</td></tr>",
+        "<tr><td bgcolor=#FAFAD2 colspan=7 ><B> 股票 <B> </td></tr>",
+    ]
+    for i in range(rows):
+        code = f"{1000 + i}"
+        lines.append(
+            f"<tr><td bgcolor=#FAFAD2>{code}\u3000測試股份{i}</td><td bgcolor=#FAFAD2>TW000{code}001</td>"
+            f"<td bgcolor=#FAFAD2>1962/02/09</td><td bgcolor=#FAFAD2>上市</td>"
+            f"<td bgcolor=#FAFAD2>水泥工業</td><td bgcolor=#FAFAD2>ESVUFR</td><td bgcolor=#FAFAD2></td></tr>"
+        )
+    lines.append("</table></body></html>")
+    return "\n".join(lines).encode("big5")
+
+
+def parse_soup(raw: bytes):
+    """ 原本 update_stocks_code.py 的解析方式 """
+    soup = BeautifulSoup(raw.decode("big5", errors="replace"), "html.parser")
+    table = soup.find("table", {"class": "h4"})
+    rows = []
+    if not table:
+        return rows
+    for row in table.find_all("tr")[1:]:
+        cells = row.find_all("td")
+        if len(cells) != 7:
+            continue
+        code, name = cells[0].text.split("\u3000")
+        rows.append((code, name, cells[1].text, cells[2].text, cells[3].text, cells[4].text))
+    return rows
+
+
+def parse_stream(raw: bytes, chunk_size: int = 1 << 16):
+    chunks = (raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size))
+    return [tuple(row) for row in iter_isin_rows(chunks)]
+
+
+def measure(fn, raw):
+    t0 = time.perf_counter()
+    rows = fn(raw)
+    elapsed = time.perf_counter() - t0
+
+    # tracemalloc 會大幅拖慢執行，記憶體另外量測
+    tracemalloc.start()
+    fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=str, nargs="+", default=None)
+    parser.add_argument("--rows", type=int, default=40000)
+    args = parser.parse_args()
+
+    pages = [Path(p).read_bytes() for p in args.fixtures] if args.fixtures else [make_page(args.rows)]
+
+    for index, raw in enumerate(pages, start=1):
+        soup_rows, t_soup, m_soup = measure(parse_soup, raw)
+        stream_rows, t_stream, m_stream = measure(parse_stream, raw)
+        same = [r[:2] for r in soup_rows] == [r[:2] for r in stream_rows]
+
+        print(f"page {index}: {len(raw) / 1e6:.2f}MB, {len(stream_rows)} rows, same codes/names={same}")
+        print(f"  BeautifulSoup: {t_soup:.3f}s, peak {m_soup / 1e6:.1f}MB")
+        print(f"  streaming:     {t_stream:.3f}s, peak {m_stream / 1e6:.1f}MB")
+        print(f"  speedup:       {t_soup / t_stream:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+量測 MarketDepth 處理五檔 callback 的速度，以及另一執行緒讀取 snapshot 的一致性。
+
+以 ReplayTick 相同欄位的物件模擬 ProductTick，價量為字串，與 SDK 相同。
+
+    python benchmark/benchmark_market_depth.py --symbols 500 --updates 200000
+"""
+import argparse
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from autotraderx.market_depth import MarketDepth
+
+
+def make_ticks(symbols: int, updates: int):
+    ticks = []
+    for i in range(updates):
+        symbol = f"{1101 + i % symbols}"
+        bid = 100 + random.randint(-10, 10) * 0.5
+        ticks.append(SimpleNamespace(
+            Symbol=symbol,
+            OrderBookTime=f"09:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:03d}000",
+            BuyPrice=[f"{bid - k * 0.5:.2f}" for k in range(5)],
+            BuyQty=[str(random.randint(1, 500)) for _ in range(5)],
+            SellPrice=[f"{bid + 0.5 + k * 0.5:.2f}" for k in range(5)],
+            SellQty=[str(random.randint(1, 500)) for _ in range(5)],
+        ))
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=200000)
+    args = parser.parse_args()
+
+    ticks = make_ticks(args.symbols, args.updates)
+    depth = MarketDepth()
+    symbols = [t.Symbol for t in ticks[:args.symbols]]
+
+    stop = threading.Event()
+    reads = [0, 0]  # 讀取次數, 不一致次數
+
+    def reader():
+        while not stop.is_set():
+            for symbol in symbols:
+                snap = depth.snapshot(symbol)
+                if snap is None:
+                    continue
+                reads[0] += 1
+                # 同一份 snapshot 的衍生欄位必須與價量一致
+                if snap.seq and snap.spread != snap.ask_prices[0] - snap.bid_prices[0]:
+                    reads[1] += 1
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+
+    t0 = time.perf_counter()
+    for tick in ticks:
+        depth.on_order_book(tick)
+    elapsed = time.perf_counter() - t0
+
+    stop.set()
+    thread.join()
+
+    print(f"symbols: {len(depth)}, updates: {len(ticks)}")
+    print(f"update: {elapsed:.3f}s ({len(ticks) / elapsed:,.0f} updates/s, {elapsed / len(ticks) * 1e6:.2f}us each)")
+    print(f"concurrent snapshot reads: {reads[0]:,}, inconsistent: {reads[1]}")
+
+
+if __name__ == "__main__":
+    main()
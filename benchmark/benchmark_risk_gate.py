@@ -0,0 +1,97 @@
+"""
+量測 RiskGate 每筆檢查與回報更新的延遲，並以 StubMasterTradeAPI 確認
+成交回報後的部位與預留股數正確。
+
+    python benchmark/benchmark_risk_gate.py --checks 100000 --symbols 500
+"""
+import argparse
+import random
+import time
+from concurrent.futures import wait
+
+from MasterTradePy.constant import PriceType, Side
+
+from autotraderx.masterlink.basics import SymbolBasic
+from autotraderx.masterlink.risk import RiskGate, RiskLimits
+from stub_broker import make_trader
+
+
+def percentiles(samples_ns):
+    samples = sorted(samples_ns)
+    pick = lambda q: samples[min(int(q * len(samples)), len(samples) - 1)] / 1000
+    return f"p50 {pick(0.5):.1f}us, p99 {pick(0.99):.1f}us, max {samples[-1] / 1000:.1f}us"
+
+
+def bench_check(n_checks: int, n_symbols: int):
+    trader = make_trader()
+    gate = RiskGate(
+        RiskLimits(
+            max_order_qty=10000,
+            max_order_notional=5e6,
+            max_position=50000,
+            max_gross_position=10 ** 9,
+            max_gross_notional=1e12,
+            max_orders_per_sec=1e9,
+            order_burst=10 ** 9,
+        ),
+        trader.basics,
+    )
+    symbols = [f"{1101 + i}" for i in range(n_symbols)]
+    for symbol in symbols:
+        trader.basics.put(SymbolBasic(symbol, symbol, 100.0, 110.0, 90.0))
+
+    orders = [
+        (random.choice(symbols), random.choice("BS"), random.randint(1, 5) * 1000, random.uniform(88, 112))
+        for _ in range(n_checks)
+    ]
+    samples = []
+    rejected = 0
+    perf = time.perf_counter_ns
+    for i, (symbol, side, qty, price) in enumerate(orders):
+        t0 = perf()
+        err = gate.check(symbol, side, qty, price, True, f"u{i}")
+        samples.append(perf() - t0)
+        rejected += err is not None
+    print(f"check ({n_checks} orders, {n_symbols} symbols, all limits on): {percentiles(samples)}")
+    print(f"  rejected: {rejected}, by reason: {dict(gate.rejections)}")
+    trader.stop()
+
+
+def bench_end_to_end(n_orders: int):
+    limits = RiskLimits(max_position=3000, max_orders_per_sec=1000, order_burst=n_orders)
+    trader = make_trader(risk_limits=limits, latency=0.005, send_cost=0)
+    orders = [
+        {"symbol": "2330", "side": Side.Buy, "qty": 1000, "price": 100.0, "price_type": PriceType.LMT}
+        for _ in range(n_orders)
+    ]
+    futures = trader.set_orders(orders)
+    sent = [f for f in futures if f.exception(timeout=5) is None]
+    print(f"end to end: {len(sent)} of {n_orders} orders passed max_position=3000 "
+          f"(open buy {trader.risk.exposure('2330')['open_buy']})")
+
+    for future in sent:
+        trader.api.fill(future.result().ordNo, 1000, 100.0)
+    time.sleep(0.05)
+    print(f"  after fills: {trader.risk.exposure('2330')}, gross {trader.risk.gross_position} shares, "
+          f"{trader.risk.gross_notional:,.0f} TWD")
+
+    trader.risk.halt("benchmark")
+    futures = trader.set_orders([dict(orders[0], side=Side.Sell)])
+    wait(futures)
+    print(f"  halted: {futures[0].exception()}")
+    trader.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=100000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=10)
+    args = parser.parse_args()
+
+    bench_check(args.checks, args.symbols)
+    bench_end_to_end(args.orders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+以有流量限制的 StubMasterTradeAPI 比較直接送出與經由 SendScheduler 送出：
+突發的新單、同一委託反覆改價與刪單，統計券商端拒絕的筆數、吞吐量與排隊等待時間。
+
+    python benchmark/benchmark_send_queue.py --limit 50 --orders 120 --amends 200
+"""
+import argparse
+import time
+from concurrent.futures import wait
+
+from MasterTradePy.constant import PriceType, Side
+
+from autotraderx.masterlink.basics import SymbolBasic
+from stub_broker import make_trader
+
+
+def run(limit: int, n_orders: int, n_amends: int, scheduled: bool):
+    kwargs = dict(max_requests_per_sec=limit - 1, request_burst=1) if scheduled else {}
+    trader = make_trader(latency=0.005, send_cost=0.0002, max_per_sec=limit, **kwargs)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+
+    # 先送一筆作為改價與刪單的對象，等券商端的流量視窗清空再開始量測
+    first = trader.set_orders([_order()])[0].result(timeout=5)
+    time.sleep(1.1)
+    trader.api.n_requests = trader.api.n_rejected = 0
+
+    t0 = time.perf_counter()
+    acks = trader.set_orders([_order() for _ in range(n_orders)])
+    amends = [trader.change_price_future(first.ordNo, 95 + i % 10 * 0.5) for i in range(n_amends)]
+    cancel = trader.change_qty_future(first.ordNo, 0)
+    wait(acks + [cancel], timeout=60)
+    elapsed = time.perf_counter() - t0
+
+    api = trader.api
+    label = "scheduled" if scheduled else "direct"
+    n_ok = sum(1 for f in acks if f.exception() is None and f.result().status.startswith("101"))
+    n_amend_sent = len({id(f) for f in amends if not f.cancelled()})
+    print(f"{label:>9}: {elapsed:.2f}s, broker requests {api.n_requests}, rejected {api.n_rejected}, "
+          f"new orders accepted {n_ok}/{n_orders}, amends sent {n_amend_sent}/{n_amends}, "
+          f"cancel rc {cancel.result()}")
+    if scheduled:
+        for lane, stats in trader.sender.stats().items():
+            print(f"           {lane:>6}: sent {stats['sent']}, coalesced {stats['coalesced']}, "
+                  f"dropped {stats['dropped']}, wait p50 {stats['wait_p50'] * 1e3:.1f}ms, "
+                  f"p99 {stats['wait_p99'] * 1e3:.1f}ms, max {stats['wait_max'] * 1e3:.1f}ms")
+    trader.stop()
+
+
+def _order():
+    return {"symbol": "2330", "side": Side.Buy, "qty": 1000, "price": 100.0, "price_type": PriceType.LMT}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=50, help="券商端每秒委託要求上限")
+    parser.add_argument("--orders", type=int, default=120)
+    parser.add_argument("--amends", type=int, default=200)
+    args = parser.parse_args()
+
+    run(args.limit, args.orders, args.amends, scheduled=False)
+    run(args.limit, args.orders, args.amends, scheduled=True)
+
+
+if __name__ == "__main__":
+    main()
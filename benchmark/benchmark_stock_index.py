@@ -0,0 +1,85 @@
+"""
+比較以 load_json 載入 stock_infos.json 與開啟 StockIndex 快照的耗時與記憶體。
+
+未指定 --json 時以隨機資料產生一份與 update_stocks_code.py 相同格式的檔案。
+
+    python benchmark/benchmark_stock_index.py --rows 40000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from autotraderx.stock_index import StockIndex
+from autotraderx.utils import load_json
+
+
+def make_infos(rows: int):
+    markets = ["上市", "上櫃", "興櫃"]
+    industries = ["半導體業", "金融保險業", "航運業", "電子零組件業", ""]
+    infos = {}
+    for i in range(rows):
+        code = f"{1000 + i}"
+        infos[code] = {
+            "名稱": f"測試股份{i}",
+            "代號": code,
+            "市場別": markets[i % len(markets)],
+            "產業別": industries[i % len(industries)],
+            "上市日期": "2000/01/01",
+            "國際代碼": f"TW000{code}001",
+        }
+    return infos
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", type=str, default=None)
+    parser.add_argument("--rows", type=int, default=40000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(args.json) if args.json else Path(tmpdir) / "stock_infos.json"
+        if not args.json:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(make_infos(args.rows), f, ensure_ascii=False, indent=2)
+        snapshot_path = Path(tmpdir) / "stock_infos.idx"
+
+        infos, t_json, m_json = measure(lambda: load_json(json_path))
+        _, t_compile, _ = measure(lambda: StockIndex.load(json_path, snapshot_path))
+        index, t_open, m_open = measure(lambda: StockIndex.open(snapshot_path))
+
+        codes = list(infos)
+        index.name(codes[0])
+        t0 = time.perf_counter()
+        for i in range(args.lookups):
+            infos[codes[i % len(codes)]]["名稱"]
+        t_dict = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(args.lookups):
+            index.name(codes[i % len(codes)])
+        t_index = time.perf_counter() - t0
+
+        print(f"rows: {len(index)}, snapshot: {snapshot_path.stat().st_size / 1e6:.2f}MB")
+        print(f"load_json:     {t_json * 1000:.1f}ms, peak {m_json / 1e6:.2f}MB")
+        print(f"compile+save:  {t_compile * 1000:.1f}ms")
+        print(f"open snapshot: {t_open * 1000:.2f}ms, peak {m_open / 1e6:.3f}MB")
+        print(f"name lookup:   dict {t_dict / args.lookups * 1e9:.0f}ns, index {t_index / args.lookups * 1e9:.0f}ns")
+        print(f"by_prefix('23'):  {len(index.by_prefix('23'))} rows")
+        print(f"filter(上櫃):     {len(index.filter(market='上櫃'))} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+比較逐筆以 float 計算價位與 tick_grid 以整數價位序號向量化計算的速度，
+並以 Decimal 逐一產生的證交所價位表檢查每個區間邊界。
+
+    python benchmark/benchmark_tick_grid.py --n 1000000
+"""
+import argparse
+import math
+import time
+from decimal import Decimal
+
+import numpy as np
+
+from autotraderx.tick_grid import price_ladder, shift_ticks, snap_price
+from autotraderx.utils import get_next_tick_price
+
+
+def legacy_round_up_price(price):
+    if price < 10:
+        return math.ceil(price / 0.01) * 0.01
+    elif price < 50:
+        return math.ceil(price / 0.05) * 0.05
+    elif price < 100:
+        return math.ceil(price / 0.1) * 0.1
+    elif price < 500:
+        return math.ceil(price / 0.5) * 0.5
+    elif price < 1000:
+        return math.ceil(price / 1.0) * 1.0
+    return math.ceil(price / 5.0) * 5.0
+
+
+def legacy_next_tick_price(price, mode="Buy"):
+    direction = 1 if mode == "Buy" else -1
+    for limit, change in [(10, 0.01), (49.95, 0.05), (99.9, 0.1), (499.5, 0.5), (999, 1), (float("inf"), 5)]:
+        if price <= limit:
+            return price + change * direction
+
+
+def twse_grid(upper: int = 3000) -> np.ndarray:
+    bands = [(10, "0.01"), (50, "0.05"), (100, "0.1"), (500, "0.5"), (1000, "1")]
+    grid, price = [], Decimal("0.01")
+    while price <= upper:
+        grid.append(price)
+        price += next((Decimal(t) for limit, t in bands if price < limit), Decimal(5))
+    return np.array([float(p) for p in grid])
+
+
+def timeit(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1000000)
+    args = parser.parse_args()
+
+    grid = twse_grid()
+    on_grid = np.array_equal(snap_price(grid), grid)
+    next_up = np.array_equal(get_next_tick_price(grid[:-1], "Buy"), grid[1:])
+    next_down = np.array_equal(get_next_tick_price(grid[1:], "Sell"), grid[:-1])
+    legacy_up = sum(round(legacy_next_tick_price(p, "Buy"), 2) != q for p, q in zip(grid[:-1].tolist(), grid[1:].tolist()))
+    legacy_down = sum(round(legacy_next_tick_price(p, "Sell"), 2) != q for p, q in zip(grid[1:].tolist(), grid[:-1].tolist()))
+    legacy_snap = sum(legacy_round_up_price(p) != p for p in grid.tolist())
+
+    print(f"TWSE grid prices: {len(grid)}")
+    print(f"tick_grid   snap/next up/next down exact: {on_grid}/{next_up}/{next_down}")
+    print(f"legacy      next up wrong: {legacy_up}, next down wrong: {legacy_down}, "
+          f"round_up_price not exact on grid: {legacy_snap}")
+
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(1, 2000, args.n).round(2)
+    values = prices.tolist()
+
+    _, t_legacy = timeit(lambda: [legacy_round_up_price(p) for p in values])
+    _, t_vec = timeit(snap_price, prices, "up")
+    print(f"round up  legacy: {t_legacy:.3f}s, vectorized: {t_vec:.3f}s ({t_legacy / t_vec:.1f}x)")
+
+    _, t_legacy = timeit(lambda: [legacy_next_tick_price(p) for p in values])
+    _, t_vec = timeit(shift_ticks, prices, 1, "up")
+    print(f"next tick legacy: {t_legacy:.3f}s, vectorized: {t_vec:.3f}s ({t_legacy / t_vec:.1f}x)")
+
+    _, t_vec = timeit(price_ladder, prices[:args.n // 10], 10)
+    print(f"ladder of 10 ticks for {args.n // 10} prices: {t_vec:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
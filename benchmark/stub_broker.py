@@ -0,0 +1,213 @@
+"""
+模擬 MasterTradeAPI 的券商端，供 benchmark 在不登入的情況下測試 Trader。
+
+每次呼叫 API 需 send_cost 秒送出，回報在 latency 秒後由背景執行緒以
+OnReport/OnReqResult 送回，與 SDK 相同；超過 max_per_sec 的委託要求會被拒絕。
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from MasterTradePy.constant import RCode
+from MasterTradePy.model import Basic, Inventory, Order, ReportOrder
+
+from autotraderx.masterlink.send_queue import SendScheduler
+from autotraderx.masterlink.trader import CustomMarketTrader, Trader
+
+
+class StubMasterTradeAPI:
+
+    def __init__(
+        self,
+        trader: CustomMarketTrader,
+        latency: float = 0.02,
+        send_cost: float = 0.001,
+        max_per_sec: float = None,
+        ref_price: float = 100.0,
+    ):
+        self._trader = trader
+        self.latency = latency
+        self.send_cost = send_cost
+        self.max_per_sec = max_per_sec
+        self.ref_price = ref_price
+
+        self.orders = {}       # ordNo -> (orgOrder, order)
+        self.last_reports = {} # ordNo -> 最近一筆回報，供 QryRepAll/QryRepDeal 重送
+        self.inventory = {}    # symbol -> Inventory，供 ReqInventoryRayinTotal 查詢
+        self.n_requests = 0
+        self.n_rejected = 0
+        self._sent = deque()   # 最近一秒內的委託要求時間
+        self._lock = threading.Lock()
+        self._ord_seq = itertools.count(1)
+        self._qid_seq = itertools.count(1)
+
+        self._queue = []
+        self._queue_seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._queue or self._queue[0][0] > time.perf_counter()):
+                    self._cond.wait(self._queue[0][0] - time.perf_counter() if self._queue else None)
+                if not self._running:
+                    return
+                _, _, fn, args = heapq.heappop(self._queue)
+            fn(*args)
+
+    def _later(self, fn, *args):
+        with self._cond:
+            heapq.heappush(self._queue, (time.perf_counter() + self.latency, next(self._queue_seq), fn, args))
+            self._cond.notify()
+
+    def _send(self) -> bool:
+        """ 模擬送出成本與流量管制，回傳是否在流量限制內 """
+        time.sleep(self.send_cost)
+        with self._lock:
+            self.n_requests += 1
+            if self.max_per_sec is None:
+                return True
+            t = time.perf_counter()
+            while self._sent and t - self._sent[0] >= 1.0:
+                self._sent.popleft()
+            if len(self._sent) >= self.max_per_sec:
+                self.n_rejected += 1
+                return False
+            self._sent.append(t)
+            return True
+
+    def _report(self, org: Order, order: Order, table_name: str, status: str, message: str = ""):
+        rpt_order = Order(
+            tradingSession=org.tradingSession, side=org.side, symbol=org.symbol,
+            priceType=order.priceType, price=order.price, qty=org.qty,
+            orderType=org.orderType, userDef=org.userDef, tradingAccount=org.tradingAccount,
+        )
+        rpt_order.ordNo = order.ordNo
+        rpt_order.leavesQty = order.leavesQty
+        rpt_order.cumQty = order.cumQty
+        rpt_order.dealPri = order.dealPri
+        rpt_order.status = status
+        rpt_order.tableName = table_name
+        rpt_order.trxTime = time.strftime("%H:%M:%S.000")
+        report = ReportOrder(org, rpt_order)
+        report.lastMessage = message
+        if order.ordNo:
+            with self._lock:
+                self.last_reports[order.ordNo] = report
+        self._later(self._trader.OnReport, report)
+
+    # MasterTradeAPI 介面
+
+    def ReqBasic(self, symbol: str) -> str:
+        self._send()
+        work_id = f"qid{next(self._qid_seq)}"
+        p = self.ref_price
+        basic = Basic(symbol, symbol, f"{p:.2f}", f"{p * 1.1:.2f}", f"{p * 0.9:.2f}")
+        self._later(self._trader.OnReqResult, work_id, basic)
+        return work_id
+
+    def ReqInventoryRayinTotal(self, tradingAccount: str) -> str:
+        """ 每檔庫存一筆 OnReqResult，沒有庫存時與 SDK 相同回傳 "No Data" 字串 """
+        self._send()
+        work_id = f"qid{next(self._qid_seq)}"
+        rows = list(self.inventory.values()) or ["No Data(OnSorTaskResult)"]
+        for row in rows:
+            self._later(self._trader.OnReqResult, work_id, row)
+        return work_id
+
+    def QryRepAll(self, tradingAccount: str):
+        """ 與 SDK 相同，在呼叫端執行緒同步送出每筆委託的最近一筆回報 """
+        with self._lock:
+            reports = list(self.last_reports.values())
+        for report in reports:
+            self._trader.OnReport(report)
+
+    def QryRepDeal(self, tradingAccount: str):
+        with self._lock:
+            reports = [r for r in self.last_reports.values() if r.order.tableName == "RPT:TwsDeal"]
+        for report in reports:
+            self._trader.OnReport(report)
+
+    def NewOrder(self, o: Order) -> RCode:
+        ok = self._send()
+        org = Order(
+            tradingSession=o.tradingSession, side=o.side, symbol=o.symbol,
+            priceType=o.priceType, price=o.price, qty=o.qty, orderType=o.orderType,
+            userDef=o.userDef, tradingAccount=o.tradingAccount,
+        )
+        order = Order(
+            tradingSession=o.tradingSession, side=o.side, symbol=o.symbol,
+            priceType=o.priceType, price=o.price, qty=o.qty, orderType=o.orderType,
+            userDef=o.userDef, tradingAccount=o.tradingAccount,
+        )
+        if not ok:
+            self._report(org, order, "RPT:TwsNew", "99)委託要求拒絕", "流量管制")
+            return RCode.OK
+
+        order.ordNo = f"X{next(self._ord_seq):04d}"
+        order.leavesQty = o.qty
+        order.cumQty = "0"
+        with self._lock:
+            self.orders[order.ordNo] = (org, order)
+        self._report(org, order, "RPT:TwsNew", "101)委託成功")
+        return RCode.OK
+
+    def _change(self, ordNo: str, apply) -> RCode:
+        ok = self._send()
+        with self._lock:
+            entry = self.orders.get(ordNo)
+        if entry is None:
+            return RCode.FAIL
+        org, order = entry
+        if not ok:
+            self._report(org, order, "ORD:TwsOrd", "99)委託要求拒絕", "流量管制")
+            return RCode.OK
+        apply(order)
+        status = "101)委託成功" if int(order.leavesQty) > 0 else "90)委託要求已結束"
+        self._report(org, order, "ORD:TwsOrd", status)
+        return RCode.OK
+
+    def ChangeOrderPrice(self, o) -> RCode:
+        def apply(order):
+            order.price = o.price
+        return self._change(o.ordNo, apply)
+
+    def ChangeOrderQty(self, o) -> RCode:
+        def apply(order):
+            order.leavesQty = str(min(int(order.leavesQty), int(o.qty)))
+        return self._change(o.ordNo, apply)
+
+    def fill(self, ordNo: str, qty: int, price: float):
+        """ 讓委託成交 qty 股 """
+        with self._lock:
+            org, order = self.orders[ordNo]
+        qty = min(qty, int(order.leavesQty))
+        order.leavesQty = str(int(order.leavesQty) - qty)
+        order.cumQty = str(int(order.cumQty or 0) + qty)
+        order.dealPri = f"{price:.2f}"
+        status = "111)全部成交" if int(order.leavesQty) == 0 else "110)部份成交"
+        self._report(org, order, "RPT:TwsDeal", status)
+
+    def disClient(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+
+def make_trader(risk_limits=None, max_requests_per_sec=None, request_burst=1, **api_kwargs) -> Trader:
+    """ 建立接上 StubMasterTradeAPI 的 Trader，不需登入 """
+    trader = Trader(
+        "user", "password", "0000000", verbose=False, risk_limits=risk_limits,
+        max_requests_per_sec=max_requests_per_sec, request_burst=request_burst,
+    )
+    trader.trader = CustomMarketTrader(basics=trader.basics, risk=trader.risk, amends=trader.amends)
+    trader.api = StubMasterTradeAPI(trader.trader, **api_kwargs)
+    if max_requests_per_sec is not None:
+        trader.sender = SendScheduler(max_requests_per_sec, request_burst)
+    trader.status = True
+    return trader
@@ -0,0 +1,116 @@
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import pytest
+
+try:
+    from tech_analysis_api_v2.model import TBSRec
+except ImportError:
+    # 與 tech_analysis_api_v2.model.TBSRec 相同的欄位與型別
+    @dataclass
+    class TBSRec:
+        Prod: str
+        Sequence: int
+        Match_Time: float
+        Match_Price: float
+        Match_Quantity: int
+        Match_Volume: int
+        Is_TryMatch: bool
+        BS: int
+        BP_1_Pre: float
+        SP_1_Pre: float
+
+
+@pytest.fixture
+def tbs_records() -> List[TBSRec]:
+    """ TechAnalysis.GetHisBS_Stock 回傳的歷史成交明細 """
+    return [
+        TBSRec("2330", 1, 84500123456.0, 580.0, 3, 3, True, 0, 579.0, 580.0),
+        TBSRec("2330", 2, 90000000000.0, 581.0, 12, 15, False, 1, 580.0, 581.0),
+        TBSRec("2330", 3, 90001500000.0, 580.0, 5, 20, False, 2, 580.0, 581.0),
+        TBSRec("2330", 4, 132959999999.0, 582.5, 1, 21, False, 1, 582.0, 582.5),
+    ]
+
+
+class FakeTechAnalysis:
+    """ 以固定的歷史成交明細回應 GetHisBS_Stock，錯誤訊息與 SDK 相同 """
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = 0
+
+    def GetHisBS_Stock(self, prod_id, date):
+        from autotraderx.utils import now
+
+        self.calls += 1
+        if date >= now("%Y%m%d"):
+            return None, "不能回補當天"
+        if prod_id != "2330":
+            return None, "api錯誤"
+        return [d for d in self.records if d.Prod == prod_id], ""
+
+
+@pytest.fixture
+def make_backtesting(monkeypatch, tbs_records):
+    """ 不登入的 BackTesting，查詢由 FakeTechAnalysis 回應 """
+    backtesting = pytest.importorskip("autotraderx.masterlink.backtesting")
+    monkeypatch.setattr(backtesting.BackTesting, "login", lambda self: None)
+
+    def make(**kwargs):
+        bt = backtesting.BackTesting("user", "password", **kwargs)
+        bt.tech_analysis = FakeTechAnalysis(tbs_records)
+        return bt
+
+    return make
+
+
+@pytest.fixture
+def make_stub_trader():
+    """ 接上 benchmark/stub_broker.py 模擬券商的 Trader，測試結束時停止 """
+    pytest.importorskip("MasterTradePy")
+    pytest.importorskip("autotraderx.masterlink.trader")
+    benchmark_dir = str(Path(__file__).resolve().parents[1] / "benchmark")
+    if benchmark_dir not in sys.path:
+        sys.path.insert(0, benchmark_dir)
+    from stub_broker import make_trader
+
+    traders = []
+
+    def make(**kwargs):
+        trader = make_trader(**kwargs)
+        traders.append(trader)
+        return trader
+
+    yield make
+    for trader in traders:
+        trader.stop()
+
+
+@pytest.fixture
+def make_isin_page():
+    """
+    產生與 isin.twse.com.tw 相同格式的 ISIN 頁面（cp950），rows 為
+    (代號, 名稱, 國際代碼, 上市日期, 市場別, 產業別)；每個分類標題之後放入全部 rows。
+    """
+    return _isin_page
+
+
+def _isin_page(rows, categories=("股票",)) -> bytes:
+    header = "".join(f"<td>{c}</td>" for c in (
+        "有價證券代號及名稱", "國際證券辨識號碼(ISIN Code)", "上市日", "市場別", "產業別", "CFICode", "備註"))
+    body = []
+    for category in categories:
+        body.append(f"<tr><td colspan=7><B> {category} <B> </td></tr>")
+        for code, name, isin, list_date, market, industry in rows:
+            body.append(
+                f"<tr><td bgcolor=#FAFAD2>{code}　{name}</td><td>{isin}</td><td>{list_date}</td>"
+                f"<td>{market}</td><td>{industry}</td><td>ESVUFR</td><td></td></tr>"
+            )
+    html = (
+        "<html><head><title>ISIN</title></head><body>"
+        "<table class='h1'><tr><td>本國上市證券國際證券辨識號碼一覽表</td></tr></table>"
+        f"<table class='h4'><tr>{header}</tr>\n" + "\n".join(body) + "</table></body></html>"
+    )
+    return html.encode("cp950")
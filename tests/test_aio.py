@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from autotraderx import AsyncStream
+
+DATE = "20240605"
+
+
+def test_async_stream():
+    async def main():
+        stream = AsyncStream()
+        for i in range(3):
+            stream.push(i)
+        stream.close()
+        stream.push(99)
+        return [item async for item in stream]
+
+    assert asyncio.run(main()) == [0, 1, 2]
+
+
+def test_async_stream_drops_oldest():
+    async def main():
+        stream = AsyncStream(maxsize=2)
+        for i in range(3):
+            stream.push(i)
+        await asyncio.sleep(0)
+        return [await stream.get(1), await stream.get(1)], stream.dropped
+
+    assert asyncio.run(main()) == ([1, 2], 1)
+
+
+def test_get_data_bulk(make_backtesting, tbs_records):
+    aio = pytest.importorskip("autotraderx.masterlink.aio")
+    bt = aio.AsyncBackTesting(make_backtesting())
+
+    async def main():
+        return [r async for r in bt.get_data_bulk(["2330"], ["20240603", "20240604", DATE], backoff=0)]
+
+    results = asyncio.run(main())
+    assert sorted(r.key[1] for r in results) == ["20240603", "20240604", DATE]
+    assert all(r.error is None and r.data.side.tolist() == [0, 1, -1, 1] for r in results)
+
+
+def test_get_data_bulk_stops_on_break(make_backtesting):
+    aio = pytest.importorskip("autotraderx.masterlink.aio")
+    backtesting = make_backtesting()
+    fetch = backtesting.tech_analysis.GetHisBS_Stock
+
+    def slow_fetch(prod_id, date):
+        time.sleep(0.01)
+        return fetch(prod_id, date)
+
+    backtesting.tech_analysis.GetHisBS_Stock = slow_fetch
+    bt = aio.AsyncBackTesting(backtesting)
+    dates = [f"2023{m:02d}{d:02d}" for m in range(1, 13) for d in range(1, 29)]
+
+    async def main():
+        async for _ in bt.get_data_bulk(["2330"], dates, max_workers=2, max_requests_per_sec=1000):
+            break
+
+    asyncio.run(main())
+    calls = backtesting.tech_analysis.calls
+    time.sleep(0.1)
+
+    # 讀取端結束後背景查詢即停止，不會查完全部日期
+    assert calls < 10
+    assert backtesting.tech_analysis.calls == calls
@@ -0,0 +1,129 @@
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+amend = pytest.importorskip("autotraderx.masterlink.amend")
+order_state = pytest.importorskip("autotraderx.masterlink.order_state")
+
+
+class Broker:
+    """ 記錄送出的改單，回報由測試自行送入 """
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, ordNo, kind, value):
+        self.sent.append((ordNo, kind, value))
+        future = Future()
+        future.set_result("OK")
+        return future
+
+
+def _report(price="100.0", leaves="1000", status="101)委託成功", table="ORD:TwsOrd", trx_time=None):
+    if trx_time is None:
+        trx_time = time.strftime("%H:%M:%S.000")
+    order = SimpleNamespace(
+        ordNo="X0001", symbol="2330", side="B", price=price, leavesQty=leaves, cumQty="0",
+        status=status, tableName=table, trxTime=trx_time, lastdealTime="", dealPri="",
+    )
+    org_order = SimpleNamespace(price="100.0", qty="1000", userDef="u1")
+    return SimpleNamespace(order=order, orgOrder=org_order, lastMessage="")
+
+
+@pytest.fixture
+def broker():
+    return Broker()
+
+
+@pytest.fixture
+def book():
+    return order_state.OrderStateBook()
+
+
+def _apply(manager, book, data, reply=False):
+    manager.on_report(data, book.apply_report(data), reply=reply)
+
+
+def test_coalesce_until_ack(broker, book):
+    manager = amend.AmendManager(broker.send, ok_code="OK", ack_timeout=5.0)
+    manager.submit("X0001", "price", 101.0)
+    manager.submit("X0001", "price", 102.0)
+    f3 = manager.submit("X0001", "price", 103.0)
+    assert broker.sent == [("X0001", "price", 101.0)]
+
+    # 尚未反映改價的回報不是確認
+    _apply(manager, book, _report(price="100.0"))
+    assert len(broker.sent) == 1
+
+    _apply(manager, book, _report(price="101.0"))
+    assert broker.sent[-1] == ("X0001", "price", 103.0)
+    assert f3.result(timeout=1) == "OK"
+    assert manager.stats()["coalesced"] == 1
+    manager.close()
+
+
+def test_ignore_replayed_report(broker, book):
+    manager = amend.AmendManager(broker.send, ack_timeout=5.0, clock_skew=1.0)
+    manager.submit("X0001", "price", 101.0)
+    manager.submit("X0001", "price", 102.0)
+
+    # QryRepAll 重送的舊回報：委託時間早於送出時間
+    old = time.strftime("%H:%M:%S.000", time.localtime(time.time() - 60))
+    _apply(manager, book, _report(price="101.0", trx_time=old))
+    _apply(manager, book, _report(price="101.0", table="RPT:TwsDeal"))
+    assert manager.in_flight("X0001") == ("price", 101.0)
+
+    _apply(manager, book, _report(price="100.0"), reply=True)
+    assert manager.in_flight("X0001") == ("price", 102.0)
+    manager.close()
+
+
+def test_qty_ack_and_reject(broker, book):
+    manager = amend.AmendManager(broker.send, ack_timeout=5.0)
+    manager.submit("X0001", "qty", 500)
+    manager.submit("X0001", "price", 99.0)
+
+    _apply(manager, book, _report(leaves="1000"))
+    assert manager.in_flight("X0001") == ("qty", 500)
+    _apply(manager, book, _report(leaves="500"))
+    assert manager.in_flight("X0001") == ("price", 99.0)
+    queued = manager.submit("X0001", "price", 98.0)
+
+    # 改單被拒絕只清除在途的改單，委託仍在，排隊中的改單接著送出
+    _apply(manager, book, _report(leaves="500", status="99)委託要求拒絕"))
+    assert book.get("X0001").is_open
+    assert manager.in_flight("X0001") == ("price", 98.0)
+    assert not queued.cancelled()
+    assert broker.sent[-1] == ("X0001", "price", 98.0)
+
+    # 再次被拒絕後仍可重送
+    _apply(manager, book, _report(leaves="500", status="99)委託要求拒絕"))
+    assert manager.in_flight("X0001") is None
+    manager.submit("X0001", "price", 98.0)
+    assert manager.in_flight("X0001") == ("price", 98.0)
+    assert manager.stats()["dropped"] == 0
+    manager.close()
+
+
+def test_lost_ack_redispatch(broker, book):
+    manager = amend.AmendManager(broker.send, ack_timeout=0.05)
+    manager.submit("X0001", "price", 101.0)
+    queued = manager.submit("X0001", "price", 102.0)
+
+    # 沒有任何回報，逾時後由計時器送出排隊中的改單
+    assert queued.result(timeout=1) is not None
+    assert broker.sent == [("X0001", "price", 101.0), ("X0001", "price", 102.0)]
+    assert manager.stats()["timeout"] == 1
+    manager.close()
+
+
+def test_finished_order_drops_queue(broker, book):
+    manager = amend.AmendManager(broker.send, ack_timeout=5.0)
+    manager.submit("X0001", "price", 101.0)
+    queued = manager.submit("X0001", "price", 102.0)
+
+    _apply(manager, book, _report(leaves="0", status="111)全部成交", table="RPT:TwsDeal"))
+    assert queued.cancelled()
+    assert manager.in_flight("X0001") is None
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from autotraderx import BacktestEngine, Strategy, TradeData
+from autotraderx.trade_data import TRADE_DTYPE
+from autotraderx.utils import match_time_to_us
+
+
+def _trade_data(symbol, date, rows):
+    """ rows 為 (成交時間, 成交價格, 成交量, 是否試搓) """
+    array = np.array(
+        [(match_time_to_us(t), p, q, tm, 0) for t, p, q, tm in rows], dtype=TRADE_DTYPE)
+    return TradeData(symbol, array, date)
+
+
+class Scripted(Strategy):
+    """ 在指定的 (日期, 成交時間) 收到成交時執行動作 """
+
+    def __init__(self, actions):
+        self.actions = actions
+        self.ticks = []
+        self.basics = []
+
+    def event_on_update_basic(self, data):
+        self.basics.append((data.Symbol, data.PreClosePrice))
+
+    def event_on_match(self, data):
+        self.ticks.append((data.date, data.Symbol, data.MatchTime, data.MatchPrice, data.TotalMatchQty))
+        action = self.actions.get((data.date, data.MatchTime))
+        if action is not None:
+            action(self.engine)
+
+
+DAY1 = _trade_data("2330", "20240605", [
+    ("09:00:00.000000", 100.5, 5, True),
+    ("09:00:01.000000", 101.0, 2, False),
+    ("09:00:02.000000", 100.0, 3, False),
+    ("09:00:03.000000", 101.5, 1, False),
+    ("09:00:04.000000", 102.0, 4, False),
+    ("13:30:00.000000", 101.0, 10, False),
+])
+DAY2 = _trade_data("2330", "20240606", [
+    ("09:00:00.000000", 99.0, 1, False),
+    ("09:00:01.000000", 98.5, 1, False),
+    ("09:00:02.000000", 97.0, 1, False),
+])
+
+
+def test_round_trip_fees_and_pnl():
+    strategy = Scripted({
+        ("20240605", "09:00:01.000000"): lambda e: e.buy("2330", 1, 100.0),
+        ("20240605", "09:00:03.000000"): lambda e: e.sell("2330", 1, 102.0),
+    })
+    engine = BacktestEngine(strategy)
+    engine.add_data(DAY1)
+    result = engine.run()
+
+    # 試搓略過
+    assert result.n_ticks == 5
+    assert strategy.basics == [("2330", 101.0)]
+    assert [t["成交價"] for t in result.trades] == [100.0, 102.0]
+    assert [t["成交時間"] for t in result.trades] == ["09:00:02.000000", "09:00:04.000000"]
+
+    buy, sell = result.trades
+    # 手續費無條件進位：100000 * 0.001425 * 0.6 = 85.5、102000 * 0.000855 = 87.21
+    assert (buy["手續費"], buy["證交稅"]) == (86, 0)
+    assert (sell["手續費"], sell["證交稅"]) == (88, 306)
+    assert sell["已實現損益"] == 2000 - 88 - 306
+    assert result.realized == 2000
+    assert (result.fees, result.taxes) == (174, 306)
+    assert result.unrealized == 0
+    assert result.net_pnl == 2000 - 174 - 306
+    assert result.positions == {"2330": 0}
+
+
+def test_limit_not_crossed_and_day_end_expiry():
+    strategy = Scripted({
+        # 委託價低於之後所有成交價，收盤後失效，隔日不會成交
+        ("20240605", "09:00:01.000000"): lambda e: e.buy("2330", 1, 99.5),
+        # 市價單以下一筆成交價成交
+        ("20240606", "09:00:00.000000"): lambda e: e.buy("2330", 2),
+    })
+    engine = BacktestEngine(strategy, is_day_trading=True)
+    engine.add_many([DAY2, DAY1])
+    result = engine.run()
+
+    assert [t["日期"] for t in result.trades] == ["20240606"]
+    assert result.trades[0]["成交價"] == 98.5
+    assert result.trades[0]["成交股數"] == 2000
+    assert result.positions == {"2330": 2000}
+    # 前一日最後成交價為隔日的參考價
+    assert strategy.basics == [("2330", 101.0), ("2330", 101.0)]
+    assert result.unrealized == pytest.approx((97.0 - 98.5) * 2000)
+    assert result.net_pnl == pytest.approx(result.unrealized - result.fees)
+    assert engine.open_orders() == []
+
+
+def test_reverse_position_and_day_trading_tax():
+    strategy = Scripted({
+        ("20240605", "09:00:01.000000"): lambda e: e.sell("2330", 1),
+        ("20240605", "09:00:03.000000"): lambda e: e.buy("2330", 2),
+    })
+    engine = BacktestEngine(strategy, is_day_trading=True)
+    engine.add_data(DAY1)
+    result = engine.run()
+
+    sell, buy = result.trades
+    assert (sell["成交價"], buy["成交價"]) == (100.0, 102.0)
+    # 當沖證交稅減半
+    assert sell["證交稅"] == 150
+    # 回補 1 張虧損 2000，剩下 1 張以 102 為成本
+    assert result.realized == -2000
+    assert result.positions == {"2330": 1000}
+    assert engine.avg_costs["2330"] == 102.0
+    assert result.unrealized == (101.0 - 102.0) * 1000
+
+
+def test_merge_symbols_by_time():
+    other = _trade_data("2317", "20240605", [
+        ("09:00:01.500000", 150.0, 1, False),
+        ("09:00:03.000000", 151.0, 2, False),
+    ])
+    strategy = Scripted({})
+    engine = BacktestEngine(strategy, skip_try_match=False)
+    engine.add_many([DAY1, other])
+    engine.run()
+
+    assert [(s, t) for _, s, t, _, _ in strategy.ticks[:5]] == [
+        ("2330", "09:00:00.000000"),
+        ("2330", "09:00:01.000000"),
+        ("2317", "09:00:01.500000"),
+        ("2330", "09:00:02.000000"),
+        ("2330", "09:00:03.000000"),
+    ]
+    # 累計成交量依股票分開計算，含試搓
+    assert strategy.ticks[2][4] == 1
+    assert strategy.ticks[3][4] == 10
+
+
+def test_date_required():
+    with pytest.raises(ValueError):
+        BacktestEngine(Strategy()).add_data(TradeData.empty("2330"))
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from autotraderx import TradeCache, TradeData
+from autotraderx.utils import now
+
+DATE = "20240605"
+
+
+@pytest.fixture
+def backtesting(make_backtesting, tmp_path):
+    return make_backtesting(cache=TradeCache(tmp_path))
+
+
+def test_fetch_cache_get_data(backtesting, make_backtesting, tbs_records, tmp_path):
+    expected = TradeData.from_objects("2330", tbs_records, DATE)
+
+    data = backtesting.fetch("2330", DATE)
+    np.testing.assert_array_equal(data.array, expected.array)
+    assert ("2330", DATE) in backtesting.cache
+
+    # 第二次由快取取得，不再查詢
+    columnar = backtesting.get_data("2330", DATE, columnar=True)
+    records = backtesting.get_data("2330", DATE)
+    assert backtesting.tech_analysis.calls == 1
+    np.testing.assert_array_equal(columnar.array, expected.array)
+    # 與未使用快取時的格式相同
+    assert records == make_backtesting().get_data("2330", DATE)
+    assert [r["成交時間"] for r in records] == [d.Match_Time for d in tbs_records]
+    assert [r["買賣"] for r in records] == [0, 1, 2, 1]
+
+    # 離線模式只讀快取
+    offline = make_backtesting(cache=TradeCache(tmp_path), offline=True)
+    np.testing.assert_array_equal(offline.get_data("2330", DATE, columnar=True).array, expected.array)
+
+
+def test_get_data_uncached(make_backtesting):
+    records = make_backtesting().get_data("2330", DATE)
+    assert TradeData.from_records(records).side.tolist() == [0, 1, -1, 1]
+
+
+def test_get_data_bulk(backtesting, tbs_records):
+    today = now("%Y%m%d")
+    backtesting.fetch("2330", "20240604")
+    backtesting.tech_analysis.calls = 0
+
+    results = {
+        r.key: r for r in backtesting.get_data_bulk(
+            ["2330", "9999"], ["20240604", DATE, today], backoff=0, progress=False)
+    }
+
+    assert len(results) == 6
+    # 快取命中不查詢
+    assert results["2330", "20240604"].attempts == 0
+    assert results["2330", DATE].error is None
+    np.testing.assert_array_equal(
+        results["2330", DATE].data.array, TradeData.from_objects("2330", tbs_records, DATE).array)
+    # 當日資料與股票代號錯誤不重試
+    assert isinstance(results["2330", today].error, ValueError)
+    assert isinstance(results["9999", DATE].error, RuntimeError)
+    assert all(r.attempts <= 1 for r in results.values())
+    assert backtesting.tech_analysis.calls == 5
@@ -0,0 +1,108 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from autotraderx.tick_grid import snap_price, tick_size
+from autotraderx.utils import calc_break_even_price, calc_minimum_profit, get_next_tick_price
+
+TAX, FEE = 0.003, 0.001425
+
+# 各升降單位區間的邊界與其前後價位
+EDGES = [9.99, 10, 10.05, 49.95, 50, 50.1, 99.9, 100, 100.5, 499.5, 500, 501, 999, 1000, 1005]
+
+
+def brute_force(price, number, mode, tax_pct, fee_pct, discount, is_day_trading, minimum_fee=20):
+    """ 一次走一個價位並重算手續費與稅，找到第一個有獲利的出場價位 """
+    shares = number * 1000
+    day_trading = 0.5 if is_day_trading else 1
+
+    def fee(p):
+        return max(math.ceil(p * shares * fee_pct * discount), minimum_fee)
+
+    def tax(p):
+        return math.ceil(p * shares * tax_pct * day_trading)
+
+    exit_price = price
+    while True:
+        exit_price = get_next_tick_price(exit_price, mode)
+        if mode == "Buy":
+            profit = (exit_price - price) * shares - fee(price) - fee(exit_price) - tax(exit_price)
+        else:
+            profit = (price - exit_price) * shares - fee(price) - tax(price) - fee(exit_price)
+        if profit > 0:
+            return exit_price
+
+
+@pytest.mark.parametrize("price, tick, up, down", [
+    (9.99, 0.01, 10.0, 9.98),
+    (10, 0.05, 10.05, 9.99),
+    (49.95, 0.05, 50.0, 49.9),
+    (50, 0.1, 50.1, 49.95),
+    (99.9, 0.1, 100.0, 99.8),
+    (100, 0.5, 100.5, 99.9),
+    (499.5, 0.5, 500.0, 499.0),
+    (500, 1.0, 501.0, 499.5),
+    (999, 1.0, 1000.0, 998.0),
+    (1000, 5.0, 1005.0, 999.0),
+])
+def test_tick_band_edges(price, tick, up, down):
+    assert tick_size(price) == tick
+    assert get_next_tick_price(price, "Buy") == up
+    assert get_next_tick_price(price, "Sell") == down
+
+
+@pytest.mark.parametrize("mode, is_day_trading, discount", list(itertools.product(
+    ("Buy", "Sell"), (False, True), (0.6, 0.28, 1))))
+def test_matches_brute_force(mode, is_day_trading, discount):
+    rng = np.random.default_rng(0)
+    prices = np.concatenate([snap_price(np.array(EDGES)), snap_price(rng.uniform(1, 1500, 200))])
+    numbers = np.concatenate([np.ones(len(EDGES), dtype=int), rng.integers(1, 50, 200)])
+
+    fast = calc_break_even_price(
+        prices, numbers, mode,
+        transaction_tax_percentage=TAX,
+        handling_fee_percentage=FEE,
+        discount_percentage=discount,
+        is_day_trading=is_day_trading,
+    )
+    slow = [
+        brute_force(p, n, mode, TAX, FEE, discount, is_day_trading)
+        for p, n in zip(prices.tolist(), numbers.tolist())
+    ]
+    assert fast.tolist() == slow
+
+
+@pytest.mark.parametrize("price", EDGES)
+def test_scalar_edges(price):
+    for mode in ("Buy", "Sell"):
+        expected = brute_force(price, 1, mode, TAX, FEE, 0.6, False)
+        assert calc_break_even_price(price, 1, mode) == expected
+        assert isinstance(calc_break_even_price(price, 1, mode), float)
+
+
+def test_minimum_profit():
+    exit_price, info = calc_minimum_profit(100, 1, "Buy")
+    assert exit_price == brute_force(100, 1, "Buy", TAX, FEE, 0.6, False)
+    assert info["buy_price"] == 100
+    assert info["sell_price"] == exit_price
+    assert info["estimated_profit"] > 0
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        calc_break_even_price(100, 1, "Hold")
+    with pytest.raises(ValueError):
+        calc_break_even_price(0, 1, "Buy")
+    with pytest.raises(ValueError):
+        calc_break_even_price(100, 0, "Buy")
+    with pytest.raises(ValueError):
+        calc_break_even_price([100, 50], [1, -1], "Sell")
+
+
+def test_unreachable_profit():
+    # 手續費等於成交金額時，任何出場價位都不會獲利
+    for mode in ("Buy", "Sell"):
+        with pytest.raises(ValueError):
+            calc_break_even_price(100, 1, mode, handling_fee_percentage=1.0, discount_percentage=1)
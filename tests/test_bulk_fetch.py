@@ -0,0 +1,63 @@
+from autotraderx import date_range, fetch_many
+
+
+def _flaky(failures, error):
+    calls = {}
+
+    def fetch(prod_id, date):
+        n = calls[prod_id, date] = calls.get((prod_id, date), 0) + 1
+        if n <= failures:
+            raise error
+        return prod_id + date
+
+    return fetch, calls
+
+
+def test_retry_transient_error():
+    fetch, calls = _flaky(2, ConnectionError("reset"))
+    results = list(fetch_many(fetch, [("2330", "20240605")], retries=3, backoff=0, progress=False))
+
+    assert len(results) == 1
+    assert results[0].error is None
+    assert results[0].data == "233020240605"
+    assert results[0].attempts == 3
+
+
+def test_retry_exhausted():
+    fetch, _ = _flaky(10, TimeoutError("timeout"))
+    result, = fetch_many(fetch, [("2330", "20240605")], retries=2, backoff=0, progress=False)
+
+    assert isinstance(result.error, TimeoutError)
+    assert result.attempts == 3
+
+
+def test_fail_fast_on_other_errors():
+    fetch, calls = _flaky(10, ValueError("不能回補當天"))
+    keys = [("2330", d) for d in date_range("20240603", "20240607")]
+    results = list(fetch_many(fetch, keys, retries=3, backoff=0, progress=False))
+
+    assert len(results) == 5
+    assert all(isinstance(r.error, ValueError) and r.attempts == 1 for r in results)
+    assert sum(calls.values()) == 5
+
+
+def test_close_cancels_queued_keys():
+    import time
+
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        time.sleep(0.01)
+        return key
+
+    results = fetch_many(fetch, range(100), max_workers=2, progress=False)
+    first = [next(results) for _ in range(3)]
+    results.close()
+    n_calls = len(calls)
+    time.sleep(0.05)
+
+    assert len(first) == 3
+    # 只有提前結束時已在執行的查詢會完成
+    assert n_calls <= 3 + 2 * 2
+    assert len(calls) == n_calls
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from autotraderx.indicators import BBands, CDP, EMA, KD, MACD, RSI, SAR, SMA, WMA
+
+
+@pytest.fixture
+def bars():
+    """ 隨機漫步的收盤價，高低價包住收盤價；中間有一段平盤 """
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 300))
+    close[100:110] = close[99]
+    high = close + rng.uniform(0, 1, len(close))
+    low = close - rng.uniform(0, 1, len(close))
+    high[100:110] = low[100:110] = close[100:110]
+    return close, high, low
+
+
+def _stream(indicator, close, high, low):
+    values = [indicator.update(c, h, l) for c, h, l in zip(close.tolist(), high.tolist(), low.tolist())]
+    if isinstance(values[0], tuple):
+        return type(values[0])(*(np.array(v, dtype=np.float64) for v in zip(*values)))
+    return np.array(values, dtype=np.float64)
+
+
+def _fields(value):
+    """ 單一陣列或 NamedTuple 的各欄位 """
+    return (value,) if isinstance(value, np.ndarray) else tuple(value)
+
+
+@pytest.mark.parametrize("make, warm_up", [
+    (lambda: SMA(5), 4),
+    (lambda: SMA(1), 0),
+    (lambda: EMA(10), 0),
+    (lambda: WMA(7), 6),
+    (lambda: RSI(14), 1),
+    (lambda: MACD(12, 26, 9), 0),
+    (lambda: KD(9, 3, 3), 0),
+    (lambda: CDP(), 0),
+    (lambda: BBands(20, 2.0), 19),
+])
+def test_update_matches_batch(bars, make, warm_up):
+    close, high, low = bars
+    streamed = _stream(make(), close, high, low)
+    batched = make().batch(close, high, low)
+
+    for s, b in zip(_fields(streamed), _fields(batched)):
+        b = np.asarray(b, dtype=np.float64)
+        np.testing.assert_allclose(s, b, rtol=1e-9, atol=1e-9, equal_nan=True)
+        # 暖機期間為 NaN，之後都有值
+        assert np.isnan(b[:warm_up]).all()
+        assert not np.isnan(b[warm_up:]).any()
+
+
+def test_short_input(bars):
+    # 資料少於視窗長度時全部為 NaN
+    close, high, low = (x[:3] for x in bars)
+    for make in (lambda: SMA(5), lambda: WMA(5), lambda: BBands(5)):
+        streamed = _stream(make(), close, high, low)
+        batched = make().batch(close, high, low)
+        for s, b in zip(_fields(streamed), _fields(batched)):
+            assert np.isnan(s).all() and np.isnan(b).all()
+
+
+def test_sar_matches_batch(bars):
+    close, high, low = bars
+    sar = SAR()
+    streamed = [sar.update(c, h, l) for c, h, l in zip(close.tolist(), high.tolist(), low.tolist())]
+    batched = SAR().batch(close, high, low)
+
+    # 第一根 K 棒沒有趨勢
+    assert streamed[0].rising is None and np.isnan(batched.sar[0])
+    np.testing.assert_allclose([v.sar for v in streamed], batched.sar, equal_nan=True)
+    np.testing.assert_allclose([v.ep for v in streamed], batched.ep, equal_nan=True)
+    np.testing.assert_allclose([v.af for v in streamed], batched.af, equal_nan=True)
+    assert [v.rising for v in streamed] == batched.rising.tolist()
+    # 趨勢有翻轉，且 af 不超過上限
+    assert len(set(batched.rising.tolist()[1:])) == 2
+    assert np.nanmax(batched.af) <= 0.2
+
+
+def test_known_values():
+    close = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    np.testing.assert_allclose(SMA(3).batch(close), [np.nan, np.nan, 2.0, 3.0, 4.0], equal_nan=True)
+    np.testing.assert_allclose(WMA(3).batch(close), [np.nan, np.nan, 14 / 6, 20 / 6, 26 / 6], equal_nan=True)
+    np.testing.assert_allclose(EMA(3).batch(close), [1.0, 1.5, 2.25, 3.125, 4.0625])
+    assert RSI(3).batch(close).rsi[1:].tolist() == [100.0] * 4
+    ma, ub, lb = BBands(3, 2.0).batch(close)
+    np.testing.assert_allclose(ub[2:] - ma[2:], 2 * np.std([1.0, 2.0, 3.0]))
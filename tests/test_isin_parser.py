@@ -0,0 +1,64 @@
+import pytest
+
+from autotraderx.isin_parser import IsinRow, iter_isin_rows
+
+ROWS = [
+    ("2330", "台積電", "TW0002330008", "1994/09/05", "上市", "半導體業"),
+    ("00878", "國泰永續高股息", "TW00000878B5", "2020/07/20", "上市", ""),
+    ("3661", "世芯-KY", "TW0003661005", "2014/11/24", "上市", "半導體業"),
+]
+
+
+@pytest.fixture
+def page(make_isin_page):
+    return make_isin_page(ROWS, ("股票", "ETF"))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_chunked_cp950(page, size):
+    # 分段會切在 cp950 雙位元組字元中間
+    chunks = (page[i:i + size] for i in range(0, len(page), size))
+    rows = list(iter_isin_rows(chunks))
+
+    # 表頭與分類標題列略過，每個分類各一組資料列
+    assert rows == [IsinRow(*row) for row in ROWS] * 2
+    assert rows[0] == IsinRow("2330", "台積電", "TW0002330008", "1994/09/05", "上市", "半導體業")
+
+
+def test_whole_page(page):
+    assert list(iter_isin_rows(page)) == list(iter_isin_rows(page.decode("cp950")))
+    assert len(list(iter_isin_rows(page))) == 6
+
+
+def test_other_tables_and_blank_code():
+    html = (
+        "<table class='h4'><tr><td>有價證券代號及名稱</td><td>a</td><td>b</td><td>c</td>"
+        "<td>d</td><td>e</td><td>f</td></tr>"
+        "<tr><td colspan=7><B> 股票 <B></td></tr>"
+        "<tr><td>　</td><td>X</td><td></td><td></td><td></td><td></td><td></td></tr>"
+        "<tr><td>2317　鴻海</td><td>TW0002317005</td><td>1991/06/18</td><td>上市</td><td>其他電子業</td>"
+        "<td>ESVUFR</td><td></td></tr>"
+        "</table>"
+        # 不是 class="h4" 的表格不解析
+        "<table class='h1'><tr><td>1111　不是資料</td><td>1</td><td>2</td><td>3</td><td>4</td><td>5</td><td>6</td></tr>"
+        "<tr><td>1111　不是資料</td><td>1</td><td>2</td><td>3</td><td>4</td><td>5</td><td>6</td></tr></table>"
+    ).encode("cp950")
+    assert list(iter_isin_rows(html)) == [
+        IsinRow("2317", "鴻海", "TW0002317005", "1991/06/18", "上市", "其他電子業"),
+    ]
+
+
+def test_rows_streamed_before_end(page):
+    # 收到完整的列即回傳，不等整頁讀完
+    half = page.index("國泰".encode("cp950"))
+    consumed = []
+
+    def chunks():
+        for chunk in (page[:half], page[half:]):
+            consumed.append(chunk)
+            yield chunk
+
+    rows = iter_isin_rows(chunks())
+    assert next(rows).code == "2330"
+    assert len(consumed) == 1
+    assert [row.code for row in rows] == ["00878", "3661", "2330", "00878", "3661"]
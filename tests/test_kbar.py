@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from autotraderx.kbar import KBAR_DTYPE, KBarAggregator, parse_interval, resample_trade_data
+from autotraderx.trade_data import TRADE_DTYPE, TradeData
+from autotraderx.utils import match_time_to_us
+
+
+def _trade_data(rows, symbol="2330", date="20240605"):
+    """ rows 為 (成交時間, 成交價格, 成交量, 是否試搓) """
+    array = np.array([(match_time_to_us(t), p, q, tm, 0) for t, p, q, tm in rows], dtype=TRADE_DTYPE)
+    return TradeData(symbol, array, date)
+
+
+@pytest.fixture
+def random_data():
+    rng = np.random.default_rng(0)
+    times = np.sort(rng.integers(match_time_to_us("08:30:00"), match_time_to_us("13:30:00"), 2000))
+    array = np.empty(len(times), dtype=TRADE_DTYPE)
+    array["time"] = times
+    array["price"] = np.round(580 + np.cumsum(rng.normal(0, 0.5, len(times))), 1)
+    array["qty"] = rng.integers(1, 20, len(times))
+    array["try_match"] = times < match_time_to_us("09:00:00")
+    array["side"] = 0
+    return TradeData("2330", array, "20240605")
+
+
+def _aggregate(data, **kwargs):
+    aggregator = KBarAggregator(**kwargs)
+    closed = aggregator.feed(data)
+    closed += aggregator.flush()
+    return np.array(
+        [(b.start, b.open, b.high, b.low, b.close, b.volume, b.ticks) for b in closed], dtype=KBAR_DTYPE)
+
+
+@pytest.mark.parametrize("interval", ["30s", "1m", "5m", 3600])
+@pytest.mark.parametrize("session_start", ["09:00", "09:02", "08:45"])
+@pytest.mark.parametrize("skip_try_match", [True, False])
+def test_aggregator_matches_resample(random_data, interval, session_start, skip_try_match):
+    kwargs = dict(interval=interval, session_start=session_start, skip_try_match=skip_try_match)
+    streamed = _aggregate(random_data, **kwargs)
+    batched = resample_trade_data(random_data, **kwargs)
+
+    np.testing.assert_array_equal(streamed, batched)
+    kept = ~random_data.try_match if skip_try_match else np.ones(len(random_data), dtype=bool)
+    assert batched["volume"].sum() == random_data.qty[kept].sum()
+    assert batched["ticks"].sum() == kept.sum()
+    # 每根 K 棒的起點都落在以 session_start 對齊的週期上
+    step = parse_interval(interval) * 1000000
+    assert ((batched["start"] - match_time_to_us(f"{session_start}:00")) % step == 0).all()
+
+
+def test_bar_boundaries():
+    data = _trade_data([
+        ("08:59:59.999999", 99.0, 1, True),
+        ("09:00:00.000000", 100.0, 1, False),
+        ("09:00:59.999999", 101.0, 2, False),
+        ("09:01:00.000000", 102.0, 3, False),
+        ("09:03:30.000000", 98.0, 4, False),
+    ])
+    bars = resample_trade_data(data, "1m")
+    np.testing.assert_array_equal(_aggregate(data, interval="1m"), bars)
+    assert [match_time_to_us(t) for t in ("09:00:00", "09:01:00", "09:03:00")] == bars["start"].tolist()
+    assert bars[0].tolist()[1:] == (100.0, 101.0, 100.0, 101.0, 3, 2)
+    # 沒有成交的週期不產生 K 棒
+    assert len(bars) == 3
+
+    # 2 分 K 以 09:01 對齊時，09:00:00 與 09:00:59.999999 屬於 08:59 開始的 K 棒
+    shifted = resample_trade_data(data, "2m", session_start="09:01")
+    assert shifted["start"].tolist() == [
+        match_time_to_us("08:59:00"), match_time_to_us("09:01:00"), match_time_to_us("09:03:00")]
+    assert shifted["volume"].tolist() == [3, 3, 4]
+
+
+def test_on_match_and_advance():
+    closed = []
+    aggregator = KBarAggregator("1m", on_bar=closed.append)
+    tick = SimpleNamespace(Symbol="2330", MatchTime="08:59:58.000000", MatchPrice="99", MatchQty="1", IsTxTrail=True)
+    assert aggregator.on_match(tick) is None and aggregator.current("2330") is None
+
+    for t, p in (("09:00:01.000000", "100"), ("09:00:30.000000", "100.5"), ("09:01:00.000000", "101")):
+        aggregator.on_match(SimpleNamespace(
+            Symbol="2330", MatchTime=t, MatchPrice=p, MatchQty="2", IsTxTrail=False), date="20240605")
+    assert [b.close for b in closed] == [100.5]
+    assert closed[0].to_dict()["時間"] == "09:00:00.000000"
+    assert closed[0].volume == 4 and closed[0].ticks == 2
+
+    # 時鐘驅動：09:02:00 之後 09:01 的 K 棒收盤
+    assert aggregator.advance(match_time_to_us("09:01:59.999999")) == []
+    assert [b.start_time for b in aggregator.advance(match_time_to_us("09:02:00"))] == ["09:01:00.000000"]
+    assert [b.close for b in aggregator.bars("2330")] == [100.5, 101.0]
+
+    # 換日時即使時間較早也收盤
+    aggregator.update("2330", match_time_to_us("13:29:00"), 102.0, 1, "20240605")
+    bar = aggregator.update("2330", match_time_to_us("09:00:00"), 103.0, 1, "20240606")
+    assert bar.date == "20240605" and aggregator.current("2330").date == "20240606"
+
+
+def test_parse_interval():
+    assert parse_interval("30s") == 30
+    assert parse_interval("5m") == 300
+    assert parse_interval("1h") == 3600
+    assert parse_interval("90") == 90
+    with pytest.raises(ValueError):
+        parse_interval(0)
+    assert len(resample_trade_data(TradeData.empty("2330"))) == 0
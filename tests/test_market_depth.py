@@ -0,0 +1,89 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from autotraderx.market_depth import DepthBook, MarketDepth
+
+
+def _tick(symbol="2330", bid=("580", "579", "578", "577", "576"), bid_qty=("10", "20", "30", "40", "50"),
+          ask=("581", "582", "583", "584", "585"), ask_qty=("30", "20", "10", "5", "5"), time="09:00:00.000000"):
+    return SimpleNamespace(
+        Symbol=symbol, BuyPrice=list(bid), BuyQty=list(bid_qty),
+        SellPrice=list(ask), SellQty=list(ask_qty), OrderBookTime=time,
+    )
+
+
+def test_top_of_book():
+    depth = MarketDepth()
+    snap = depth.on_order_book(_tick())
+
+    assert (snap.best_bid, snap.best_ask) == (580.0, 581.0)
+    assert snap.mid == 580.5
+    assert snap.spread == 1.0
+    # 買量 150、賣量 70
+    assert snap.imbalance == pytest.approx((150 - 70) / 220)
+    # 賣方最佳一檔量較大，microprice 偏向買價
+    assert snap.microprice == pytest.approx((580 * 30 + 581 * 10) / 40)
+    assert snap.microprice < snap.mid
+    assert snap.seq == 1 and snap.time == "09:00:00.000000"
+    assert depth.snapshot("2330") is snap
+
+
+def test_empty_levels():
+    depth = MarketDepth()
+    # 漲停時賣方沒有委託，SDK 以空字串表示
+    snap = depth.on_order_book(_tick(ask=("", "", "", "", ""), ask_qty=("", "", "", "", "")))
+
+    assert snap.ask_prices == (0.0,) * 5
+    assert math.isnan(snap.mid) and math.isnan(snap.spread) and math.isnan(snap.microprice)
+    assert snap.imbalance == 1.0
+
+    # 兩邊都沒有委託
+    snap = depth.on_order_book(_tick(bid=[""] * 5, bid_qty=[""] * 5, ask=[""] * 5, ask_qty=[""] * 5))
+    assert math.isnan(snap.imbalance)
+
+    # 部分檔位為空字串或無法轉換
+    snap = depth.on_order_book(_tick(bid=("580", "", None, "x", "576"), bid_qty=("10", "", "", "", "5")))
+    assert snap.bid_prices == (580.0, 0.0, 0.0, 0.0, 576.0)
+    assert snap.mid == 580.5
+
+
+def test_fewer_levels_keep_layout():
+    book = DepthBook("2330")
+    snap = book.update(["100", "99.5"], ["1", "2"], ["100.5"], ["3"])
+
+    assert snap.bid_prices == (100.0, 99.5, 0.0, 0.0, 0.0)
+    assert snap.ask_qtys == (3.0, 0.0, 0.0, 0.0, 0.0)
+    np.testing.assert_array_equal(book.to_numpy()[:, 0], [100.0, 1.0, 100.5, 3.0])
+    assert book.to_numpy().shape == (4, 5)
+
+
+def test_top_unchanged_reuses_values():
+    book = DepthBook("2330")
+    first = book.update(*_levels(bid_qty=("10", "20", "30", "40", "50")))
+    second = book.update(*_levels(bid_qty=("10", "0", "0", "0", "0")))
+
+    assert second.seq == 2
+    assert (second.mid, second.spread, second.microprice) == (first.mid, first.spread, first.microprice)
+    assert second.imbalance != first.imbalance
+    # 讀取端拿到的舊快照不受之後的更新影響
+    assert first.bid_qtys[1] == 20.0
+
+
+def _levels(bid_qty):
+    tick = _tick(bid_qty=bid_qty)
+    return tick.BuyPrice, tick.BuyQty, tick.SellPrice, tick.SellQty
+
+
+def test_multiple_symbols():
+    depth = MarketDepth(levels=3)
+    depth.on_order_book(_tick("2330"))
+    depth.on_order_book(_tick("2317", bid=("150", "149.5", "149"), ask=("150.5", "151", "151.5")))
+
+    assert len(depth) == 2 and "2317" in depth
+    assert depth.snapshot("9999") is None
+    assert depth.snapshot("2330").bid_prices == (580.0, 579.0, 578.0)
+    assert depth.snapshots()["2317"].spread == 0.5
+    assert sorted(book.symbol for book in depth) == ["2317", "2330"]
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+order_state = pytest.importorskip("autotraderx.masterlink.order_state")
+
+
+def _report(status, leaves, cum, table, deal_price="", deal_time="", ordNo="X0001", symbol="2330"):
+    order = SimpleNamespace(
+        ordNo=ordNo, symbol=symbol, side="B", price="100.0", leavesQty=leaves, cumQty=cum,
+        status=status, tableName=table, trxTime="09:00:00.000", lastdealTime=deal_time, dealPri=deal_price,
+    )
+    org_order = SimpleNamespace(price="100.0", qty="1000", userDef="u1")
+    return SimpleNamespace(order=order, orgOrder=org_order, lastMessage="")
+
+
+def test_fills_from_deal_reports():
+    book = order_state.OrderStateBook()
+    book.apply_report(_report("101)委託成功", "1000", "0", "RPT:TwsNew"))
+    book.apply_report(_report("110)部份成交", "600", "400", "RPT:TwsDeal", "100.0", "09:00:01.000"))
+    book.apply_report(_report("111)全部成交", "0", "1000", "RPT:TwsDeal", "99.5", "09:00:02.000"))
+
+    state = book.get("X0001")
+    assert state.fills == [("09:00:01.000", "100.0", 400), ("09:00:02.000", "99.5", 600)]
+    assert state.cum_qty == 1000
+    assert not state.is_open
+    assert book.open_orders("2330") == []
+
+
+def test_fill_after_order_report():
+    book = order_state.OrderStateBook()
+    book.apply_report(_report("101)委託成功", "1000", "0", "RPT:TwsNew"))
+    # 委託回報先帶來新的 cumQty，成交回報之後才到
+    book.apply_report(_report("110)部份成交", "600", "400", "ORD:TwsOrd"))
+    book.apply_report(_report("110)部份成交", "600", "400", "RPT:TwsDeal", "100.0", "09:00:01.000"))
+    # 重複的成交回報不重複計入
+    book.apply_report(_report("110)部份成交", "600", "400", "RPT:TwsDeal", "100.0", "09:00:01.000"))
+
+    state = book.get("X0001")
+    assert state.fills == [("09:00:01.000", "100.0", 400)]
+    assert state.cum_qty == 400
+    assert [s.ordNo for s in book.open_orders("2330")] == ["X0001"]
+
+
+def test_indexes():
+    book = order_state.OrderStateBook()
+    book.apply_report(_report("101)委託成功", "1000", "0", "RPT:TwsNew", ordNo="X0001"))
+    book.apply_report(_report("101)委託成功", "1000", "0", "RPT:TwsNew", ordNo="X0002", symbol="2317"))
+    book.apply_report(_report("90)委託要求已結束", "0", "0", "ORD:TwsOrd", ordNo="X0002", symbol="2317"))
+
+    assert book.apply_report(_report("99)委託要求拒絕", "0", "0", "RPT:TwsNew", ordNo="")) is None
+    assert len(book) == 2
+    assert [s.ordNo for s in book.open_orders()] == ["X0001"]
+    assert [s.ordNo for s in book.by_status("90")] == ["X0002"]
+    assert book.get_by_user_def("u1").ordNo == "X0002"
+
+
+def test_reports_view():
+    trader = pytest.importorskip("autotraderx.masterlink.trader")
+    market_trader = trader.CustomMarketTrader(history_size=2)
+    reports = [_report("101)委託成功", "1000", "0", "RPT:TwsNew", ordNo=f"X{i:04d}") for i in range(3)]
+    for data in reports:
+        market_trader.OnReport(data)
+
+    assert market_trader.reports == tuple(reports[1:])
+    assert market_trader.reports[-1:] == (reports[2],)
+    with pytest.raises(AttributeError):
+        market_trader.reports = []
+    assert len(market_trader.order_book) == 3
+
+
+def test_request_reject_keeps_order_open():
+    book = order_state.OrderStateBook()
+    book.apply_report(_report("101)委託成功", "1000", "0", "RPT:TwsNew"))
+    # 改價要求被拒絕，委託仍在，剩餘股數不變
+    book.apply_report(_report("99)委託要求拒絕", "1000", "0", "ORD:TwsOrd"))
+
+    state = book.get("X0001")
+    assert state.is_open
+    assert state.request_rejected
+    assert state.last_request_status == "99)委託要求拒絕"
+    assert state.order_status_code == "101"
+    assert [s.ordNo for s in book.open_orders("2330")] == ["X0001"]
+
+    # 刪單完成後才結束
+    book.apply_report(_report("90)委託要求已結束", "0", "0", "ORD:TwsOrd"))
+    assert not state.is_open
+    assert book.open_orders("2330") == []
+
+
+def test_new_order_reject_is_final():
+    book = order_state.OrderStateBook()
+    book.apply_report(_report("99)委託要求拒絕", "1000", "0", "RPT:TwsNew"))
+
+    state = book.get("X0001")
+    assert not state.is_open
+    assert not state.request_rejected
+    assert book.open_orders("2330") == []
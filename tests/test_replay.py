@@ -0,0 +1,60 @@
+import pytest
+
+from autotraderx import TradeCache
+
+DATE = "20240605"
+
+
+class Recorder:
+
+    def __init__(self):
+        self.basics = []
+        self.ticks = []
+
+    def event_on_update_basic(self, basic):
+        self.basics.append(basic)
+
+    def event_on_match(self, tick):
+        self.ticks.append(tick)
+
+
+def _replay(load, *args):
+    replay = pytest.importorskip("autotraderx.masterlink.replay")
+    recorder = Recorder()
+    engine = replay.ReplayEngine(replay.ReplayMarketDataMart.bind(recorder))
+    getattr(engine, load)(*args)
+    stats = engine.run()
+    return recorder, stats
+
+
+def _match_rows(ticks):
+    return [(t.MatchTime, t.MatchPrice, t.MatchQty, t.TotalMatchQty, t.IsTxTrail) for t in ticks]
+
+
+EXPECTED = [
+    ("08:45:00.123456", 580.0, 3, 3, True),
+    ("09:00:00.000000", 581.0, 12, 15, False),
+    ("09:00:01.500000", 580.0, 5, 20, False),
+    ("13:29:59.999999", 582.5, 1, 21, False),
+]
+
+
+def test_load_backtesting(make_backtesting):
+    # 未使用快取時成交時間為 SDK 的 float
+    data = make_backtesting().get_data("2330", DATE)
+    recorder, stats = _replay("load_backtesting", data)
+
+    assert stats["ticks"] == 4
+    assert recorder.basics[0].Symbol == "2330"
+    assert recorder.basics[0].PreClosePrice == 580.0
+    assert _match_rows(recorder.ticks) == EXPECTED
+
+
+def test_load_backtesting_cached(make_backtesting, tmp_path):
+    bt = make_backtesting(cache=TradeCache(tmp_path))
+    bt.fetch("2330", DATE)
+    # 快取的 records 與 SDK 格式相同
+    recorder, _ = _replay("load_backtesting", bt.get_data("2330", DATE), 579.5)
+
+    assert recorder.basics[0].PreClosePrice == 579.5
+    assert _match_rows(recorder.ticks) == EXPECTED
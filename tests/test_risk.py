@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+risk = pytest.importorskip("autotraderx.masterlink.risk")
+order_state = pytest.importorskip("autotraderx.masterlink.order_state")
+
+
+def _report(ordNo, status, leaves="1000", cum="0", table="RPT:TwsNew", deal_price="", user_def="u1"):
+    order = SimpleNamespace(
+        ordNo=ordNo, symbol="2330", side="B", price="100.0", leavesQty=leaves, cumQty=cum,
+        status=status, tableName=table, trxTime="09:00:00.000", lastdealTime="", dealPri=deal_price,
+    )
+    org_order = SimpleNamespace(price="100.0", qty="1000", userDef=user_def)
+    return SimpleNamespace(order=order, orgOrder=org_order, lastMessage="")
+
+
+@pytest.fixture
+def gate():
+    return risk.RiskGate(risk.RiskLimits(max_position=1000))
+
+
+def _apply(gate, book, data):
+    gate.on_report(data, book.apply_report(data))
+
+
+def test_reject_without_ordNo_releases(gate):
+    book = order_state.OrderStateBook()
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u1") is None
+    assert gate.exposure("2330")["open_buy"] == 1000
+    # 預留已滿，第二筆被擋下
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u2") is not None
+
+    # 流量管制拒絕的新單沒有委託書號
+    _apply(gate, book, _report("", "99)委託要求拒絕"))
+    assert gate.exposure("2330")["open_buy"] == 0
+    assert gate.open_qty == 0
+    assert gate.open_notional == 0.0
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u2") is None
+
+
+def test_pending_kept_until_final(gate):
+    book = order_state.OrderStateBook()
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u1") is None
+
+    # 非最終狀態且沒有委託書號的回報不釋放
+    _apply(gate, book, _report("", "0)"))
+    assert gate.exposure("2330")["open_buy"] == 1000
+
+    _apply(gate, book, _report("X0001", "101)委託成功"))
+    _apply(gate, book, _report("X0001", "110)部份成交", leaves="600", cum="400",
+                               table="RPT:TwsDeal", deal_price="100.0"))
+    assert gate.exposure("2330") == {"position": 400, "open_buy": 600, "open_sell": 0, "notional": 40000.0}
+
+    _apply(gate, book, _report("X0001", "90)委託要求已結束", leaves="0", cum="400", table="ORD:TwsOrd"))
+    assert gate.exposure("2330")["open_buy"] == 0
+    assert gate.position("2330") == 400
+
+
+def test_request_reject_keeps_reservation(gate):
+    book = order_state.OrderStateBook()
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u1") is None
+    _apply(gate, book, _report("X0001", "101)委託成功"))
+
+    # 改價被拒絕，委託仍在，未成交部位不釋放
+    _apply(gate, book, _report("X0001", "99)委託要求拒絕", table="ORD:TwsOrd"))
+    assert gate.exposure("2330")["open_buy"] == 1000
+    assert gate.open_qty == 1000
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u2") is not None
+
+    # 沒有委託書號的要求步驟回報也不釋放預留
+    assert gate.check("2330", "S", 1000, 100.0, user_def="u3") is None
+    _apply(gate, book, _report("", "90)委託要求已結束", user_def="u3"))
+    assert gate.exposure("2330")["open_sell"] == 1000
+
+    _apply(gate, book, _report("X0001", "90)委託要求已結束", leaves="0", table="ORD:TwsOrd"))
+    assert gate.exposure("2330")["open_buy"] == 0
+    assert gate.check("2330", "B", 1000, 100.0, user_def="u2") is None
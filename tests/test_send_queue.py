@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+
+send_queue = pytest.importorskip("autotraderx.masterlink.send_queue")
+SendScheduler = send_queue.SendScheduler
+CANCEL, AMEND, NEW = send_queue.CANCEL, send_queue.AMEND, send_queue.NEW
+
+
+class Recorder:
+
+    def __init__(self):
+        self.calls = []
+        self.times = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, name):
+        self.gate.wait(5)
+        self.calls.append(name)
+        self.times.append(time.perf_counter())
+        return name
+
+
+@pytest.fixture
+def scheduler():
+    schedulers = []
+
+    def make(rate, burst=1):
+        s = SendScheduler(rate, burst)
+        schedulers.append(s)
+        return s
+
+    yield make
+    for s in schedulers:
+        s.close()
+
+
+def test_priority(scheduler):
+    send = Recorder()
+    sender = scheduler(1000)
+    # 第一筆送出時卡住，其餘要求在佇列中排隊
+    send.gate.clear()
+    futures = [sender.submit(NEW, send, "new0")]
+    time.sleep(0.05)
+    futures += [sender.submit(NEW, send, f"new{i}") for i in range(1, 4)]
+    futures.append(sender.submit(AMEND, send, "amend", key=("price", "X0001")))
+    futures.append(sender.submit(CANCEL, send, "cancel", key=("cancel", "X0001")))
+    send.gate.set()
+    wait(futures, timeout=5)
+
+    assert send.calls == ["new0", "cancel", "amend", "new1", "new2", "new3"]
+
+
+def test_cancel_jumps_queue_while_waiting_for_token(scheduler):
+    send = Recorder()
+    sender = scheduler(20)
+    futures = [sender.submit(NEW, send, f"new{i}") for i in range(5)]
+    time.sleep(0.01)
+    futures.append(sender.submit(CANCEL, send, "cancel"))
+    wait(futures, timeout=5)
+
+    # 第一筆用掉 burst 後，下一個 token 給之後才進來的刪單
+    assert send.calls[:2] == ["new0", "cancel"]
+
+
+def test_coalesce_and_drop(scheduler):
+    send = Recorder()
+    sender = scheduler(1000)
+    send.gate.clear()
+    sender.submit(NEW, send, "block")
+    time.sleep(0.05)
+    f1 = sender.submit(AMEND, send, "price 101", key=("price", "X0001"))
+    f2 = sender.submit(AMEND, send, "price 102", key=("price", "X0001"))
+    f3 = sender.submit(AMEND, send, "qty 500", key=("qty", "X0001"))
+    assert f1 is f2
+    assert sender.drop(("qty", "X0001"))
+    send.gate.set()
+
+    assert f2.result(timeout=5) == "price 102"
+    assert f3.cancelled()
+    assert send.calls == ["block", "price 102"]
+    stats = sender.stats()["amend"]
+    assert stats["coalesced"] == 1 and stats["dropped"] == 1
+
+
+def test_dropped_requests_do_not_use_tokens(scheduler):
+    send = Recorder()
+    sender = scheduler(5, burst=1)
+    sender.submit(NEW, send, "first").result(timeout=5)
+
+    # 等待 token 期間被取消的要求不佔用 token
+    dropped = [sender.submit(AMEND, send, f"amend{i}", key=("price", f"X{i}")) for i in range(3)]
+    cancelled = sender.submit(NEW, send, "cancelled")
+    for i in range(3):
+        sender.drop(("price", f"X{i}"))
+    cancelled.cancel()
+    last = sender.submit(NEW, send, "last")
+    assert last.result(timeout=5) == "last"
+
+    assert send.calls == ["first", "last"]
+    # 只有一個 token 的間隔（0.2 秒），而不是四個
+    assert send.times[1] - send.times[0] < 0.35
+    assert all(f.cancelled() for f in dropped + [cancelled])
+
+
+def test_close_cancels_queue(scheduler):
+    send = Recorder()
+    sender = scheduler(1000)
+    send.gate.clear()
+    sender.submit(NEW, send, "block")
+    time.sleep(0.05)
+    queued = sender.submit(NEW, send, "queued")
+    sender.close()
+    send.gate.set()
+
+    assert queued.cancelled()
+    with pytest.raises(RuntimeError):
+        sender.submit(NEW, send, "late")
+
+
+def _order():
+    from MasterTradePy.constant import PriceType, Side
+    return {"symbol": "2330", "side": Side.Buy, "qty": 1000, "price": 100.0, "price_type": PriceType.LMT}
+
+
+def test_no_rate_limit_rejections(make_stub_trader):
+    from autotraderx.masterlink.basics import SymbolBasic
+
+    limit = 20
+    trader = make_stub_trader(
+        latency=0.005, send_cost=0.0002, max_per_sec=limit, max_requests_per_sec=limit - 1)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+    first = trader.set_orders([_order()])[0].result(timeout=5)
+
+    # 券商端每秒上限的兩倍以上的突發要求
+    acks = trader.set_orders([_order() for _ in range(25)])
+    amends = [trader.change_price_future(first.ordNo, 95 + i % 10 * 0.5) for i in range(20)]
+    cancel = trader.change_qty_future(first.ordNo, 0)
+    done, not_done = wait(acks + [cancel], timeout=10)
+
+    assert not not_done
+    assert trader.api.n_rejected == 0
+    assert all(f.result().status.startswith("101") for f in acks)
+    # 刪單優先於排隊中的新單，排隊中的改價被刪單取消
+    stats = trader.sender.stats()
+    assert stats["cancel"]["wait_max"] < stats["new"]["wait_max"]
+    assert any(f.cancelled() for f in amends)
+
+
+def test_set_order_after_stop(make_stub_trader):
+    from autotraderx.masterlink.basics import SymbolBasic
+
+    trader = make_stub_trader(latency=0.005, max_requests_per_sec=5)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+    trader.sender.close()
+
+    with pytest.raises(RuntimeError):
+        trader.set_order(**_order())
+    assert trader.risk.open_qty == 0
+    future = trader.set_orders([_order()])[0]
+    assert isinstance(future.exception(timeout=1), RuntimeError)
+    assert trader.risk.open_qty == 0
+
+
+def test_set_order_cancelled_by_stop(make_stub_trader):
+    from autotraderx.masterlink.basics import SymbolBasic
+
+    trader = make_stub_trader(latency=0.005, max_requests_per_sec=0.5)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+    trader.set_order(**_order())
+
+    # 下一個 token 在 2 秒後，排隊中的委託在 stop 時被取消
+    errors = []
+
+    def place():
+        try:
+            trader.set_order(**_order())
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=place)
+    thread.start()
+    time.sleep(0.1)
+    trader.sender.close()
+    thread.join(5)
+
+    assert len(errors) == 1 and isinstance(errors[0], RuntimeError)
+    assert trader.risk.open_qty == 1000
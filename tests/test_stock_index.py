@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from autotraderx.stock_index import StockIndex, StockInfo, get_stock_index
+
+INFOS = {
+    "2330": {"名稱": "台積電", "代號": "2330", "市場別": "上市", "產業別": "半導體業",
+             "上市日期": "1994/09/05", "國際代碼": "TW0002330008"},
+    "2303": {"名稱": "聯電", "代號": "2303", "市場別": "上市", "產業別": "半導體業",
+             "上市日期": "1985/07/16", "國際代碼": "TW0002303005"},
+    "2317": {"名稱": "鴻海", "代號": "2317", "市場別": "上市", "產業別": "其他電子業",
+             "上市日期": "1991/06/18", "國際代碼": "TW0002317005"},
+    "00878": {"名稱": "國泰永續高股息", "代號": "00878", "市場別": "上市", "產業別": "",
+              "上市日期": "2020/07/20", "國際代碼": "TW00000878B5"},
+    "6488": {"名稱": "環球晶", "代號": "6488", "市場別": "上櫃", "產業別": "半導體業",
+             "上市日期": "2015/09/25", "國際代碼": "TW0006488000"},
+    "3661": {"名稱": "世芯-KY", "代號": "3661", "市場別": "上市", "產業別": "半導體業",
+             "上市日期": "2014/11/24", "國際代碼": "TW0003661005"},
+}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "stock_infos.json"
+    path.write_text(json.dumps(INFOS, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def index():
+    return StockIndex.from_dict(INFOS)
+
+
+def test_lookup(index):
+    assert len(index) == 6
+    assert index.codes() == sorted(INFOS)
+    assert "2330" in index and "9999" not in index
+    assert index["2330"] == INFOS["2330"]
+    assert index.get("6488") == StockInfo("6488", "環球晶", "上櫃", "半導體業", "2015/09/25", "TW0006488000")
+    assert index.get("9999") is None
+    assert index.name("2317") == "鴻海"
+    assert index.name("9999", "?") == "?"
+    with pytest.raises(KeyError):
+        index["9999"]
+    assert all(index[code] == info for code, info in INFOS.items())
+
+
+def test_prefix_search(index):
+    assert [s.code for s in index.by_prefix("23")] == ["2303", "2317", "2330"]
+    assert [s.code for s in index.by_prefix("2330")] == ["2330"]
+    assert [s.code for s in index.by_prefix("00")] == ["00878"]
+    assert index.by_prefix("9") == []
+    assert len(index.by_prefix("")) == 6
+
+
+def test_name_search(index):
+    assert [s.code for s in index.search_name("台積")] == ["2330"]
+    # 同一檔出現多次只列一次，不跨越名稱邊界
+    assert [s.code for s in index.search_name("股息")] == ["00878"]
+    assert index.search_name("電鴻") == []
+    assert sorted(s.code for s in index.search_name("電")) == ["2303", "2330"]
+    assert [s.code for s in index.search_name("-KY")] == ["3661"]
+
+
+def test_filter(index):
+    assert index.markets() == ["上市", "上櫃"]
+    assert [s.code for s in index.filter(market="上櫃")] == ["6488"]
+    assert [s.code for s in index.filter(market="上市", industry="半導體業")] == ["2303", "2330", "3661"]
+    assert [s.code for s in index.filter(industry="")] == ["00878"]
+    assert index.filter(market="興櫃") == []
+    assert index.filter(industry="不存在") == []
+
+
+def test_load_snapshot(json_path):
+    index = StockIndex.load(json_path)
+    snapshot = json_path.with_suffix(".idx")
+    assert snapshot.exists()
+    assert index["2330"] == INFOS["2330"]
+
+    # 快照較新時直接以 mmap 開啟
+    reopened = StockIndex.load(json_path)
+    assert reopened.codes() == index.codes()
+    assert reopened.search_name("鴻") == index.search_name("鴻")
+
+    # JSON 較新時重新編譯
+    infos = dict(INFOS, **{"2454": {"名稱": "聯發科", "代號": "2454", "市場別": "上市", "產業別": "半導體業",
+                                    "上市日期": "2001/07/23", "國際代碼": "TW0002454006"}})
+    json_path.write_text(json.dumps(infos, ensure_ascii=False), encoding="utf-8")
+    stat = snapshot.stat()
+    os.utime(str(json_path), (stat.st_atime, stat.st_mtime + 10))
+    assert StockIndex.load(json_path).name("2454") == "聯發科"
+
+    assert get_stock_index(json_path) is get_stock_index(str(json_path))
+
+
+def test_invalid_snapshot():
+    with pytest.raises(ValueError):
+        StockIndex(b"XXXX" + bytes(64))
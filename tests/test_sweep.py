@@ -0,0 +1,67 @@
+import numpy as np
+
+from autotraderx import BacktestEngine, Strategy, TradeData, format_sweep_table, parameter_grid, run_sweep
+from autotraderx.trade_data import TRADE_DTYPE
+from autotraderx.utils import match_time_to_us
+
+PRICES = [100.0, 99.0, 98.0, 99.5, 101.0, 103.0, 102.0, 104.0]
+
+
+def _data():
+    times = [match_time_to_us(f"09:00:{i:02d}.000000") for i in range(len(PRICES))]
+    array = np.array([(t, p, 1, False, 0) for t, p in zip(times, PRICES)], dtype=TRADE_DTYPE)
+    return [TradeData("2330", array, "20240605")]
+
+
+class Threshold(Strategy):
+    """ 價格不高於 buy_below 時市價買進一張，不低於 sell_above 時賣出；子行程需可 pickle """
+
+    def __init__(self, buy_below: float, sell_above: float):
+        self.buy_below = buy_below
+        self.sell_above = sell_above
+        self.bought = False
+
+    def event_on_match(self, data):
+        if not self.bought and data.MatchPrice <= self.buy_below:
+            self.engine.buy(data.Symbol, 1)
+            self.bought = True
+        elif self.bought and data.MatchPrice >= self.sell_above and self.engine.positions[data.Symbol] > 0:
+            self.engine.sell(data.Symbol, 1)
+
+
+def test_parameter_grid():
+    grid = parameter_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6
+    assert grid[0] == {"a": 1, "b": "x"}
+    assert grid[-1] == {"a": 2, "b": "z"}
+    assert parameter_grid({"a": []}) == []
+
+
+def test_run_sweep_ranking(tmp_path):
+    grid = {"buy_below": [99.0, 98.0], "sell_above": [101.0, 103.0, 104.0]}
+    results = run_sweep(Threshold, grid, _data(), max_workers=1, workdir=tmp_path, verbose=False)
+
+    # 與單一行程逐一回測的結果相同，依 net_pnl 由大到小排序
+    expected = []
+    for params in parameter_grid(grid):
+        engine = BacktestEngine(Threshold(**params))
+        engine.add_many(_data())
+        expected.append({**params, "net_pnl": round(engine.run().net_pnl, 3)})
+    expected.sort(key=lambda r: r["net_pnl"], reverse=True)
+
+    assert len(results) == 6
+    assert [{k: r[k] for k in ("buy_below", "sell_above", "net_pnl")} for r in results] == expected
+    # 市價單以下一筆成交價成交：99 觸發時以 98 買進；104 觸發後沒有下一筆，持有到最後且不付賣出成本
+    assert (results[0]["buy_below"], results[0]["sell_above"]) == (99.0, 104.0)
+    assert results[0]["net_pnl"] == (104.0 - 98.0) * 1000 - 84
+    assert (results[-1]["buy_below"], results[-1]["sell_above"]) == (98.0, 103.0)
+    assert all(r["ticks"] == len(PRICES) for r in results)
+    assert list(tmp_path.iterdir()) == []
+
+    by_trades = run_sweep(
+        Threshold, parameter_grid(grid)[:2], _data(), metric="trades", max_workers=1, verbose=False)
+    assert [r["trades"] for r in by_trades] == sorted((r["trades"] for r in by_trades), reverse=True)
+
+    table = format_sweep_table(results, top=3)
+    assert table.field_names[:3] == ["排名", "buy_below", "sell_above"]
+    assert len(table.rows) == 3
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from autotraderx.tick_grid import (price_ladder, price_to_tick_index, shift_ticks, snap_price, tick_index_to_price,
+                                   tick_size, ticks_between, to_cents)
+
+# (區間邊界, 邊界以下的升降單位, 邊界以上的升降單位)
+EDGES = [(10, 0.01, 0.05), (50, 0.05, 0.1), (100, 0.1, 0.5), (500, 0.5, 1.0), (1000, 1.0, 5.0)]
+
+
+@pytest.mark.parametrize("edge, below, above", EDGES)
+def test_band_edges(edge, below, above):
+    # 邊界價格屬於上方的區間
+    assert tick_size(edge) == above
+    assert tick_size(edge - below) == below
+    assert shift_ticks(edge, 1) == edge + above
+    assert shift_ticks(edge, -1) == pytest.approx(edge - below)
+    assert ticks_between(edge - below, edge + above) == 2
+
+    index = price_to_tick_index(edge)
+    assert tick_index_to_price(index) == edge
+    assert tick_index_to_price(index - 1) == pytest.approx(edge - below)
+    assert tick_index_to_price(index + 1) == edge + above
+
+
+@pytest.mark.parametrize("edge, below, above", EDGES)
+def test_snap_across_edge(edge, below, above):
+    # 邊界上方不在價位上的價格
+    off = edge + above / 2 + 0.001 if above > 0.01 else None
+    if off is not None:
+        assert snap_price(off, "down") == edge
+        assert snap_price(off, "up") == pytest.approx(edge + above)
+        assert snap_price(off) == pytest.approx(edge + above)
+    # 邊界下方不在價位上的價格往上對齊到邊界
+    if below > 0.01:
+        assert snap_price(edge - below / 2, "up") == edge
+        assert snap_price(edge - below / 2, "down") == pytest.approx(edge - below)
+        # 剛好一半時往上
+        assert snap_price(edge - below / 2) == edge
+
+
+def test_index_is_contiguous():
+    # 由 0.01 元到 1500 元，每個價位序號對應一個價位，且價位差等於升降單位
+    index = np.arange(1, price_to_tick_index(1500) + 1)
+    prices = tick_index_to_price(index)
+    np.testing.assert_array_equal(price_to_tick_index(prices), index)
+    np.testing.assert_allclose(np.diff(prices), tick_size(prices[:-1]), atol=1e-9)
+    assert prices[0] == 0.01
+
+
+def test_float_error():
+    assert to_cents(10.049999999) == 1005
+    assert to_cents(10.0500001, "down") == 1005
+    assert to_cents(10.0499999, "up") == 1005
+    assert price_to_tick_index(0.1 + 0.2) == price_to_tick_index(0.3)
+    assert snap_price(49.95000000001, "up") == 49.95
+
+
+def test_ladder_and_arrays():
+    assert price_ladder(99.8, 4).tolist() == [99.8, 99.9, 100.0, 100.5]
+    assert price_ladder(500, 3, step=-1).tolist() == [500.0, 499.5, 499.0]
+    ladder = price_ladder(np.array([10, 1000]), 2)
+    assert ladder.shape == (2, 2)
+    assert ladder.tolist() == [[10.0, 10.05], [1000.0, 1005.0]]
+
+    prices = np.array([9.99, 10, 49.95, 50, 99.9, 100, 499.5, 500, 999, 1000])
+    assert tick_size(prices).tolist() == [0.01, 0.05, 0.05, 0.1, 0.1, 0.5, 0.5, 1.0, 1.0, 5.0]
+    assert isinstance(tick_size(10), float)
+    assert isinstance(price_to_tick_index(10), int)
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        price_to_tick_index(0)
+    with pytest.raises(ValueError):
+        price_to_tick_index(10, "ceil")
+    # 序號最小為 0.01 元
+    assert tick_index_to_price(0) == 0.01
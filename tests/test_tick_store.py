@@ -0,0 +1,62 @@
+from array import array
+
+import numpy as np
+
+from autotraderx import TickStore
+
+DATE = "20240605"
+
+
+def _rows(start, n):
+    return [(t, 100.0 + t, t + 1, (t + 1) * 10, 0.5) for t in range(start, start + n)]
+
+
+def test_append_and_read(tmp_path):
+    store = TickStore(tmp_path)
+    store.append("2330", DATE, _rows(0, 3))
+    store.append("2330", DATE, _rows(3, 2))
+
+    columns = store.read("2330", DATE)
+    assert columns["time"].tolist() == [0, 1, 2, 3, 4]
+    assert columns["price"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert store.dates() == [DATE]
+    assert store.symbols(DATE) == ["2330"]
+    assert len(store.read("2317", DATE)["time"]) == 0
+
+
+def test_partial_write_is_trimmed(tmp_path):
+    store = TickStore(tmp_path)
+    store.append("2330", DATE, _rows(0, 3))
+
+    # 模擬寫到一半中斷：只有 time 與 price 多寫了一筆
+    folder = store.folder("2330", DATE)
+    with open(folder / "time.bin", "ab") as f:
+        array("q", [99]).tofile(f)
+    with open(folder / "price.bin", "ab") as f:
+        array("d", [999.0]).tofile(f)
+    assert len(store.read("2330", DATE)["time"]) == 3
+
+    appender = store.open_appender((DATE, "2330"))
+    appender.write(_rows(3, 2))
+    appender.close()
+
+    columns = store.read("2330", DATE)
+    assert columns["time"].tolist() == [0, 1, 2, 3, 4]
+    assert columns["price"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert columns["qty"].tolist() == [1, 2, 3, 4, 5]
+    assert all(len(col) == 5 for col in columns.values())
+
+
+def test_legacy_folder_without_counter(tmp_path):
+    store = TickStore(tmp_path)
+    store.append("2330", DATE, _rows(0, 2))
+    folder = store.folder("2330", DATE)
+    (folder / "committed.bin").unlink()
+    with open(folder / "diff.bin", "ab") as f:
+        array("d", [1.0]).tofile(f)
+
+    assert len(store.read("2330", DATE)["diff"]) == 2
+    store.append("2330", DATE, _rows(2, 1))
+    columns = store.read("2330", DATE)
+    np.testing.assert_array_equal(columns["diff"], [0.5, 0.5, 0.5])
+    assert columns["time"].tolist() == [0, 1, 2]
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from autotraderx import TickWriter
+
+
+class MemorySink:
+
+    sinks = {}
+
+    def __init__(self, key):
+        self.key = key
+        self.records = []
+        self.closed = False
+        MemorySink.sinks.setdefault(key, []).append(self)
+
+    def write(self, records):
+        if any(r == "bad" for r in records):
+            raise OSError("disk full")
+        self.records.extend(records)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _records(key):
+    return [r for sink in MemorySink.sinks.get(key, []) for r in sink.records]
+
+
+def test_write_and_stop():
+    MemorySink.sinks = {}
+    writer = TickWriter(opener=MemorySink, batch_size=10, flush_interval=0.05)
+    writer.start()
+    for i in range(25):
+        assert writer.put("a" if i % 2 else "b", i)
+    assert writer.stop(timeout=5)
+
+    assert _records("a") == list(range(1, 25, 2))
+    assert _records("b") == list(range(0, 25, 2))
+    assert all(sink.closed for sinks in MemorySink.sinks.values() for sink in sinks)
+    assert writer.stats()["written"] == 25
+
+
+def test_write_error_keeps_worker_running(capsys):
+    MemorySink.sinks = {}
+    writer = TickWriter(opener=MemorySink, batch_size=1, flush_interval=0.01)
+    writer.start()
+    writer.put("a", 1)
+    time.sleep(0.1)
+    writer.put("a", "bad")
+    time.sleep(0.1)
+    writer.put("a", 2)
+    writer.put("b", 3)
+    assert writer.stop(timeout=5)
+
+    stats = writer.stats()
+    assert stats["errors"] == 1
+    assert stats["failed"] == 1
+    assert stats["written"] == 3
+    assert isinstance(writer.last_error, OSError)
+    # 失敗後重新開啟 handle，之後的資料照常寫出
+    assert _records("a") == [1, 2]
+    assert len(MemorySink.sinks["a"]) == 2
+    assert _records("b") == [3]
+    assert "disk full" in capsys.readouterr().out
+
+
+def test_stop_timeout():
+    gate = threading.Event()
+
+    class SlowSink(MemorySink):
+        def write(self, records):
+            gate.wait(5)
+            super().write(records)
+
+    MemorySink.sinks = {}
+    writer = TickWriter(opener=SlowSink, max_queue=1, batch_size=1, flush_interval=0.01)
+    writer.start()
+    writer.put("a", 1)
+    time.sleep(0.05)
+    writer.put("a", 2)
+
+    # 背景執行緒卡在寫檔，佇列已滿
+    assert not writer.stop(timeout=0.1)
+    assert writer._thread is not None
+    gate.set()
+    assert writer.stop(timeout=5)
+    assert writer._thread is None
+    assert _records("a") == [1, 2]
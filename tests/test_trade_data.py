@@ -0,0 +1,81 @@
+import numpy as np
+
+from autotraderx import TradeData
+from autotraderx.trade_data import SIDE_BUY, SIDE_SELL
+from autotraderx.utils import match_time_to_us
+
+
+def test_match_time_to_us():
+    expected = ((9 * 60 + 0) * 60 + 1) * 1000000 + 123456
+    assert match_time_to_us("09:00:01.123456") == expected
+    assert match_time_to_us("090001123456") == expected
+    assert match_time_to_us(90001123456) == expected
+    assert match_time_to_us(90001123456.0) == expected
+    assert match_time_to_us(np.float64(90001123456.0)) == expected
+
+
+def test_from_objects(tbs_records):
+    data = TradeData.from_objects("2330", tbs_records, "20240605")
+
+    assert len(data) == 4
+    assert data.time.tolist() == [
+        match_time_to_us("08:45:00.123456"),
+        match_time_to_us("09:00:00.000000"),
+        match_time_to_us("09:00:01.500000"),
+        match_time_to_us("13:29:59.999999"),
+    ]
+    assert data.price.tolist() == [580.0, 581.0, 580.0, 582.5]
+    assert data.qty.tolist() == [3, 12, 5, 1]
+    assert data.try_match.tolist() == [True, False, False, False]
+    assert data.side.tolist() == [0, SIDE_BUY, SIDE_SELL, SIDE_BUY]
+    assert len(data.without_try_match()) == 3
+
+
+def test_records_round_trip(tbs_records):
+    data = TradeData.from_objects("2330", tbs_records, "20240605")
+    records = data.records
+
+    assert records[1] == {
+        "股票代號": "2330",
+        "成交時間": 90000000000.0,
+        "成交價格": 581.0,
+        "成交量": 12,
+        "試搓": False,
+        "買賣": 1,
+    }
+    assert isinstance(records[1]["成交時間"], float)
+    assert isinstance(records[1]["買賣"], int)
+    again = TradeData.from_records(records, "20240605")
+    np.testing.assert_array_equal(again.array, data.array)
+
+
+def test_from_raw_records(tbs_records):
+    # 未使用快取時，BackTesting.get_data 直接回傳 SDK 的原始欄位值
+    records = [
+        {
+            "股票代號": d.Prod,
+            "成交時間": d.Match_Time,
+            "成交價格": d.Match_Price,
+            "成交量": d.Match_Quantity,
+            "試搓": d.Is_TryMatch,
+            "買賣": d.BS,
+        } for d in tbs_records
+    ]
+    data = TradeData.from_records(records)
+
+    assert data.symbol == "2330"
+    np.testing.assert_array_equal(data.array, TradeData.from_objects("2330", tbs_records).array)
+    # records 還原為相同的欄位值與型別
+    assert data.records == records
+    assert [type(v) for v in data.records[2].values()] == [type(v) for v in records[2].values()]
+
+
+def test_from_legacy_records():
+    # 舊版字串格式仍可讀入
+    records = [
+        {"股票代號": "2330", "成交時間": "09:00:01.500000", "成交價格": 580.0, "成交量": 5, "試搓": False, "買賣": "S"},
+    ]
+    data = TradeData.from_records(records)
+    assert data.side.tolist() == [SIDE_SELL]
+    assert data.records[0]["成交時間"] == 90001500000.0
+    assert data.records[0]["買賣"] == 2
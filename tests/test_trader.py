@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, wait
+
+import pytest
+
+from autotraderx.stock_index import StockIndex
+
+
+def _order(**kwargs):
+    from MasterTradePy.constant import PriceType, Side
+    order = {"symbol": "2330", "side": Side.Buy, "qty": 1000, "price": 100.0, "price_type": PriceType.LMT}
+    order.update(kwargs)
+    return order
+
+
+@pytest.fixture
+def trader(make_stub_trader):
+    from autotraderx.masterlink.basics import SymbolBasic
+
+    trader = make_stub_trader(latency=0.005, send_cost=0)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+    return trader
+
+
+def test_set_orders(trader):
+    acks = trader.set_orders([_order(), _order(price=200.0), _order()])
+    wait(acks, timeout=5)
+
+    assert acks[0].result().status.startswith("101")
+    assert isinstance(acks[1].exception(), ValueError)
+    assert acks[2].result().ordNo != acks[0].result().ordNo
+    assert len(trader.get_open_orders("2330")) == 2
+
+
+def test_set_orders_cancelled_send(trader, monkeypatch):
+    def cancelled_submit(*args, **kwargs):
+        future = Future()
+        future.cancel()
+        return future
+
+    monkeypatch.setattr(trader, "_submit", cancelled_submit)
+    acks = trader.set_orders([_order(), _order()])
+
+    assert all(isinstance(f.exception(timeout=1), RuntimeError) for f in acks)
+    assert trader.risk.open_qty == 0
+
+
+def test_cancel_all(trader):
+    acks = trader.set_orders([_order() for _ in range(5)])
+    wait(acks, timeout=5)
+    report = trader.cancel_all(timeout=5)
+
+    assert sorted(report.confirmed) == sorted(f.result().ordNo for f in acks)
+    assert not report.failed and not report.pending
+    assert trader.get_open_orders() == []
+    assert trader.risk.open_qty == 0
+
+
+def test_cancel_rejected_then_cancel_all(make_stub_trader):
+    from autotraderx.masterlink.basics import SymbolBasic
+
+    # 每秒只接受一筆委託要求，新單之後的刪單會被拒絕
+    trader = make_stub_trader(latency=0.005, send_cost=0, max_per_sec=1)
+    trader.basics.put(SymbolBasic("2330", "2330", 100.0, 110.0, 90.0))
+    ordNo = trader.set_orders([_order()])[0].result(timeout=5).ordNo
+
+    report = trader.cancel_order(ordNo, timeout=0.3)
+    assert report.pending == [ordNo]
+    assert not report.confirmed and not report.failed
+    state = trader.trader.order_book.get(ordNo)
+    assert state.request_rejected and state.is_open
+    assert [s.ordNo for s in trader.get_open_orders()] == [ordNo]
+    assert trader.risk.open_qty == 1000
+
+    trader.api.max_per_sec = None
+    report = trader.cancel_all(timeout=5)
+    assert report.confirmed == [ordNo]
+    assert trader.get_open_orders() == []
+    assert trader.risk.open_qty == 0
+
+
+def _send_later(market_trader, rows):
+    """ 由另一個執行緒依 (延遲秒數, workID, 資料) 送出查詢結果 """
+    def run():
+        t0 = time.monotonic()
+        for delay, work_id, data in rows:
+            time.sleep(max(t0 + delay - time.monotonic(), 0))
+            market_trader.OnReqResult(work_id, data)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def market_trader():
+    trader_module = pytest.importorskip("autotraderx.masterlink.trader")
+    return trader_module.CustomMarketTrader()
+
+
+def test_wait_req_result_settle(market_trader):
+    # 間隔小於 settle 的資料列屬於同一次查詢，之後才到的不計入
+    thread = _send_later(market_trader, [
+        (0.02, "qid1", 1), (0.05, "qid1", 2), (0.08, "qid1", 3), (0.6, "qid1", 4),
+    ])
+    t0 = time.monotonic()
+    assert market_trader.wait_req_result("qid1", timeout=5, settle=0.2) == [1, 2, 3]
+    assert time.monotonic() - t0 < 0.5
+    thread.join()
+
+
+def test_wait_req_result_timeout(market_trader):
+    t0 = time.monotonic()
+    assert market_trader.wait_req_result("qid1", timeout=0.1) == []
+    assert 0.1 <= time.monotonic() - t0 < 1
+
+    # 資料持續送達超過 timeout 時回傳已收到的部分
+    thread = _send_later(market_trader, [(0.03 * i, "qid2", i) for i in range(20)])
+    rows = market_trader.wait_req_result("qid2", timeout=0.2, settle=0.1)
+    assert 0 < len(rows) < 20
+    assert rows == list(range(len(rows)))
+    thread.join()
+
+    # 無資料時 SDK 回傳的字串不列入結果
+    market_trader.OnReqResult("qid3", "No Data(OnSorTaskResult)")
+    assert market_trader.wait_req_result("qid3", timeout=1, settle=0) == []
+
+
+def test_wait_req_result_concurrent(market_trader):
+    work_ids = [f"qid{i}" for i in range(8)]
+    rows = [(0.01 * j, work_id, (work_id, j)) for j in range(3) for work_id in work_ids]
+    results = {}
+
+    def waiter(work_id):
+        results[work_id] = market_trader.wait_req_result(work_id, timeout=5, settle=0.1)
+
+    threads = [threading.Thread(target=waiter, args=(work_id,)) for work_id in work_ids]
+    for thread in threads:
+        thread.start()
+    _send_later(market_trader, rows).join()
+    for thread in threads:
+        thread.join()
+
+    assert results == {work_id: [(work_id, j) for j in range(3)] for work_id in work_ids}
+
+
+@pytest.fixture
+def query_trader(trader, monkeypatch):
+    from MasterTradePy.model import Inventory
+
+    infos = {"2330": {"名稱": "台積電", "代號": "2330", "市場別": "上市", "產業別": "半導體業",
+                      "上市日期": "1994/09/05", "國際代碼": "TW0002330008"}}
+    stock_info = StockIndex.from_dict(infos)
+    monkeypatch.setattr(type(trader), "stock_info", property(lambda self: stock_info))
+    trader.api.inventory = {
+        "2330": Inventory("2330", "3000", "1000", "0", "50"),
+        "0050": Inventory("0050", "500", "0", "0", "500"),
+    }
+    return trader
+
+
+def test_query_future_and_async(query_trader):
+    acks = query_trader.set_orders([_order(), _order(price=101.0)])
+    wait(acks, timeout=5)
+    query_trader.api.fill(acks[0].result().ordNo, 1000, 100.0)
+    deadline = time.monotonic() + 5
+    while len(query_trader.get_open_orders()) > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # 兩個查詢同時進行，各自取得自己的結果
+    inventory = query_trader.get_inventory_future(timeout=2)
+    orders = query_trader.get_order_report_future()
+    assert inventory.result(timeout=5) == {
+        "2330": {"股票": "台積電", "集保庫存（張）": "3", "零股庫存（股）": "50", "融資庫存（張）": "1", "融券庫存（張）": "0"},
+        "0050": {"股票": "", "集保庫存（張）": "0", "零股庫存（股）": "500", "融資庫存（張）": "0", "融券庫存（張）": "0"},
+    }
+    assert sorted(r["委託書號"] for r in orders.result(timeout=5)) == sorted(f.result().ordNo for f in acks)
+
+    async def query():
+        return await asyncio.gather(
+            query_trader.get_trade_report_async(),
+            query_trader.get_inventory_async(timeout=2),
+        )
+
+    deals, inventory = asyncio.run(query())
+    assert [r["委託書號"] for r in deals] == [acks[0].result().ordNo]
+    assert set(inventory) == {"2330", "0050"}
+
+
+def test_query_inventory_no_data(query_trader):
+    query_trader.api.inventory = {}
+    t0 = time.monotonic()
+    assert query_trader.get_inventory_future(timeout=2).result(timeout=5) == {}
+    # 收到 "No Data" 後 settle 即完成，不等到 timeout
+    assert time.monotonic() - t0 < 1
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+update_stocks_code = pytest.importorskip("autotraderx.update_stocks_code")
+
+TSMC = ("2330", "台積電", "TW0002330008", "1994/09/05", "上市", "半導體業")
+HON_HAI = ("2317", "鴻海", "TW0002317005", "1991/06/18", "上市", "其他電子業")
+UMC = ("2303", "聯電", "TW0002303005", "1985/07/16", "上市", "半導體業")
+OTC = ("6488", "環球晶", "TW0006488000", "2015/09/25", "上櫃", "半導體業")
+EMERGING = ("7777", "興櫃公司", "TW0007777005", "2020/01/02", "興櫃", "生技醫療業")
+
+
+def _info(row):
+    code, name, isin, list_date, market, industry = row
+    return {"名稱": name, "代號": code, "市場別": market, "產業別": industry, "上市日期": list_date, "國際代碼": isin}
+
+
+@pytest.fixture
+def write_page(tmp_path, make_isin_page):
+    def write(name, rows):
+        path = tmp_path / name
+        path.write_bytes(make_isin_page(rows, ("股票", "ETF")))
+        return path
+    return write
+
+
+@pytest.fixture
+def output(tmp_path):
+    path = tmp_path / "stock_infos.json"
+    old = {row[0]: _info(row) for row in (TSMC, UMC, OTC, EMERGING)}
+    path.write_text(json.dumps(old, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_load_fixtures(write_page):
+    infos, = update_stocks_code.load_fixtures([write_page("twse.html", [TSMC, HON_HAI])])
+    assert infos == {"2330": _info(TSMC), "2317": _info(HON_HAI)}
+
+
+def test_diff_and_keep_missing_market(output, write_page, monkeypatch):
+    renamed = ("6488", "環球晶圓", *OTC[2:])
+    pages = [write_page("twse.html", [TSMC, HON_HAI]), write_page("tpex.html", [renamed])]
+
+    replaced = []
+    real_replace = update_stocks_code.os.replace
+
+    def replace(src, dst):
+        # 替換前暫存檔已完整寫入
+        replaced.append((src, dst, json.loads(open(src, encoding="utf-8").read())))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(update_stocks_code.os, "replace", replace)
+    diff = update_stocks_code.update_stock_infos(output, fixtures=pages, verbose=False)
+
+    assert set(diff.added) == {"2317"}
+    assert set(diff.delisted) == {"2303"}
+    assert diff.changed == {"6488": (_info(OTC), _info(renamed))}
+
+    saved = json.loads(output.read_text(encoding="utf-8"))
+    # 興櫃的頁面沒有下載，舊資料保留
+    assert set(saved) == {"2330", "2317", "6488", "7777"}
+    assert saved["7777"] == _info(EMERGING)
+
+    src, dst, content = replaced[0]
+    assert len(replaced) == 1
+    assert dst == str(output) and src != dst
+    assert content == saved
+    assert list(output.parent.glob("*.tmp")) == []
+
+
+def test_no_rewrite_when_unchanged(output, write_page, monkeypatch):
+    pages = [write_page("twse.html", [TSMC, UMC]), write_page("tpex.html", [OTC])]
+    before = output.read_bytes()
+
+    def replace(src, dst):
+        raise AssertionError("should not rewrite")
+
+    monkeypatch.setattr(update_stocks_code.os, "replace", replace)
+    diff = update_stocks_code.update_stock_infos(output, fixtures=pages, verbose=False)
+
+    assert not diff
+    assert output.read_bytes() == before
+
+
+def test_dry_run(output, write_page):
+    before = output.read_bytes()
+    diff = update_stocks_code.update_stock_infos(
+        output, fixtures=[write_page("twse.html", [TSMC])], dry_run=True, verbose=False)
+
+    assert set(diff.delisted) == {"2303"}
+    assert output.read_bytes() == before